@@ -1,35 +1,45 @@
 # agent/react_agent.py
+import asyncio
 import json
-from typing import Any, Dict, List, Optional
-from langchain_groq import ChatGroq
-from config import GROQ_API_KEY, GROQ_MODEL
-from .tools import TOOLS
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from config import (
+    AGENT_FAST_PATH, AGENT_MAX_SECONDS, AGENT_MAX_TOKENS,
+    AGENT_TOOL_TIMEOUT, AGENT_TOOL_CONCURRENCY,
+)
+from tools.llm_client import get_llm
+from tools.tracing import record, span
+from rag.context import estimate_tokens
+from .tools import TOOLS, invalidate_after_write, summarize_observation, tool_catalog
+from .tool_cache import tool_cache
+from .router import Route, route, format_answer
 
 PLANNER_PROMPT = """You are a helpful assistant with tools.
 Decide the NEXT best action. Output strict JSON only.
 
-Tools:
+Tools (arguments are strings unless typed; ? = optional):
 {tools}
 
 Rules:
-- If answering from policy docs, use tool "rag_answer" with {{ "query": "..." }}.
-- If user asks to request PTO/leave, use "create_leave_request".
-- If user asks to approve a leave, use "approve_leave_request" with {{ "id": "<uuid>" }}.
-- If user asks to reject a leave, use "reject_leave_request" with {{ "id": "<uuid>" }}.
-- If user asks to list leave requests, use "list_leave_requests" with {{ "user": "<name>", "status": "<status>" }} if provided.
-- If user asks to cancel a leave request, use "cancel_leave_request" with {{ "id": "<uuid>" }}.
-- If asking about a specific date being a holiday, use "check_holiday".
-- If user explicitly asks to call an API endpoint, use "http_get" or "http_post".
-- If the answer is obvious and needs no tool, respond with {{ "action": "final", "answer": "..." }}.
-
-Return JSON like:
-{{ "action":"tool","name":"rag_answer","args":{{"query":"How many PTO days in Year 1?"}} }}
-OR
-{{ "action":"final","answer":"..." }}
+- Policy questions: "rag_answer".
+- Taking PTO/leave: "create_leave_request"; approving, rejecting, cancelling or listing requests: the matching tool.
+- Whether a specific date is a holiday: "check_holiday".
+- "http_get" / "http_post" only when the user explicitly asks to call an API endpoint.
+- Several independent questions: request all the calls at once with "action":"tools".
+- No tool needed: {{"action":"final","answer":"..."}}.
+
+Return one of:
+{{"action":"tool","name":"rag_answer","args":{{"query":"How many PTO days in Year 1?"}}}}
+{{"action":"tools","calls":[{{"name":"check_holiday","args":{{"date_str":"2025-07-04"}}}},{{"name":"rag_answer","args":{{"query":"How many PTO days in Year 2?"}}}}]}}
+{{"action":"final","answer":"..."}}
 
 User: {user_msg}
 """
 
+# everything before the user line; rendered once per tool catalog, so every planner
+# request starts with the same bytes (cheap to build, and reusable by provider-side prefix caches)
+_PLANNER_HEAD = PLANNER_PROMPT[:PLANNER_PROMPT.index("User: {user_msg}")]
+
 SYNTH_PROMPT = """You ran one or more tools. Given the user message and the most recent tool output, write a final answer.
 - Be concise (1-3 sentences).
 - If citing policy facts, quote numbers/dates and add (source — section) if available.
@@ -40,96 +50,403 @@ Most recent tool name: {tool_name}
 Most recent tool output (JSON): {tool_output}
 """
 
+# Plain-text variant of SYNTH_PROMPT for token streaming (JSON can't be shown as it arrives)
+STREAM_SYNTH_PROMPT = """You ran one or more tools. Given the user message and the most recent tool output, write a final answer.
+- Be concise (1-3 sentences).
+- If citing policy facts, quote numbers/dates and add (source — section) if available.
+Reply with the answer text only.
+
+User: {user_msg}
+Most recent tool name: {tool_name}
+Most recent tool output (JSON): {tool_output}
+"""
+
 def _llm():
-    return ChatGroq(api_key=GROQ_API_KEY, model=GROQ_MODEL, temperature=0)
-
-def _tools_description():
-    lines = []
-    for name, spec in TOOLS.items():
-        lines.append(f"- {name}: {spec['description']}; schema={json.dumps(spec['schema'])}")
-    return "\n".join(lines)
-
-def plan_step(user_msg: str) -> Dict[str, Any]:
-    llm = _llm()
-    prompt = PLANNER_PROMPT.format(tools=_tools_description(), user_msg=user_msg)
-    out = llm.invoke(prompt).content.strip()
+    # shared with the QA chain: pooled clients + prompt-hash response cache (tools/llm_client.py)
+    return get_llm()
+
+_planner_head: Tuple[str, str] = ("", "")  # (catalog it was rendered from, text)
+
+def _planner_prompt(user_msg: str) -> str:
+    global _planner_head
+    catalog = tool_catalog()  # compiled once in agent/tools.py; replaced by register_tool()
+    if _planner_head[0] is not catalog:
+        _planner_head = (catalog, _PLANNER_HEAD.format(tools=catalog))
+    return f"{_planner_head[1]}User: {user_msg}\n"
+
+def _feedback(user_msg: str, result: Any) -> str:
+    # the planner sees a summary of the last result (agent/tools.summarize_observation), not the raw payload
+    return f"{user_msg}\n(Previous result: {json.dumps(result, ensure_ascii=False, separators=(',', ':'))})"
+
+def _parse_plan(out: str) -> Dict[str, Any]:
     try:
         return json.loads(out)
     except Exception:
         return {"action":"final","answer":"Sorry, I couldn't parse a plan. Please rephrase."}
 
-def synthesize(user_msg: str, tool_name: str, tool_output: Dict[str, Any]) -> str:
-    llm = _llm()
-    prompt = SYNTH_PROMPT.format(
+def _synth_prompt(user_msg: str, tool_name: str, tool_output: Dict[str, Any]) -> str:
+    return SYNTH_PROMPT.format(
         user_msg=user_msg,
         tool_name=tool_name,
         tool_output=json.dumps(tool_output, ensure_ascii=False)[:6000],
     )
-    out = llm.invoke(prompt).content.strip()
+
+def _parse_synth(out: str, tool_output: Dict[str, Any]) -> str:
     try:
         return json.loads(out).get("final_answer","")
     except Exception:
         return "Here is what I found: " + str(tool_output)[:500]
 
-def run_agent(user_msg: str, max_steps: int = 3) -> Dict[str, Any]:
+async def _allm(prompt: str) -> Tuple[str, Dict[str, int]]:
+    """(reply text, {"total": tokens, "prompt": tokens}); counts are the API's, prompt falls back to
+    an estimate (~4 chars/token) when the reply carries no usage (e.g. an LLM response-cache hit)."""
+    msg = await _llm().ainvoke(prompt)
+    usage = getattr(msg, "usage_metadata", None) or {}
+    return msg.content.strip(), {"total": usage.get("total_tokens", 0),
+                                 "prompt": usage.get("input_tokens") or estimate_tokens(prompt)}
+
+async def _acall_tool(tool: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
+    afn = tool.get("afn")
+    if afn is not None:
+        return await afn(args)
+    # tools without an async variant are assumed to be blocking I/O
+    return await asyncio.to_thread(tool["fn"], args)
+
+def _timeout(tool: Dict[str, Any]) -> float:
+    return tool.get("timeout", AGENT_TOOL_TIMEOUT)
+
+async def _acall_tool_guarded(tool: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
+    """_acall_tool with the tool's timeout; failures become {"error": ...} observations."""
+    try:
+        return await asyncio.wait_for(_acall_tool(tool, args), _timeout(tool))
+    except asyncio.TimeoutError:
+        return {"error": f"timed out after {_timeout(tool):g}s"}
+    except Exception as e:
+        return {"error": str(e)}
+
+def _after_call(name: str, tool: Dict[str, Any], args: Dict[str, Any], obs: Any):
+    policy = tool.get("cache")
+    if policy and isinstance(obs, dict) and "error" not in obs:
+        tool_cache.store(name, policy, args, obs)
+    invalidate_after_write(name, args, obs)
+
+async def _acall_cached(name: str, tool: Dict[str, Any], args: Dict[str, Any]) -> Tuple[Any, Optional[str]]:
+    """(observation, "hit" | "miss" | None when the tool has no cache policy)."""
+    policy = tool.get("cache")
+    with span("tool", name) as sp:
+        if policy:
+            hit, obs = tool_cache.lookup(name, policy, args)
+            sp.set(cache="hit" if hit else "miss")
+            if hit:
+                return obs, "hit"
+        obs = await _acall_tool_guarded(tool, args)
+        if isinstance(obs, dict) and "error" in obs:
+            sp.set(error=str(obs["error"])[:200])
+    _after_call(name, tool, args, obs)
+    return obs, "miss" if policy else None
+
+async def _arun_calls(calls: List[Dict[str, Any]]) -> List[Tuple[Any, float, Optional[str]]]:
+    """Independent tool calls run concurrently (at most AGENT_TOOL_CONCURRENCY at a time);
+    returns (observation, ms, cache) per call, in call order."""
+    sem = asyncio.Semaphore(AGENT_TOOL_CONCURRENCY)
+
+    async def one(call: Dict[str, Any]) -> Tuple[Any, float, Optional[str]]:
+        name = call.get("name")
+        tool = TOOLS.get(name)
+        if not tool:
+            return {"error": f"Unknown tool '{name}'."}, 0.0, None
+        async with sem:
+            t0 = time.perf_counter()
+            obs, cache = await _acall_cached(name, tool, call.get("args") or {})
+            return obs, _ms(t0), cache
+
+    return list(await asyncio.gather(*(one(c) for c in calls)))
+
+def run_agent(user_msg: str, max_steps: int = 3, max_seconds: Optional[float] = None,
+              max_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """Blocking wrapper around arun_agent() for scripts; don't call from a running event loop."""
+    return asyncio.run(arun_agent(user_msg, max_steps=max_steps, max_seconds=max_seconds, max_tokens=max_tokens))
+
+# events whose data is also a trace entry
+TRACE_EVENTS = {"route", "plan", "tool_start", "tool_end", "error", "budget", "synthesis"}
+
+async def arun_agent(user_msg: str, max_steps: int = 3, max_seconds: Optional[float] = None,
+                     max_tokens: Optional[int] = None) -> Dict[str, Any]:
     """
     Returns:
       {
         "type": "final",
         "answer": "...",
         "steps": int,
+        "elapsed_ms": float,
+        "llm_tokens": int,
         "trace": [
-          {"step":1,"plan":{...}},
+          {"step":1,"route":{"path":"fast"|"planner","rule":...}},
+          {"step":1,"plan":{...},"ms":412.0,"tokens":655,"prompt_tokens":612},
           {"step":1,"tool_call":{"name":"...","args":{...}}},
-          {"step":1,"observation":{...}},
+          {"step":1,"observation":{...},"ms":35.2,"terminal":false,"cache":"hit"|"miss"|null},
           ...
-        ]
+        ],
+        "tool_cache": {"hits": int, "misses": int}
       }
     """
     trace: List[Dict[str, Any]] = []
+    final: Dict[str, Any] = {}
+    # the unwrapped stream: a failure raises here (a 500) rather than ending in an "error" event
+    events = _astream_agent(user_msg, max_steps=max_steps, stream_tokens=False,
+                            max_seconds=max_seconds, max_tokens=max_tokens)
+    async for ev in events:
+        if ev["event"] in TRACE_EVENTS:
+            trace.append(ev["data"])
+        elif ev["event"] == "final":
+            final = ev["data"]
+    cache = [t.get("cache") for t in trace if "observation" in t]
+    return {"type": "final", "answer": final.get("answer", ""), "steps": final.get("steps", max_steps),
+            "elapsed_ms": final.get("elapsed_ms"), "llm_tokens": final.get("llm_tokens"),
+            "tool_cache": {"hits": cache.count("hit"), "misses": cache.count("miss")}, "trace": trace}
+
+class _Budget:
+    """Wall-clock and LLM-token allowance for one agent request (0 / None = unlimited)."""
+    def __init__(self, max_seconds: Optional[float], max_tokens: Optional[int]):
+        self.max_seconds = AGENT_MAX_SECONDS if max_seconds is None else max_seconds
+        self.max_tokens = AGENT_MAX_TOKENS if max_tokens is None else max_tokens
+        self.t0 = time.perf_counter()
+        self.tokens = 0
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.t0) * 1000, 1)
+
+    def exceeded(self) -> Optional[str]:
+        if self.max_seconds and self.elapsed_ms() >= self.max_seconds * 1000:
+            return "time"
+        if self.max_tokens and self.tokens >= self.max_tokens:
+            return "tokens"
+        return None
+
+def _ms(t0: float) -> float:
+    return round((time.perf_counter() - t0) * 1000, 1)
+
+async def _astream_synthesis(user_msg: str, tool_name: str, tool_output: Dict[str, Any],
+                             budget: _Budget) -> AsyncIterator[str]:
+    prompt = STREAM_SYNTH_PROMPT.format(
+        user_msg=user_msg,
+        tool_name=tool_name,
+        tool_output=json.dumps(tool_output, ensure_ascii=False)[:6000],
+    )
+    async for chunk in _llm().astream(prompt):
+        usage = getattr(chunk, "usage_metadata", None)
+        if usage:
+            budget.tokens += usage.get("total_tokens", 0)
+        if chunk.content:
+            yield chunk.content
+
+def _final(answer: str, steps: int, budget: _Budget, obs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    cites = obs.get("citations", []) if isinstance(obs, dict) else []
+    return {"event": "final", "data": {"type": "final", "answer": answer, "steps": steps, "citations": cites,
+                                       "elapsed_ms": budget.elapsed_ms(), "llm_tokens": budget.tokens}}
+
+def _is_terminal(tool: Dict[str, Any], obs: Any) -> bool:
+    # a terminal tool's output is already the user-facing answer (unless it failed)
+    return bool(tool.get("terminal")) and isinstance(obs, dict) and bool(obs.get("answer")) and "error" not in obs
+
+async def _arun_tool(name: str, tool: Dict[str, Any], args: Dict[str, Any], stream_tokens: bool,
+                     out: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs one tool, yielding token events when it can stream its (terminal) answer.
+    The observation is left in out["obs"], the cache outcome in out["cache"].
+    """
+    if not (stream_tokens and tool.get("terminal") and tool.get("astream")):
+        out["obs"], out["cache"] = await _acall_cached(name, tool, args)
+        return
+    t0 = time.perf_counter()
+    policy = tool.get("cache")
+    if policy:
+        hit, obs = tool_cache.lookup(name, policy, args)
+        out["cache"] = "hit" if hit else "miss"
+        if hit:
+            out["obs"] = obs
+            record("tool", name, t0, time.perf_counter(), {"stream": True, "cache": "hit"})
+            yield {"event": "token", "data": {"text": obs["answer"]}}
+            return
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + _timeout(tool)
+    events = tool["astream"](args).__aiter__()
+    try:
+        while True:
+            try:
+                ev = await asyncio.wait_for(events.__anext__(), deadline - loop.time())
+            except StopAsyncIteration:
+                break
+            if ev["event"] == "token":
+                yield ev
+            else:
+                out["obs"] = ev["data"]
+    except asyncio.TimeoutError:
+        out["obs"] = {"error": f"timed out after {_timeout(tool):g}s"}
+    except Exception as e:
+        out["obs"] = {"error": str(e)}
+    finally:
+        # also on timeout/abandonment: closes the tool's LLM stream and its HTTP connection now, not at GC
+        await events.aclose()
+    record("tool", name, t0, time.perf_counter(), {"stream": True, "cache": out.get("cache")})
+    _after_call(name, tool, args, out.get("obs"))
+
+async def _afast_path(r: Route, stream_tokens: bool, budget: _Budget) -> AsyncIterator[Dict[str, Any]]:
+    """One routed tool call; the answer is formatted from its output, no LLM."""
+    args = dict(r.args)
+    yield {"event": "plan", "data": {"step": 1, "plan": {"action": "tool", "name": r.name, "args": args},
+                                     "ms": 0.0, "tokens": 0, "prompt_tokens": 0}}
+    yield {"event": "tool_start", "data": {"step": 1, "tool_call": {"name": r.name, "args": args}}}
+    t0 = time.perf_counter()
+    obs, cache = await _acall_cached(r.name, TOOLS[r.name], args)
+    yield {"event": "tool_end", "data": {"step": 1, "observation": obs, "ms": _ms(t0), "terminal": True,
+                                         "cache": cache}}
+    answer = format_answer(r, obs)
+    if stream_tokens:
+        yield {"event": "token", "data": {"text": answer}}
+    yield _final(answer, 1, budget, obs)
+
+async def astream_agent(user_msg: str, max_steps: int = 3, stream_tokens: bool = True,
+                        max_seconds: Optional[float] = None,
+                        max_tokens: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    _astream_agent's events; if the LLM, a retriever or the DB fails mid-stream the last
+    event is {"event":"error","data":{"error":"...","fatal":true}} (tool failures stay
+    non-fatal "error" observations), so SSE clients always see the stream end.
+    """
+    events = _astream_agent(user_msg, max_steps, stream_tokens, max_seconds, max_tokens)
+    try:
+        async for ev in events:
+            yield ev
+    except Exception as e:
+        yield {"event": "error", "data": {"error": f"{type(e).__name__}: {e}", "fatal": True}}
+    finally:
+        await events.aclose()
+
+async def _astream_agent(user_msg: str, max_steps: int = 3, stream_tokens: bool = True,
+                         max_seconds: Optional[float] = None,
+                         max_tokens: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Agent loop as an event stream (arun_agent collects it):
+      {"event":"route","data":{"step":1,"route":{"path":"fast","rule":"holiday"}}}
+      {"event":"plan","data":{"step":1,"plan":{...},"ms":...,"tokens":...,"prompt_tokens":...}}
+      {"event":"tool_start","data":{"step":1,"tool_call":{"name":"...","args":{...}}}}
+      {"event":"tool_end","data":{"step":1,"observation":{...},"ms":...,"terminal":bool,"cache":...}}
+      (an "action":"tools" plan gives one tool_start per call, then one tool_end per call, in
+       call order, each with "index"; the calls run concurrently and fail independently)
+      {"event":"budget","data":{"step":2,"budget":{"exceeded":"time"|"tokens",...}}}
+      {"event":"token","data":{"text":"..."}}        final-answer text as it arrives (stream_tokens=True)
+      {"event":"final","data":{"type":"final","answer":"...","steps":n,"citations":[...],
+                               "elapsed_ms":...,"llm_tokens":...}}
+    The loop ends early when a terminal tool (TOOLS[name]["terminal"]) returns an
+    answer, and stops planning once the wall-clock or token budget is spent.
+    """
+    budget = _Budget(max_seconds, max_tokens)
     last_obs: Optional[Dict[str, Any]] = None
     last_tool_name: Optional[str] = None
     context_for_planner = user_msg
 
+    r = route(user_msg) if AGENT_FAST_PATH else None
+    yield {"event": "route", "data": {"step": 1, "route": {"path": "fast" if r else "planner",
+                                                          "rule": r.rule if r else None}}}
+    if r is not None:
+        async for ev in _afast_path(r, stream_tokens, budget):
+            yield ev
+        return
+
+    steps = 0
     for step in range(1, max_steps + 1):
-        plan = plan_step(context_for_planner)
-        trace.append({"step": step, "plan": plan})
+        exceeded = budget.exceeded()
+        if exceeded:
+            yield {"event": "budget", "data": {"step": step, "budget": {
+                "exceeded": exceeded, "elapsed_ms": budget.elapsed_ms(), "llm_tokens": budget.tokens,
+                "max_seconds": budget.max_seconds, "max_tokens": budget.max_tokens}}}
+            break
+        steps = step
+
+        t0 = time.perf_counter()
+        out, usage = await _allm(_planner_prompt(context_for_planner))
+        budget.tokens += usage["total"]
+        plan = _parse_plan(out)
+        yield {"event": "plan", "data": {"step": step, "plan": plan, "ms": _ms(t0), "tokens": usage["total"],
+                                         "prompt_tokens": usage["prompt"]}}
 
         if plan.get("action") == "final":
-            return {"type": "final", "answer": plan.get("answer",""), "steps": step, "trace": trace}
+            answer = plan.get("answer","")
+            if stream_tokens:
+                yield {"event": "token", "data": {"text": answer}}
+            yield _final(answer, step, budget, last_obs)
+            return
+
+        calls = plan.get("calls") if plan.get("action") == "tools" else None
+        if isinstance(calls, list) and len(calls) == 1 and isinstance(calls[0], dict):
+            plan = {"action": "tool", "name": calls[0].get("name"), "args": calls[0].get("args", {})}
+        elif isinstance(calls, list) and calls and all(isinstance(c, dict) for c in calls):
+            for i, c in enumerate(calls):
+                yield {"event": "tool_start", "data": {"step": step, "index": i,
+                                                       "tool_call": {"name": c.get("name"), "args": c.get("args", {})}}}
+            results = await _arun_calls(calls)
+            for i, (obs, ms, cache) in enumerate(results):
+                yield {"event": "tool_end", "data": {"step": step, "index": i, "observation": obs,
+                                                     "ms": ms, "terminal": False, "cache": cache}}
+            last_obs = {
+                "results": [{"name": c.get("name"), "observation": r[0]} for c, r in zip(calls, results)],
+                "citations": [x for obs, _, _ in results if isinstance(obs, dict) for x in obs.get("citations", [])],
+            }
+            last_tool_name = ", ".join(str(c.get("name")) for c in calls)
+            # all observations go back to the planner together
+            context_for_planner = _feedback(user_msg, [{"name": c.get("name"), "result": summarize_observation(
+                c.get("name"), obs)} for c, (obs, _, _) in zip(calls, results)])
+            continue
 
         if plan.get("action") == "tool":
             name = plan.get("name")
             args = plan.get("args", {})
             tool = TOOLS.get(name)
+            yield {"event": "tool_start", "data": {"step": step, "tool_call": {"name": name, "args": args}}}
             if not tool:
                 err = {"error": f"Unknown tool '{name}'."}
-                trace.append({"step": step, "tool_call": {"name": name, "args": args}})
-                trace.append({"step": step, "observation": err})
-                return {"type": "final", "answer": err["error"], "steps": step, "trace": trace}
-
-            trace.append({"step": step, "tool_call": {"name": name, "args": args}})
-            try:
-                obs = tool["fn"](args)
-            except Exception as e:
-                obs = {"error": str(e)}
+                yield {"event": "tool_end", "data": {"step": step, "observation": err, "ms": 0.0, "terminal": False}}
+                yield _final(err["error"], step, budget)
+                return
 
-            trace.append({"step": step, "observation": obs})
+            t0 = time.perf_counter()
+            res: Dict[str, Any] = {}
+            async for ev in _arun_tool(name, tool, args, stream_tokens, res):
+                yield ev
+            obs = res.get("obs")
+            terminal = _is_terminal(tool, obs)
+            yield {"event": "tool_end", "data": {"step": step, "observation": obs, "ms": _ms(t0), "terminal": terminal,
+                                                 "cache": res.get("cache")}}
+            if terminal:
+                yield _final(obs["answer"], step, budget, obs)
+                return
             last_obs = obs
             last_tool_name = name
-            # feed observation back to planner context
-            context_for_planner = f"{user_msg}\n(Previous result: {json.dumps(obs, ensure_ascii=False)[:2000]})"
+            context_for_planner = _feedback(user_msg, summarize_observation(name, obs))
             continue
 
         # planner returned something unexpected
         err = "Planner returned an unsupported action."
-        trace.append({"step": step, "error": err})
-        return {"type": "final", "answer": err, "steps": step, "trace": trace}
+        yield {"event": "error", "data": {"step": step, "error": err}}
+        yield _final(err, step, budget)
+        return
 
-    # step limit reached → synthesize with last observation if any
+    # step limit or budget reached → synthesize with last observation if any
     if last_obs is not None and last_tool_name is not None:
-        final = synthesize(user_msg, last_tool_name, last_obs)
-        trace.append({"synthesis": {"from_tool": last_tool_name}})
-        return {"type": "final", "answer": final, "steps": max_steps, "trace": trace}
+        t0 = time.perf_counter()
+        if stream_tokens:
+            parts: List[str] = []
+            async for text in _astream_synthesis(user_msg, last_tool_name, last_obs, budget):
+                parts.append(text)
+                yield {"event": "token", "data": {"text": text}}
+            final = "".join(parts).strip()
+        else:
+            out, usage = await _allm(_synth_prompt(user_msg, last_tool_name, last_obs))
+            budget.tokens += usage["total"]
+            final = _parse_synth(out, last_obs)
+        yield {"event": "synthesis", "data": {"synthesis": {"from_tool": last_tool_name}, "ms": _ms(t0)}}
+        yield _final(final, steps, budget, last_obs)
+        return
 
-    return {"type":"final","answer":"I couldn't decide on a next action.","steps": max_steps, "trace": trace}
+    yield _final("I couldn't decide on a next action.", steps, budget)
@@ -0,0 +1,151 @@
+# agent/router.py
+"""
+Deterministic fast path in front of the LLM planner.
+- route(user_msg) -> Route | None
+- format_answer(route, observation) -> str
+
+A message is routed only when exactly one rule matches it unambiguously:
+  holiday        an ISO date + "holiday"                  -> check_holiday
+  status_change  approve/reject/cancel + one request id   -> *_leave_request
+  list           list/show ... requests (+ name, status)  -> list_leave_requests
+                 (only when every word is understood: one user, at most one status)
+  create         request PTO for <name> from <date> to <date> -> create_leave_request
+Everything else (no match, two matches, negation, "my ...") goes to the planner.
+The answer is formatted from the tool output, so a routed message makes no LLM call.
+"""
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+from .tools import STATUS_ALIASES
+
+class Route(NamedTuple):
+    rule: str
+    name: str
+    args: Dict[str, Any]
+
+_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+_UUID = re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I)
+_NEGATION = re.compile(r"\b(not|don't|dont|do not|never|shouldn't|should i|can i|how)\b", re.I)
+_FIRST_PERSON = re.compile(r"\b(my|mine|me|our|i)\b", re.I)
+
+_HOLIDAY = re.compile(r"\bholidays?\b", re.I)
+_VERBS = {"approve": "approve_leave_request", "reject": "reject_leave_request",
+          "cancel": "cancel_leave_request"}
+_VERB = re.compile(r"\b(approve|reject|cancel)\b", re.I)
+_LIST = re.compile(r"^\s*(list|show|get|display|what are)\b.*\brequests?\b", re.I)
+_STATUS = re.compile(r"\b(" + "|".join(STATUS_ALIASES) + r")\b", re.I)
+_POSSESSIVE = re.compile(r"\b([a-z][\w.-]*)(?:'s|’s)\b", re.I)
+_FOR_NAME = re.compile(r"\bfor\s+([a-z][\w.-]*)\b", re.I)
+_CREATE = re.compile(r"^\s*(request|book|take|apply for|file)\b.*\b(pto|leave|vacation|time off|day off)\b", re.I)
+_REASON = re.compile(r"\b(?:reason\s*[:=]?|because)\s*(.+?)[\s).]*$", re.I)
+# a list message must be made of these words plus the captured name/status; anything
+# else (another name, "by/from/of <x>", "and", an email) means it wasn't fully parsed
+_LIST_WORDS = {"list", "show", "get", "display", "what", "are", "all", "the", "leave", "pto", "vacation",
+               "request", "requests", "please", "for", "everyone", "everybody", "current"}
+_LIST_UNSURE = re.compile(r"@|,|\b(and|or|by|from|of)\b", re.I)
+_WORD = re.compile(r"[\w.'’-]+")
+# words that can follow "for" / precede "'s" without being a user name
+_NOT_NAMES = {"all", "everyone", "everybody", "anyone", "the", "a", "an", "each", "leave", "pto",
+              "vacation", "time", "day", "approval", "review", "today", "tomorrow", "team", "company"}
+
+def _name(pattern: re.Pattern, text: str) -> Optional[str]:
+    for m in pattern.finditer(text):
+        word = m.group(1)
+        if word.lower() not in _NOT_NAMES and word.lower() not in STATUS_ALIASES:
+            return word
+    return None
+
+def _holiday(msg: str) -> Optional[Route]:
+    dates = _DATE.findall(msg)
+    if _HOLIDAY.search(msg) and len(set(dates)) == 1 and not _VERB.search(msg):
+        return Route("holiday", "check_holiday", {"date_str": dates[0]})
+    return None
+
+def _status_change(msg: str) -> Optional[Route]:
+    verbs = {v.lower() for v in _VERB.findall(msg)}
+    ids = {i.lower() for i in _UUID.findall(msg)}
+    if len(verbs) == 1 and len(ids) == 1:
+        return Route("status_change", _VERBS[verbs.pop()], {"id": ids.pop()})
+    return None
+
+def _list(msg: str) -> Optional[Route]:
+    if not _LIST.search(msg) or _UUID.search(msg) or _DATE.search(msg) or _VERB.search(msg):
+        return None
+    if _FIRST_PERSON.search(msg):  # the agent doesn't know who "my" is
+        return None
+    args: Dict[str, Any] = {}
+    statuses = {STATUS_ALIASES[s.lower()] for s in _STATUS.findall(msg)}
+    if len(statuses) > 1:
+        return None
+    if statuses:
+        args["status"] = statuses.pop()
+    if _LIST_UNSURE.search(msg):
+        return None
+    names = {n for n in (_name(_POSSESSIVE, msg), _name(_FOR_NAME, msg)) if n}
+    if len(names) > 1:
+        return None
+    if names:
+        args["user"] = next(iter(names))
+    for word in _WORD.findall(msg):
+        word = re.sub(r"(?:'s|’s)$", "", word.strip(".-'’")).lower()
+        if word and word not in _LIST_WORDS and word not in STATUS_ALIASES and word != (args.get("user") or "").lower():
+            return None  # a word we didn't account for, e.g. "list alice requests"
+    return Route("list", "list_leave_requests", args)
+
+def _create(msg: str) -> Optional[Route]:
+    m = _CREATE.search(msg)
+    dates = _DATE.findall(msg)
+    if not m or len(dates) != 2 or _UUID.search(msg) or _FIRST_PERSON.search(msg):
+        return None
+    user = _name(_FOR_NAME, msg)
+    if not user:
+        return None
+    reason = _REASON.search(msg)
+    return Route("create", "create_leave_request", {
+        "user": user, "start_date": dates[0], "end_date": dates[1],
+        "reason": reason.group(1) if reason else m.group(2),
+    })
+
+_RULES = (_holiday, _status_change, _list, _create)
+
+def route(user_msg: str) -> Optional[Route]:
+    """The single unambiguous tool call for `user_msg`, or None to use the planner."""
+    if _NEGATION.search(user_msg):
+        return None
+    matches = [r for r in (rule(user_msg) for rule in _RULES) if r is not None]
+    return matches[0] if len(matches) == 1 else None
+
+# --- deterministic answers from tool output ---
+
+def _fmt_request(r: Dict[str, Any]) -> str:
+    return f"{r['id']} — {r['user']}, {r['start_date']} to {r['end_date']}, {r['status']} ({r['reason']})"
+
+def format_answer(r: Route, obs: Dict[str, Any]) -> str:
+    if isinstance(obs, dict) and obs.get("error") and obs.get("ok") is not False:
+        return f"Sorry, that didn't work: {obs['error']}"
+    if r.name == "check_holiday":
+        res = obs["result"]
+        if res["is_holiday"]:
+            return f"Yes — {res['date']} is a company holiday ({res['name']})."
+        return f"No — {res['date']} is not a company holiday."
+    if r.name == "list_leave_requests":
+        rows: List[Dict[str, Any]] = obs["requests"]
+        scope = "".join([f" for {r.args['user']}" if "user" in r.args else "",
+                         f" with status {r.args['status']}" if "status" in r.args else ""])
+        if not rows:
+            return f"No leave requests found{scope}."
+        plus = "+" if obs.get("next_cursor") else ""  # one page; older requests exist
+        lines = [f"{len(rows)}{plus} leave request{'s' if len(rows) != 1 else ''}{scope}:"]
+        lines += [f"- {_fmt_request(x)}" for x in rows[:10]]
+        if len(rows) > 10:
+            lines.append(f"…and {len(rows) - 10}{plus} more.")
+        return "\n".join(lines)
+    if r.name == "create_leave_request":
+        c = obs["created"]
+        return (f"Created leave request {c['id']} for {c['user']}, "
+                f"{c['start_date']} to {c['end_date']} (status: {c['status']}).")
+    # approve / reject / cancel
+    verb = r.name.split("_", 1)[0]
+    if not obs.get("ok"):
+        return f"Couldn't {verb} {r.args['id']}: {obs.get('error', 'unknown error')}."
+    return f"Leave request {r.args['id']} is now {obs['request']['status']}."
@@ -0,0 +1,93 @@
+# agent/tool_cache.py
+"""
+Result cache for read-only agent tools, driven by the policy in each TOOLS entry:
+
+    "cache": {
+        "ttl": 30,                               # seconds
+        "key": fn(args) -> dict,                 # normalized args; the cache key
+        "invalidated_by": {"create_leave_request", ...},
+    }
+
+and, on write tools,
+
+    "invalidates": fn(args, observation) -> dict  # e.g. {"user": "alice"}
+
+After a successful write, entries of every tool that lists the writer in
+`invalidated_by` are dropped when their key agrees with the returned scope
+(a key without that field - "all users" - always agrees). An empty scope
+drops all of them.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+def default_key(args: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v.strip().casefold() if isinstance(v, str) else v for k, v in (args or {}).items()}
+
+def _freeze(key: Dict[str, Any]) -> Hashable:
+    return tuple(sorted((k, repr(v)) for k, v in key.items()))
+
+class ToolCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries  # per tool
+        self._lock = threading.Lock()
+        self._entries: Dict[str, "OrderedDict[Hashable, Tuple[float, Dict[str, Any], Any]]"] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, name: str, what: str):
+        st = self._stats.setdefault(name, {"hits": 0, "misses": 0, "invalidated": 0})
+        st[what] += 1
+
+    def lookup(self, name: str, policy: Dict[str, Any], args: Dict[str, Any]) -> Tuple[bool, Any]:
+        key = policy.get("key", default_key)(args)
+        with self._lock:
+            entries = self._entries.get(name)
+            hit = entries.get(_freeze(key)) if entries else None
+            if hit is not None and hit[0] > time.monotonic():
+                self._count(name, "hits")
+                return True, hit[2]
+            self._count(name, "misses")
+            return False, None
+
+    def store(self, name: str, policy: Dict[str, Any], args: Dict[str, Any], value: Any):
+        key = policy.get("key", default_key)(args)
+        with self._lock:
+            entries = self._entries.setdefault(name, OrderedDict())
+            entries[_freeze(key)] = (time.monotonic() + policy["ttl"], key, value)
+            entries.move_to_end(_freeze(key))
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def invalidate(self, writer: str, scope: Optional[Dict[str, Any]], tools: Dict[str, Dict[str, Any]]) -> int:
+        """Drop entries made stale by a successful `writer` call; returns how many."""
+        dropped = 0
+        with self._lock:
+            for name, spec in tools.items():
+                policy = spec.get("cache")
+                if not policy or writer not in policy.get("invalidated_by", ()):
+                    continue
+                entries = self._entries.get(name, {})
+                for k, (_, key, _) in list(entries.items()):
+                    if not scope or all(key.get(f) in (None, v) for f, v in scope.items()):
+                        del entries[k]
+                        dropped += 1
+                        self._count(name, "invalidated")
+        return dropped
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = {}
+            for name, st in self._stats.items():
+                total = st["hits"] + st["misses"]
+                out[name] = {**st, "size": len(self._entries.get(name, {})),
+                             "hit_ratio": round(st["hits"] / total, 4) if total else 0.0}
+            return out
+
+tool_cache = ToolCache()
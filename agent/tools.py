@@ -1,16 +1,25 @@
 # agent/tools.py
-from typing import Any, Dict, Callable, List
+import json
+from typing import Any, AsyncIterator, Awaitable, Dict, Callable, List
+import httpx
 import requests
 from tools.doc_search import doc_search
 from tools.holiday_check import check_holiday
 from tools.leave_request import (
-    create_leave_request, list_leave_requests,
-    approve_leave_request, reject_leave_request, cancel_leave_request
+    create_leave_request, list_leave_requests_page,
+    approve_leave_request, reject_leave_request, cancel_leave_request,
+    acreate_leave_request, alist_leave_requests_page,
+    aapprove_leave_request, areject_leave_request, acancel_leave_request,
 )
-from tools.qa_chain import build_qa_chain, ask
-_qa = build_qa_chain(k=5)
+from tools.qa_chain import get_qa_chain, aget_qa_chain, ask_cached, aask_cached, astream_ask
+from tools.concurrency import run_cpu
+from config import AGENT_LIST_LIMIT
+from rag.embeddings import normalize_query
+from rag.vectorstore import get_corpus_version
+from .tool_cache import tool_cache
 
 ToolFn = Callable[[Dict[str, Any]], Dict[str, Any]]
+AsyncToolFn = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
 
 # --- Safe HTTP tool (allowlist) ---
 ALLOW_HTTP = ("http://localhost:8000", "https://httpbin.org")
@@ -74,13 +83,23 @@ def tool_create_leave(args: Dict[str, Any]) -> Dict[str, Any]:
     return {"created": req}
 
 
-def tool_list_leave(args: Dict[str, Any]) -> Dict[str, Any]:
-    user = _clean_user(args.get("user"))
+def _list_filters(args: Dict[str, Any]) -> Dict[str, Any]:
     status = args.get("status")
     if isinstance(status, str):
         status = STATUS_ALIASES.get(status.lower().strip(), status.lower().strip())
-    rows = list_leave_requests(user=user, status=status)
-    return {"requests": rows, "count": len(rows)}
+    return {"user": _clean_user(args.get("user")), "status": status,
+            "limit": AGENT_LIST_LIMIT, "cursor": args.get("cursor") or None}
+
+def _list_obs(page: Dict[str, Any]) -> Dict[str, Any]:
+    # one keyset page, newest first; next_cursor (when present) is the planner's "cursor" for more
+    rows = page["requests"]
+    obs = {"requests": rows, "count": len(rows)}
+    if page["next_cursor"]:
+        obs["next_cursor"] = page["next_cursor"]
+    return obs
+
+def tool_list_leave(args: Dict[str, Any]) -> Dict[str, Any]:
+    return _list_obs(list_leave_requests_page(**_list_filters(args)))
 
 def tool_approve_leave(args: Dict[str, Any]) -> Dict[str, Any]:
     return approve_leave_request(args["id"])
@@ -103,7 +122,7 @@ TOOLS: Dict[str, Dict[str, Any]] = {
         "fn": tool_doc_search,
     },
     "create_leave_request": {
-        "description": "Create a leave request (user, start_date, end_date, reason).",
+        "description": "Create a leave request (dates YYYY-MM-DD).",
         "schema": {"type":"object","properties":{
             "user":{"type":"string"},"start_date":{"type":"string"},
             "end_date":{"type":"string"},"reason":{"type":"string"}},
@@ -121,44 +140,43 @@ TOOLS: Dict[str, Dict[str, Any]] = {
         "schema": {"type":"object","properties":{"url":{"type":"string"},"params":{"type":"object"}},
                    "required":["url"]},
         "fn": http_get,
+        "timeout": 20,
     },
     "http_post": {
         "description": "HTTP POST to allowed URLs (localhost:8000).",
         "schema": {"type":"object","properties":{"url":{"type":"string"},"json":{"type":"object"}},
                    "required":["url"]},
         "fn": http_post,
+        "timeout": 20,
     },
 }
 
-_qa = build_qa_chain(k=5)
 def tool_rag_answer(args: Dict[str, Any]) -> Dict[str, Any]:
     q = args.get("query", "")
-    ans, srcs = ask(_qa, q)
-    cites = [{"source": d.metadata.get("source"),
-              "section": d.metadata.get("h2") or d.metadata.get("h1") or d.metadata.get("h3","")} for d in srcs]
-    return {"answer": ans, "citations": cites}
+    ans, srcs = ask_cached(get_qa_chain(), q)
+    return {"answer": ans, "citations": _cites(srcs)}
 
-# register it
+def _cites(srcs) -> List[Dict[str, Any]]:
+    return [{"source": d.metadata.get("source"),
+             "section": d.metadata.get("h2") or d.metadata.get("h1") or d.metadata.get("h3","")} for d in srcs]
+
+# register it; "terminal": its output is the cited, user-ready answer, so the agent stops there
 TOOLS["rag_answer"] = {
     "description": "Answer HR policy questions using RAG with citations.",
     "schema": {"type":"object","properties":{"query":{"type":"string"}},"required":["query"]},
     "fn": tool_rag_answer,
+    "terminal": True,
+    "timeout": 30,
 }
 
-def tool_list_leave(args: Dict[str, Any]) -> Dict[str, Any]:
-    user = args.get("user")
-    rows = list_leave_requests(user)
-    return {"requests": rows, "count": len(rows)}
-
 TOOLS["list_leave_requests"] = {
-    "description": "List leave requests; optional filters: user, status(submitted|approved|rejected|cancelled).",
-    "schema": {"type":"object","properties":{"user":{"type":"string"},"status":{"type":"string"}}, "required":[]},
+    "description": "List leave requests, newest first; status is submitted|approved|rejected|cancelled; "
+                   "pass next_cursor as cursor for more.",
+    "schema": {"type":"object","properties":{"user":{"type":"string"},"status":{"type":"string"},
+                                             "cursor":{"type":"string"}}, "required":[]},
     "fn": tool_list_leave,
 }
 
-def tool_cancel_leave(args: Dict[str, Any]) -> Dict[str, Any]:
-    return cancel_leave_request(args["id"])
-
 TOOLS["cancel_leave_request"] = {
     "description": "Cancel a leave request by id.",
     "schema": {"type":"object","properties":{"id":{"type":"string"}},"required":["id"]},
@@ -173,4 +191,188 @@ TOOLS["reject_leave_request"] = {
     "description": "Reject a leave request by id.",
     "schema": {"type":"object","properties":{"id":{"type":"string"}},"required":["id"]},
     "fn": tool_reject_leave,
-}
\ No newline at end of file
+}
+
+# --- async variants (used by arun_agent): I/O awaited natively, CPU work on the bounded pool ---
+async def ahttp_get(args: Dict[str, Any]) -> Dict[str, Any]:
+    url = args.get("url"); params = args.get("params") or {}
+    if not url or not url.startswith(ALLOW_HTTP):
+        return {"error": "URL not allowed"}
+    async with httpx.AsyncClient(timeout=15) as c:
+        r = await c.get(url, params=params)
+    return {"status": r.status_code, "json": _safe_json(r)}
+
+async def ahttp_post(args: Dict[str, Any]) -> Dict[str, Any]:
+    url = args.get("url"); payload = args.get("json") or {}
+    if not url or not url.startswith(ALLOW_HTTP):
+        return {"error": "URL not allowed"}
+    async with httpx.AsyncClient(timeout=15) as c:
+        r = await c.post(url, json=payload)
+    return {"status": r.status_code, "json": _safe_json(r)}
+
+async def atool_doc_search(args: Dict[str, Any]) -> Dict[str, Any]:
+    return await run_cpu(tool_doc_search, args)
+
+async def atool_rag_answer(args: Dict[str, Any]) -> Dict[str, Any]:
+    ans, srcs = await aask_cached(await aget_qa_chain(), args.get("query", ""))
+    return {"answer": ans, "citations": _cites(srcs)}
+
+async def astream_rag_answer(args: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    # token events, then {"event": "citations", "data": {"answer", "citations"}} (same shape as the observation)
+    async for ev in astream_ask(await aget_qa_chain(), args.get("query", "")):
+        yield ev
+
+async def atool_create_leave(args: Dict[str, Any]) -> Dict[str, Any]:
+    req = await acreate_leave_request(
+        user=args["user"],
+        start_date=args["start_date"],
+        end_date=args["end_date"],
+        reason=args["reason"],
+    )
+    return {"created": req}
+
+async def atool_list_leave(args: Dict[str, Any]) -> Dict[str, Any]:
+    return _list_obs(await alist_leave_requests_page(**_list_filters(args)))
+
+async def atool_approve_leave(args: Dict[str, Any]) -> Dict[str, Any]:
+    return await aapprove_leave_request(args["id"])
+
+async def atool_reject_leave(args: Dict[str, Any]) -> Dict[str, Any]:
+    return await areject_leave_request(args["id"])
+
+async def atool_cancel_leave(args: Dict[str, Any]) -> Dict[str, Any]:
+    return await acancel_leave_request(args["id"])
+
+async def atool_check_holiday(args: Dict[str, Any]) -> Dict[str, Any]:
+    return tool_check_holiday(args)
+
+_ASYNC_TOOLS: Dict[str, AsyncToolFn] = {
+    "doc_search": atool_doc_search,
+    "create_leave_request": atool_create_leave,
+    "check_holiday": atool_check_holiday,
+    "http_get": ahttp_get,
+    "http_post": ahttp_post,
+    "rag_answer": atool_rag_answer,
+    "list_leave_requests": atool_list_leave,
+    "cancel_leave_request": atool_cancel_leave,
+    "approve_leave_request": atool_approve_leave,
+    "reject_leave_request": atool_reject_leave,
+}
+for _name, _afn in _ASYNC_TOOLS.items():
+    TOOLS[_name]["afn"] = _afn
+TOOLS["rag_answer"]["astream"] = astream_rag_answer
+
+# --- result caching for read-only tools (agent/tool_cache.py) ---
+def _query_key(args: Dict[str, Any]) -> Dict[str, Any]:
+    # answers go stale on re-ingest, like the semantic answer cache
+    return {"query": normalize_query(args.get("query", "")), "k": int(args.get("k", 5)),
+            "corpus": get_corpus_version()}
+
+def _list_key(args: Dict[str, Any]) -> Dict[str, Any]:
+    # same normalization atool_list_leave applies; user names stay case-sensitive like the DB filter
+    f = _list_filters(args)
+    return {"user": f["user"] or None, "status": f["status"] or None, "cursor": f["cursor"]}
+
+def _affected_user(args: Dict[str, Any], obs: Dict[str, Any]) -> Dict[str, Any]:
+    req = obs.get("created") or obs.get("request") or {}
+    return {"user": req["user"]} if req.get("user") else {}
+
+LEAVE_WRITE_TOOLS = {"create_leave_request", "approve_leave_request", "reject_leave_request", "cancel_leave_request"}
+
+_CACHE_POLICIES: Dict[str, Dict[str, Any]] = {
+    "check_holiday": {"ttl": 24 * 3600},
+    "doc_search": {"ttl": 300, "key": _query_key},
+    "rag_answer": {"ttl": 300, "key": _query_key},
+    "list_leave_requests": {"ttl": 30, "key": _list_key, "invalidated_by": LEAVE_WRITE_TOOLS},
+}
+for _name, _policy in _CACHE_POLICIES.items():
+    TOOLS[_name]["cache"] = _policy
+for _name in LEAVE_WRITE_TOOLS:
+    TOOLS[_name]["invalidates"] = _affected_user
+
+def invalidate_after_write(name: str, args: Dict[str, Any], obs: Any) -> int:
+    """Drop cached tool results made stale by a successful write (agent or REST)."""
+    spec = TOOLS.get(name) or {}
+    if "invalidates" not in spec or not isinstance(obs, dict) or "error" in obs:
+        return 0
+    return tool_cache.invalidate(name, spec["invalidates"](args, obs), TOOLS)
+
+# --- planner feedback: what the planner needs from each observation, not the raw payload ---
+_OBS_TEXT_CHARS = 300
+_OBS_MAX_ITEMS = 10
+
+def _short(text: Any, n: int = _OBS_TEXT_CHARS) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= n else text[:n - 1] + "…"
+
+def _brief_request(r: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: r.get(k) for k in ("id", "user", "start_date", "end_date", "status")}
+
+def _summarize_answer(obs: Dict[str, Any]) -> Dict[str, Any]:
+    return {"answer": _short(obs.get("answer", ""), 600),
+            "sources": [f"{c.get('source')} — {c.get('section')}" for c in obs.get("citations", [])[:3]]}
+
+def _summarize_snippets(obs: Dict[str, Any]) -> Dict[str, Any]:
+    return {"snippets": [{"source": c.get("source"), "section": c.get("section"), "text": _short(s)}
+                         for s, c in zip(obs.get("snippets", []), obs.get("citations", []))]}
+
+def _summarize_list(obs: Dict[str, Any]) -> Dict[str, Any]:
+    rows = obs.get("requests", [])
+    out = {"count": obs.get("count", len(rows)), "requests": [_brief_request(r) for r in rows[:_OBS_MAX_ITEMS]]}
+    if len(rows) > _OBS_MAX_ITEMS:
+        out["more"] = len(rows) - _OBS_MAX_ITEMS
+    if obs.get("next_cursor"):
+        out["next_cursor"] = obs["next_cursor"]
+    return out
+
+def _summarize_write(obs: Dict[str, Any]) -> Dict[str, Any]:
+    req = obs.get("created") or obs.get("request")
+    out = {k: obs[k] for k in ("ok", "previous_status") if obs.get(k) is not None}
+    return {**out, "request": _brief_request(req)} if req else out
+
+def _summarize_http(obs: Dict[str, Any]) -> Dict[str, Any]:
+    return {"status": obs.get("status"), "json": _short(json.dumps(obs.get("json"), ensure_ascii=False), 1000)}
+
+_SUMMARIZERS = {
+    "rag_answer": _summarize_answer,
+    "doc_search": _summarize_snippets,
+    "list_leave_requests": _summarize_list,
+    "http_get": _summarize_http,
+    "http_post": _summarize_http,
+    **{name: _summarize_write for name in LEAVE_WRITE_TOOLS},
+}
+for _name, _summarize in _SUMMARIZERS.items():
+    TOOLS[_name]["summarize"] = _summarize
+
+def summarize_observation(name: str, obs: Any) -> Any:
+    """Compact, JSON-able view of a tool result for the planner prompt (TOOLS[name]["summarize"])."""
+    if isinstance(obs, dict) and "error" in obs:
+        return {"error": _short(obs["error"])}
+    summarize = (TOOLS.get(name) or {}).get("summarize")
+    if summarize is not None and isinstance(obs, dict):
+        return summarize(obs)
+    return _short(json.dumps(obs, ensure_ascii=False, separators=(",", ":")), 1000)
+
+# --- planner tool catalog, compiled from TOOLS ---
+_TYPES = {"string": "", "integer": ":int", "number": ":num", "boolean": ":bool", "object": ":obj", "array": ":list"}
+
+def _signature(name: str, schema: Dict[str, Any]) -> str:
+    required = set(schema.get("required", []))
+    params = [f"{p}{_TYPES.get(s.get('type'), '')}{'' if p in required else '?'}"
+              for p, s in schema.get("properties", {}).items()]
+    return f"{name}({', '.join(params)})"
+
+def compile_catalog() -> str:
+    """One line per tool: `name(arg, opt?, n:int?): description` (arguments are strings unless typed)."""
+    return "\n".join(f"{_signature(name, spec['schema'])}: {spec['description']}" for name, spec in TOOLS.items())
+
+_catalog = compile_catalog()
+
+def tool_catalog() -> str:
+    return _catalog
+
+def register_tool(name: str, spec: Dict[str, Any]):
+    """Add or replace a tool after import; the planner sees it from the next plan on."""
+    global _catalog
+    TOOLS[name] = spec
+    _catalog = compile_catalog()
@@ -1,14 +1,48 @@
 # api/app.py (excerpt)
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import Optional
-from tools.leave_request import create_leave_request, list_leave_requests, approve_leave_request, reject_leave_request, get_leave_request
+import asyncio
+import json
+import re
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Optional
+from tools.leave_request import (
+    acreate_leave_request, alist_leave_requests_page, aapprove_leave_request,
+    areject_leave_request, aget_leave_request, aexport_leave_requests, check_status,
+    abulk_create_leave_requests, abulk_set_status, check_bulk_ids,
+)
 from tools.holiday_check import check_holiday, list_holidays, next_holidays
-from tools.qa_chain import build_qa_chain, ask
-from agent.react_agent import run_agent
+from tools.qa_chain import aget_qa_chain, aask_cached, astream_ask
+from tools.answer_cache import answer_cache
+from tools.singleflight import SingleFlight, question_key
+from agent.react_agent import arun_agent, astream_agent
+from agent.tools import invalidate_after_write
+from agent.tool_cache import tool_cache
+from tools.llm_client import llm_cache_stats
+from tools.tracing import HTTP_SECONDS, collect, render_metrics
+from tools.resources import resources
+from tools.concurrency import run_cpu
+from rag.embeddings import embeddings_loaded, get_embeddings
 from fastapi.middleware.cors import CORSMiddleware
+from config import COALESCE_ENABLED, LEAVE_BULK_MAX, LEAVE_PAGE_MAX, LEAVE_PAGE_SIZE, STARTUP_WARMUP
+
+# Nothing heavy is built at import (tools/resources.py). With the default
+# "background" warm-up the server answers /health/live at once and
+# /health/ready turns 200 when models and indexes are loaded.
+_warmup = None  # keeps the background warm-up task referenced
 
-app = FastAPI(title="PolicyBot API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _warmup
+    if STARTUP_WARMUP == "blocking":
+        await run_cpu(resources.warm_up)
+    elif STARTUP_WARMUP == "background":
+        _warmup = asyncio.ensure_future(run_cpu(resources.warm_up))
+    yield
+
+app = FastAPI(title="PolicyBot API", lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",
@@ -21,8 +55,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
-qa = build_qa_chain(k=5)
+
+class HTTPMetrics:
+    """Pure ASGI middleware: each request is timed until the last body chunk is sent,
+    so streamed responses (SSE, exports) are measured to completion, not first byte.
+    Labelled by route template so /leave-requests/{req_id} is one series."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        t0, status, done = time.perf_counter(), ["500"], [False]
+
+        def observe():
+            done[0] = True
+            route = scope.get("route")  # set by the router once matched
+            HTTP_SECONDS.observe(time.perf_counter() - t0, scope["method"],
+                                 getattr(route, "path", "unmatched"), status[0])
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                observe()
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            if not done[0]:  # error or client gone before the last chunk
+                observe()
+
+app.add_middleware(HTTPMetrics)
 
 class LeaveRequestIn(BaseModel):
     user: str
@@ -30,64 +98,224 @@ class LeaveRequestIn(BaseModel):
     end_date: str
     reason: str
 
+class BulkCreateIn(BaseModel):
+    requests: List[LeaveRequestIn] = Field(min_length=1, max_length=LEAVE_BULK_MAX)
+    atomic: bool = False  # true: any failed item rolls back the whole batch
+
+class BulkIdsIn(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=LEAVE_BULK_MAX)  # unique; duplicates are a 422
+    atomic: bool = False
+
+    @field_validator("ids")
+    @classmethod
+    def _unique(cls, ids: List[str]) -> List[str]:
+        check_bulk_ids(ids)
+        return ids
+
 class ChatIn(BaseModel):
     user: str
     message: str
 
 class AgentIn(BaseModel):
-    user: str = "pranshav"
+    user: Optional[str] = None  # who is asking; user-scoped messages without it are never coalesced
     message: str
     trace: bool = False
 
+# Routes are async: LLM, SQLite and HTTP calls are awaited on the event loop and
+# CPU-bound retrieval runs on tools.concurrency's bounded pool, so slow Groq
+# round trips never tie up threadpool workers (or queue /health).
+
 @app.post("/leave-requests")
-def api_create_leave(req: LeaveRequestIn):
-    return create_leave_request(req.user, req.start_date, req.end_date, req.reason)
+async def api_create_leave(req: LeaveRequestIn):
+    created = await acreate_leave_request(req.user, req.start_date, req.end_date, req.reason)
+    invalidate_after_write("create_leave_request", req.model_dump(), {"created": created})
+    return created
+
+def _invalidate_bulk(tool: str, res: Dict[str, Any]):
+    # one invalidation per affected user, not per item
+    by_user = {}
+    for r in res["results"]:
+        if r["ok"]:
+            by_user.setdefault((r.get("created") or r["request"])["user"], r)
+    for r in by_user.values():
+        invalidate_after_write(tool, {}, r)
 
-@app.get("/leave-requests")
-def api_list_leave(user: Optional[str] = None):
-    return list_leave_requests(user)
+# bulk routes are declared before /leave-requests/{req_id}/..., which would match "bulk"
+@app.post("/leave-requests/bulk")
+async def api_bulk_create_leave(body: BulkCreateIn):
+    res = await abulk_create_leave_requests([r.model_dump() for r in body.requests], atomic=body.atomic)
+    _invalidate_bulk("create_leave_request", res)
+    return res
+
+async def _bulk_status(body: BulkIdsIn, status: str, tool: str) -> Dict[str, Any]:
+    res = await abulk_set_status(body.ids, status, atomic=body.atomic)
+    _invalidate_bulk(tool, res)
+    return res
+
+@app.post("/leave-requests/bulk/approve")
+async def api_bulk_approve_leave(body: BulkIdsIn):
+    return await _bulk_status(body, "approved", "approve_leave_request")
+
+@app.post("/leave-requests/bulk/reject")
+async def api_bulk_reject_leave(body: BulkIdsIn):
+    return await _bulk_status(body, "rejected", "reject_leave_request")
+
+@app.post("/leave-requests/bulk/cancel")
+async def api_bulk_cancel_leave(body: BulkIdsIn):
+    return await _bulk_status(body, "cancelled", "cancel_leave_request")
+
+@app.get("/leave-requests")  # list with optional filters, one keyset page at a time
+async def api_list_leave(response: Response, user: Optional[str] = None, status: Optional[str] = None,
+                         limit: int = Query(LEAVE_PAGE_SIZE, ge=1, le=LEAVE_PAGE_MAX),
+                         cursor: Optional[str] = None):
+    # newest first; X-Next-Cursor (absent on the last page) goes back as ?cursor= for the next page
+    try:
+        page = await alist_leave_requests_page(user=user, status=status, limit=limit, cursor=cursor)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return page["requests"]
+
+@app.get("/leave-requests/export")  # before /leave-requests/{req_id}, which would match "export"
+async def api_export_leave(user: Optional[str] = None, status: Optional[str] = None,
+                           format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    # every matching row, streamed; validate up front - once streaming starts the status code is sent
+    try:
+        check_status(status)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv; charset=utf-8"
+    return StreamingResponse(aexport_leave_requests(user=user, status=status, fmt=format), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="leave_requests.{format}"'})
 
 @app.get("/leave-requests/{req_id}")
-def api_get_leave(req_id: str):
-    return get_leave_request(req_id)
+async def api_get_leave(req_id: str):
+    return await aget_leave_request(req_id)
 
 @app.get("/holidays/{date_str}")
-def api_check_holiday(date_str: str):
+async def api_check_holiday(date_str: str):
     return check_holiday(date_str)
 
 @app.get("/holidays")
-def api_list_all(year: Optional[int] = None):
+async def api_list_all(year: Optional[int] = None):
     return list_holidays(year)
 
 @app.get("/holidays/next")
-def api_next(n: int = 5, start_date: Optional[str] = None):
+async def api_next(n: int = 5, start_date: Optional[str] = None):
     return next_holidays(n=n, start_date=start_date)
 
+# Identical questions arriving while one is being answered share that answer.
+# Policy questions are the same for everyone; agent messages that refer to the
+# caller ("my requests", "approve ...") are only coalesced per user, and not at
+# all when the client didn't say who is asking (Slack doesn't send a user).
+chat_flight = SingleFlight("chat")
+agent_flight = SingleFlight("agent")
+
+_USER_SCOPED = re.compile(
+    r"\b(i|me|my|mine|i'm|i've|approve|reject|cancel|request|requests|apply|book|take)\b", re.I)
+
+def _agent_key(message: str, user: Optional[str]):
+    key = question_key(message)
+    if not _USER_SCOPED.search(key):
+        return (key, None)
+    return (key, user) if user else None  # None: don't coalesce
+
 @app.post("/chat")
-def api_chat(q: ChatIn):
-    ans, srcs = ask(qa, q.message)
+async def api_chat(q: ChatIn):
+    if COALESCE_ENABLED:
+        ans, srcs = await chat_flight.do(question_key(q.message), aask_cached, await aget_qa_chain(), q.message)
+    else:
+        ans, srcs = await aask_cached(await aget_qa_chain(), q.message)
     cites = [(d.metadata.get("source"),
               d.metadata.get("h2") or d.metadata.get("h1") or d.metadata.get("h3",""))
              for d in srcs]
     return {"answer": ans, "citations": cites}
 
 @app.post("/agent")
-def api_agent(body: AgentIn):
-    res = run_agent(body.message)
-    return res if body.trace else {k: v for k, v in res.items() if k not in {"trace"}}
+async def api_agent(body: AgentIn):
+    if body.trace:
+        # traced runs are not coalesced, so the spans belong to this request
+        with collect() as spans:
+            res = await arun_agent(body.message)
+        return {**res, "spans": sorted(spans, key=lambda s: s["start_ms"])}
+    key = _agent_key(body.message, body.user) if COALESCE_ENABLED else None
+    if key is not None:
+        res = await agent_flight.do(key, arun_agent, body.message)
+    else:
+        res = await arun_agent(body.message)
+    return {k: v for k, v in res.items() if k not in {"trace"}}
+
+def _sse(events):
+    """Server-sent events: `event: <name>` + `data: <json>` per agent/QA event."""
+    async def body():
+        async for ev in events:
+            yield f"event: {ev['event']}\ndata: {json.dumps(ev['data'], ensure_ascii=False)}\n\n"
+    return StreamingResponse(body(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/chat/stream")
+async def api_chat_stream(q: ChatIn):
+    return _sse(astream_ask(await aget_qa_chain(), q.message))
 
-@app.get("/leave-requests")  # list with optional filters
-def api_list_leave(user: Optional[str] = None, status: Optional[str] = None):
-    return list_leave_requests(user=user, status=status)
+@app.post("/agent/stream")
+async def api_agent_stream(body: AgentIn):
+    if body.trace:
+        async def traced():
+            with collect() as spans:
+                async for ev in astream_agent(body.message):
+                    yield ev
+            yield {"event": "spans", "data": {"spans": sorted(spans, key=lambda s: s["start_ms"])}}
+        return _sse(traced())
+    events = astream_agent(body.message)
+    async def brief():
+        # progress events stay; tool outputs are only sent with trace=true
+        async for ev in events:
+            if ev["event"] == "tool_end":
+                obs = ev["data"]["observation"]
+                data = {k: v for k, v in ev["data"].items() if k in ("step", "index", "ms", "cache")}
+                ev = {"event": "tool_end", "data": {**data, "ok": not (isinstance(obs, dict) and "error" in obs)}}
+            yield ev
+    return _sse(brief())
 
 @app.post("/leave-requests/{req_id}/approve")
-def api_approve_leave(req_id: str):
-    return approve_leave_request(req_id)
+async def api_approve_leave(req_id: str):
+    res = await aapprove_leave_request(req_id)
+    invalidate_after_write("approve_leave_request", {"id": req_id}, res)
+    return res
 
 @app.post("/leave-requests/{req_id}/reject")
-def api_reject_leave(req_id: str):
-    return reject_leave_request(req_id)
+async def api_reject_leave(req_id: str):
+    res = await areject_leave_request(req_id)
+    invalidate_after_write("reject_leave_request", {"id": req_id}, res)
+    return res
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats")
+async def stats():
+    return {
+        # lexical mode never loads the embedding model; stats must not load it either
+        "embedding_cache": get_embeddings().stats() if embeddings_loaded() else None,
+        "answer_cache": answer_cache.stats(),
+        "coalescing": {"chat": chat_flight.stats(), "agent": agent_flight.stats()},
+        "tool_cache": tool_cache.stats(),
+        "llm_cache": llm_cache_stats(),
+    }
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
\ No newline at end of file
+@app.get("/health/live")
+async def health():
+    # liveness: the process serves requests (never touches models or the DB)
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+async def health_ready():
+    # readiness: warm-up finished, so the first real request won't pay for model loading
+    status = resources.status()
+    if resources.ready():
+        return {"status": "ready", "resources": status}
+    failed = any(st["state"] == "failed" for st in status.values())
+    return JSONResponse({"status": "failed" if failed else "warming", "resources": status}, status_code=503)
\ No newline at end of file
@@ -7,8 +7,98 @@ load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
 
+# LLM response cache (tools/llm_client.py): off | cache | record | replay.
+# replay serves recorded responses only - no network, reproducible benchmarks.
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "cache").lower()
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.db")
+# bounds for "cache" mode (recordings made with record/replay never expire): entries older
+# than the TTL are misses, and the oldest rows past the cap are pruned on write
+LLM_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "10000"))
+
 # Embeddings
 EMBED_MODEL = os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 
 # Chroma settings (local persistent store)
 CHROMA_DIR = os.getenv("CHROMA_DIR", "vectorstore/chroma_policybot")
+
+# Query-embedding cache (LRU); set EMBED_CACHE_PATH to persist it across restarts
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "1024"))
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "")
+
+# Semantic answer cache for /chat and rag_answer (cosine similarity of questions)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+
+# Retrieval backend: "chroma" (default) or "numpy" (in-process rag.index.VectorIndex,
+# built by scripts/ingest_minimal.py and memory-mapped from NUMPY_INDEX_DIR)
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "chroma").lower()
+NUMPY_INDEX_DIR = os.getenv("NUMPY_INDEX_DIR", "vectorstore/numpy_index")
+
+# Approximate search for VectorIndex (IVF): exact below ANN_MIN_SIZE rows,
+# otherwise probe ANN_NPROBE of the coarse lists
+ANN_MIN_SIZE = int(os.getenv("ANN_MIN_SIZE", "20000"))
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "16"))
+
+# VectorIndex storage: "float32", "float16" or "int8"; compressed modes rescore
+# the best top_k * RESCORE_FACTOR rows exactly (0 disables rescoring)
+VECTOR_STORAGE = os.getenv("VECTOR_STORAGE", "float32").lower()
+RESCORE_FACTOR = int(os.getenv("RESCORE_FACTOR", "4"))
+
+# Retrieval mode: "dense" (embeddings), "lexical" (BM25 only, no embedding model)
+# or "hybrid" (BM25 + dense, reciprocal-rank fusion). BM25 is built by ingest_langchain.
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "dense").lower()
+BM25_DIR = os.getenv("BM25_DIR", "vectorstore/bm25")
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+
+# QA context packing (rag/context.py): merge overlapping chunks of a section, drop
+# near-duplicates and fit the context into CONTEXT_TOKEN_BUDGET (~4 chars/token)
+CONTEXT_PACKING = os.getenv("CONTEXT_PACKING", "true").lower() == "true"
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1000"))
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.9"))
+
+# Agent: route unambiguous messages (holiday date, approve <id>, list requests...)
+# straight to a tool without the LLM planner (agent/router.py)
+AGENT_FAST_PATH = os.getenv("AGENT_FAST_PATH", "true").lower() == "true"
+
+# Agent per-request budgets: stop planning after this much wall-clock time or
+# this many LLM tokens (0 = unlimited) and answer from what was gathered
+AGENT_MAX_SECONDS = float(os.getenv("AGENT_MAX_SECONDS", "20"))
+AGENT_MAX_TOKENS = int(os.getenv("AGENT_MAX_TOKENS", "6000"))
+
+# Agent tool calls: default per-call timeout (TOOLS[name]["timeout"] overrides) and
+# how many calls of a multi-tool plan run at once
+AGENT_TOOL_TIMEOUT = float(os.getenv("AGENT_TOOL_TIMEOUT", "15"))
+AGENT_TOOL_CONCURRENCY = int(os.getenv("AGENT_TOOL_CONCURRENCY", "4"))
+
+# Agent list_leave_requests tool: rows per call (one keyset page; next_cursor fetches more)
+AGENT_LIST_LIMIT = int(os.getenv("AGENT_LIST_LIMIT", "20"))
+
+# Coalesce identical concurrent /chat and /agent requests into one computation
+COALESCE_ENABLED = os.getenv("COALESCE_ENABLED", "true").lower() == "true"
+
+# Startup warm-up (tools/resources.py): "background" loads models and indexes after the
+# server starts listening (/health/ready is 503 until done), "blocking" before it
+# accepts requests, "off" on first use
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "background").lower()
+
+# Async path: size of the bounded pool for CPU-bound work (embedding, vector search)
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(8, os.cpu_count() or 2))))
+
+# Leave-request store
+DATABASE_PATH = os.getenv("DATABASE_PATH", "data/policybot.db")
+
+# GET /leave-requests page size (keyset pagination) and the largest ?limit= accepted
+LEAVE_PAGE_SIZE = int(os.getenv("LEAVE_PAGE_SIZE", "100"))
+LEAVE_PAGE_MAX = int(os.getenv("LEAVE_PAGE_MAX", "1000"))
+
+# most items accepted by one bulk create / approve / reject / cancel call
+LEAVE_BULK_MAX = int(os.getenv("LEAVE_BULK_MAX", "500"))
+
+# SQLite profile (db/session.py): "tuned" = WAL, synchronous=NORMAL, page cache,
+# busy timeout and a sized connection pool; "default" = SQLite's stock settings
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "tuned").lower()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_MB = int(os.getenv("SQLITE_CACHE_MB", "16"))
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
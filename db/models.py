@@ -1,15 +1,25 @@
 # db/models.py
-from sqlalchemy import Column, String, Date, DateTime
+from sqlalchemy import Column, String, Date, DateTime, Index
 from datetime import datetime
 from db.session import Base
 
 class LeaveRequest(Base):
     __tablename__ = "leave_requests"
     id = Column(String, primary_key=True)                 # uuid
-    user = Column(String, index=True, nullable=False)
+    user = Column(String, nullable=False)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
     reason = Column(String, nullable=False)
-    status = Column(String, index=True, nullable=False)   # submitted|approved|rejected|cancelled
+    status = Column(String, nullable=False)               # submitted|approved|rejected|cancelled
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime)
+
+    # one per list_leave_requests shape (filters, then the keyset ORDER BY created_at DESC, id DESC),
+    # so no query sorts in a temp b-tree and a page seeks straight to its cursor;
+    # db.session.ensure_schema() adds them to existing DBs
+    __table_args__ = (
+        Index("ix_leave_requests_user_status_keyset", "user", "status", "created_at", "id"),
+        Index("ix_leave_requests_user_keyset", "user", "created_at", "id"),
+        Index("ix_leave_requests_status_keyset", "status", "created_at", "id"),
+        Index("ix_leave_requests_keyset", "created_at", "id"),
+    )
@@ -1,7 +1,95 @@
 # db/session.py
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
+from config import (
+    DATABASE_PATH, SQLITE_PROFILE, SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_MB, SQLITE_POOL_SIZE,
+)
+from tools.tracing import record
 
-engine = create_engine("sqlite:///data/policybot.db", future=True)
+# SQLITE_PROFILE=tuned: WAL (readers never wait for the writer), synchronous=NORMAL
+# (durable across app crashes; a power loss may drop the last commits), a bigger page
+# cache, and writers queue on busy_timeout instead of failing with "database is locked".
+# "default" keeps SQLite's stock settings (rollback journal, FULL sync) for comparison.
+def _engine_kwargs():
+    if SQLITE_PROFILE != "tuned":
+        return {}
+    # one pool per engine, sized for the threadpool / CPU pool plus bursts
+    return {"pool_size": SQLITE_POOL_SIZE, "max_overflow": SQLITE_POOL_SIZE, "pool_timeout": 30}
+
+def _set_pragmas(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    for pragma in (
+        "journal_mode=WAL",
+        "synchronous=NORMAL",
+        f"busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"cache_size=-{SQLITE_CACHE_MB * 1024}",  # negative = KiB
+        "temp_store=MEMORY",
+    ):
+        cur.execute(f"PRAGMA {pragma}")
+    cur.close()
+
+engine = create_engine(f"sqlite:///{DATABASE_PATH}", future=True, **_engine_kwargs())
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
+
+# async access for the FastAPI event loop (aiosqlite runs SQLite off-loop)
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{DATABASE_PATH}", **_engine_kwargs())
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+if SQLITE_PROFILE == "tuned":
+    for _engine in (engine, async_engine.sync_engine):
+        event.listen(_engine, "connect", _set_pragmas)
+
+# every statement on either engine is a "db" span (tools.tracing), named by its verb
+def _before(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("policybot_t0", []).append(time.perf_counter())
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    t0 = conn.info["policybot_t0"].pop()
+    record("db", statement.lstrip().split(None, 1)[0].upper(), t0, time.perf_counter(),
+           {"rows": cursor.rowcount} if cursor.rowcount >= 0 else None)
+
+def _error(ctx):
+    stack = ctx.connection.info.get("policybot_t0") if ctx.connection is not None else None
+    if stack:
+        stack.pop()
+
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", _before)
+    event.listen(_engine, "after_cursor_execute", _after)
+    event.listen(_engine, "handle_error", _error)
+
+# superseded by the composite indexes on LeaveRequest (db/models.py)
+_LEGACY_INDEXES = (
+    "ix_leave_requests_user", "ix_leave_requests_status",
+    "ix_leave_requests_user_status_created", "ix_leave_requests_user_created",
+    "ix_leave_requests_status_created", "ix_leave_requests_created",
+)
+
+def _schema_objects(conn) -> dict:
+    return {name: kind for name, kind in conn.exec_driver_sql(
+        "SELECT name, type FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'")}
+
+def ensure_schema() -> list:
+    """Create missing tables and indexes, drop superseded ones and refresh planner stats.
+    Idempotent and safe to race: every worker runs it in the startup warm-up, so each
+    statement is IF [NOT] EXISTS. Also run by scripts/db_init.py. Returns the changes made."""
+    import db.models  # noqa: F401  registers the tables on Base
+    with engine.begin() as conn:
+        before = _schema_objects(conn)
+        for table in Base.metadata.tables.values():
+            conn.execute(CreateTable(table, if_not_exists=True))
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+        for name in _LEGACY_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        after = _schema_objects(conn)
+        changes = [f"created {'table ' if kind == 'table' else ''}{name}"
+                   for name, kind in after.items() if name not in before]
+        changes += [f"dropped {name}" for name in _LEGACY_INDEXES if name in before and name not in after]
+        if changes:
+            conn.exec_driver_sql("ANALYZE")
+    return changes
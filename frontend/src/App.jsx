@@ -1,5 +1,5 @@
 import { useEffect, useRef, useState } from "react";
-import { askAgent } from "./api";
+import { streamAgent } from "./api";
 import ChatMessage from "./components/ChatMessage";
 import Trace from "./components/Trace";
 import PromptChips from "./components/PromptChips";
@@ -34,16 +34,23 @@ export default function App() {
     if (!content) return;
     setMessages((m) => [...m, { role: "user", text: content }]);
     setInput(""); setLoading(true);
+    // placeholder bubble filled in as answer tokens stream
+    setMessages((m) => [...m, { role: "assistant", text: "" }]);
+    const setLast = (patch) =>
+      setMessages((m) => [...m.slice(0, -1), { ...m[m.length - 1], ...patch }]);
+    let streamed = "";
     try {
-      const data = await askAgent(content, traceOn);
-      const raw = data?.answer || "(no answer)";
+      const data = await streamAgent(content, traceOn, (event, payload) => {
+        if (event === "token") setLast({ text: (streamed += payload.text) });
+      });
+      const raw = data?.answer || streamed || "(no answer)";
       const m = raw.match(/\(([^()]+)\s—\s([^()]+)\)\s*$/);
       const citation = m ? `(${m[1]} — ${m[2]})` : null;
       const text = m ? raw.slice(0, m.index).trim() : raw;
-      setMessages((m) => [...m, { role: "assistant", text, citation }]);
+      setLast({ text, citation });
       setLastTrace(data?.trace || null);
     } catch (e) {
-      setMessages((m) => [...m, { role: "assistant", text: `Server error: ${e.message}` }]);
+      setLast({ text: `Server error: ${e.message}` });
       console.error(e);
     } finally {
       setLoading(false);
@@ -11,3 +11,39 @@ export async function askAgent(message, trace=false) {
     throw new Error(typeof detail === "string" ? detail : JSON.stringify(detail));
   }
 }
+
+// POST /agent/stream and parse the server-sent events as they arrive.
+// onEvent(name, data) is called per event; resolves with the "final" payload
+// plus the collected trace events.
+export async function streamAgent(message, trace = false, onEvent = () => {}) {
+  const url = API_BASE ? `${API_BASE}/agent/stream` : `/agent/stream`;
+  const res = await fetch(url, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ message, trace }),
+  });
+  if (!res.ok || !res.body) throw new Error(`${res.status} ${await res.text()}`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  const events = [];
+  let buf = "", final = null;
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buf += decoder.decode(value, { stream: true });
+    let sep;
+    while ((sep = buf.indexOf("\n\n")) >= 0) {
+      const chunk = buf.slice(0, sep);
+      buf = buf.slice(sep + 2);
+      const name = chunk.match(/^event: (.*)$/m)?.[1];
+      const data = chunk.match(/^data: (.*)$/m)?.[1];
+      if (!name || data === undefined) continue;
+      const parsed = JSON.parse(data);
+      onEvent(name, parsed);
+      if (name === "final") final = parsed;
+      else if (name !== "token") events.push(parsed);
+    }
+  }
+  return { ...(final || {}), trace: trace ? events : undefined };
+}
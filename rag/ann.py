@@ -0,0 +1,84 @@
+"""
+IVF (inverted file) coarse quantizer for approximate search over VectorIndex.
+
+build(): spherical k-means on a sample picks `nlist` centroids, then every row is
+assigned to its nearest centroid. search probes the `nprobe` closest lists and
+scores only the rows in them. Recall/latency are traded with nprobe
+(nprobe == nlist is exact).
+"""
+
+from typing import Optional
+import numpy as np
+
+_BATCH = 65536  # rows per matmul when assigning, bounds temporary memory
+
+def _assign(vecs: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    out = np.empty(len(vecs), dtype=np.int32)
+    for s in range(0, len(vecs), _BATCH):
+        out[s:s + _BATCH] = np.argmax(vecs[s:s + _BATCH] @ centroids.T, axis=1)
+    return out
+
+class IVF:
+    def __init__(self, nlist: Optional[int] = None, n_iter: int = 10,
+                 sample_size: Optional[int] = None, seed: int = 0):
+        self.nlist = nlist
+        self.n_iter = n_iter
+        self.sample_size = sample_size
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None   # (nlist, D)
+        self.assign: np.ndarray = np.empty(0, dtype=np.int32)  # list id per row
+        self._order: Optional[np.ndarray] = None     # rows sorted by list
+        self._offsets: Optional[np.ndarray] = None   # list l -> _order[off[l]:off[l+1]]
+
+    def build(self, vecs: np.ndarray) -> "IVF":
+        n = len(vecs)
+        nlist = min(self.nlist or max(1, int(4 * np.sqrt(n))), n)
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(n, self.sample_size or max(64 * nlist, 10000))
+        sample = np.asarray(vecs[np.sort(rng.choice(n, sample_size, replace=False))], dtype=np.float32)
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(self.n_iter):
+            labels = _assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            empty = counts == 0
+            # re-seed empty lists from random sample rows
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = sums / (np.linalg.norm(sums, axis=1, keepdims=True) + 1e-12)
+
+        self.nlist = nlist
+        self.centroids = centroids
+        self.assign = _assign(vecs, centroids)
+        self._finalize()
+        return self
+
+    def add(self, vecs: np.ndarray):
+        """Assign newly added rows (appended after the existing ones) to their lists."""
+        self.assign = np.concatenate([self.assign, _assign(vecs, self.centroids)])
+        self._finalize()
+
+    def _finalize(self):
+        self._order = np.argsort(self.assign, kind="stable").astype(np.int64)
+        counts = np.bincount(self.assign, minlength=self.nlist)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def candidates(self, query_vec: np.ndarray, nprobe: int) -> np.ndarray:
+        """Row indices in the `nprobe` lists closest to the query."""
+        nprobe = min(nprobe, self.nlist)
+        scores = self.centroids @ query_vec
+        lists = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        return np.concatenate([self._order[self._offsets[l]:self._offsets[l + 1]] for l in lists])
+
+    def save(self, path: str):
+        np.savez(path, centroids=self.centroids, assign=self.assign)
+
+    @classmethod
+    def load(cls, path: str) -> "IVF":
+        data = np.load(path)
+        ivf = cls(nlist=len(data["centroids"]))
+        ivf.centroids = data["centroids"]
+        ivf.assign = data["assign"]
+        ivf._finalize()
+        return ivf
@@ -0,0 +1,121 @@
+# rag/bm25.py
+"""
+Compact BM25 inverted index over the same chunks that go into Chroma.
+- BM25Index.build(docs) / save(path) / load(path)
+- search(query, k) -> [(doc_index, score)]
+
+Postings are stored CSR-style: one int32 doc-id array and one float32 tf array
+for the whole vocabulary, sliced per term by `offsets`. Scoring touches only
+the postings of the query terms.
+"""
+
+from __future__ import annotations
+import json
+import os
+import re
+from typing import Dict, List, Tuple
+import numpy as np
+from langchain_core.documents import Document
+
+ARRAYS_FILE = "bm25.npz"
+DOCS_FILE = "bm25_docs.json"
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from",
+    "how", "i", "if", "in", "is", "it", "may", "must", "my", "of", "on", "or", "s",
+    "the", "to", "what", "when", "with", "you", "your",
+}
+
+def tokenize(text: str) -> List[str]:
+    # "doctor’s note" -> ["doctor", "note"]; "June 30" -> ["june", "30"]
+    return [t for t in _TOKEN.findall(text.lower().replace("’", "'")) if t not in STOPWORDS]
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab: Dict[str, int] = {}
+        self.docs: List[Document] = []
+        self.doc_ids = np.empty(0, dtype=np.int32)   # postings: doc index
+        self.tfs = np.empty(0, dtype=np.float32)     # postings: term frequency
+        self.offsets = np.zeros(1, dtype=np.int64)   # term t -> [offsets[t], offsets[t+1])
+        self.idf = np.empty(0, dtype=np.float32)
+        self.doc_len = np.empty(0, dtype=np.float32)
+        self.norm = np.empty(0, dtype=np.float32)    # per-doc k1 * length normalization (_finish)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def build(self, docs: List[Document]) -> "BM25Index":
+        self.docs = list(docs)
+        per_term: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = []
+        for i, d in enumerate(self.docs):
+            toks = tokenize(d.page_content)
+            lengths.append(len(toks))
+            counts: Dict[str, int] = {}
+            for t in toks:
+                counts[t] = counts.get(t, 0) + 1
+            for t, c in counts.items():
+                per_term.setdefault(t, []).append((i, c))
+
+        self.vocab = {t: j for j, t in enumerate(sorted(per_term))}
+        postings = [per_term[t] for t in sorted(per_term)]
+        df = np.array([len(p) for p in postings], dtype=np.float32)
+        self.offsets = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+        self.doc_ids = np.array([i for p in postings for i, _ in p], dtype=np.int32)
+        self.tfs = np.array([c for p in postings for _, c in p], dtype=np.float32)
+        n = len(self.docs)
+        self.idf = np.log(1.0 + (n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        self.doc_len = np.array(lengths, dtype=np.float32)
+        return self._finish()
+
+    def _finish(self) -> "BM25Index":
+        # query-independent part of the tf saturation denominator, computed once per index
+        avg = max(float(self.doc_len.mean()), 1e-9) if len(self.doc_len) else 1.0
+        self.norm = (self.k1 * (1 - self.b + self.b * self.doc_len / avg)).astype(np.float32)
+        return self
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        if not self.docs:
+            return []
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        norm = self.norm
+        for t in set(tokenize(query)):
+            j = self.vocab.get(t)
+            if j is None:
+                continue
+            lo, hi = self.offsets[j], self.offsets[j + 1]
+            ids, tf = self.doc_ids[lo:hi], self.tfs[lo:hi]
+            scores[ids] += self.idf[j] * tf * (self.k1 + 1) / (tf + norm[ids])
+        hits = np.flatnonzero(scores)
+        k = min(k, len(hits))
+        if k == 0:
+            return []
+        top = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        np.savez(os.path.join(path, ARRAYS_FILE), doc_ids=self.doc_ids, tfs=self.tfs,
+                 offsets=self.offsets, idf=self.idf, doc_len=self.doc_len)
+        with open(os.path.join(path, DOCS_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "k1": self.k1, "b": self.b,
+                "terms": sorted(self.vocab, key=self.vocab.get),
+                "docs": [{"text": d.page_content, "meta": d.metadata} for d in self.docs],
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with open(os.path.join(path, DOCS_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(k1=meta["k1"], b=meta["b"])
+        index.vocab = {t: j for j, t in enumerate(meta["terms"])}
+        index.docs = [Document(page_content=d["text"], metadata=d["meta"]) for d in meta["docs"]]
+        arrays = np.load(os.path.join(path, ARRAYS_FILE))
+        for name in ("doc_ids", "tfs", "offsets", "idf", "doc_len"):
+            setattr(index, name, arrays[name])
+        return index._finish()
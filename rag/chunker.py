@@ -0,0 +1,52 @@
+# rag/chunker.py
+"""
+Headings-aware markdown chunker for the in-process VectorIndex path.
+- chunk_markdown(text, chunk_size, overlap, source) -> [{"id", "text", "meta"}]
+
+Sections are split on #/##/### headings; each section body is cut into windows
+of `chunk_size` words with `overlap` words shared between neighbours. Metadata
+carries the same h1/h2/h3 keys as rag.splitter, so citations look identical.
+"""
+
+import hashlib
+import json
+import re
+from typing import Any, Dict, List
+
+_HEADING = re.compile(r"^(#{1,3})\s+(.*\S)\s*$")
+
+def _sections(text: str):
+    headers: Dict[str, str] = {}
+    body: List[str] = []
+    for line in text.splitlines():
+        m = _HEADING.match(line)
+        if m:
+            if body:
+                yield dict(headers), "\n".join(body)
+                body = []
+            level = len(m.group(1))
+            headers = {k: v for k, v in headers.items() if int(k[1]) < level}
+            headers[f"h{level}"] = m.group(2)
+        elif line.strip():
+            body.append(line)
+    if body:
+        yield dict(headers), "\n".join(body)
+
+def chunk_markdown(text: str, chunk_size: int = 200, overlap: int = 40, source: str = "") -> List[Dict[str, Any]]:
+    if overlap >= chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+    step = chunk_size - overlap
+    chunks: List[Dict[str, Any]] = []
+    for headers, body in _sections(text):
+        words = body.split()
+        for start in range(0, max(len(words) - overlap, 1), step):
+            chunk = " ".join(words[start:start + chunk_size])
+            meta = {"source": source, **headers}
+            meta["section"] = headers.get("h2") or headers.get("h1") or headers.get("h3") or ""
+            key = json.dumps(meta, sort_keys=True) + "\x00" + chunk
+            chunks.append({
+                "id": hashlib.sha256(key.encode("utf-8")).hexdigest()[:32],
+                "text": chunk,
+                "meta": meta,
+            })
+    return chunks
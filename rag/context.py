@@ -0,0 +1,139 @@
+# rag/context.py
+"""
+Context assembly between retrieval and the QA prompt.
+
+rag.splitter cuts sections into 600-char chunks with 120 chars of overlap, so
+neighbouring hits from one section repeat each other. pack_context():
+1. merges chunks of the same section (source + headers) when one's tail is the
+   other's head, or one contains the other - the overlap is sent once;
+2. drops near-duplicates: blocks whose word 3-grams are mostly (>= dedup_threshold)
+   contained in a better-ranked block, e.g. the same paragraph in two policies;
+3. packs blocks in relevance order (a merged block ranks as its best chunk)
+   into `budget` tokens, cutting the first block that doesn't fit at a line or
+   sentence boundary and stopping there.
+Blocks keep their section's metadata, so citations are unchanged.
+"""
+
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+from langchain_core.documents import Document
+
+MIN_OVERLAP = 20       # chars; shorter matches are coincidence, not splitter overlap
+MIN_CUT_TOKENS = 40    # don't pack a truncated block smaller than this
+
+@dataclass(eq=False)  # identity semantics: blocks are compared and removed by object
+class _Block:
+    rank: int
+    text: str
+    meta: Dict[str, Any]
+    section: Tuple
+    chunks: int = 1
+
+def estimate_tokens(text: str) -> int:
+    # ~4 chars/token for English with the Llama tokenizers; same estimate as scripts/stub_llm.py
+    return max(1, len(text) // 4)
+
+def _section(doc: Document) -> Tuple:
+    m = doc.metadata or {}
+    return (m.get("source"), m.get("h1"), m.get("h2"), m.get("h3"))
+
+def _overlap(a: str, b: str) -> int:
+    """Length of the longest suffix of `a` that is a prefix of `b` (0 if under MIN_OVERLAP)."""
+    if len(a) < MIN_OVERLAP or len(b) < MIN_OVERLAP:
+        return 0
+    head = b[:MIN_OVERLAP]
+    start = max(0, len(a) - len(b))
+    while True:
+        p = a.find(head, start)
+        if p < 0:
+            return 0
+        if b.startswith(a[p:]):
+            return len(a) - p
+        start = p + 1
+
+def _merge(a: str, b: str) -> Optional[str]:
+    if b in a:
+        return a
+    if a in b:
+        return b
+    n = _overlap(a, b)
+    if n:
+        return a + b[n:]
+    n = _overlap(b, a)
+    if n:
+        return b + a[n:]
+    return None
+
+def _shingles(text: str) -> Set[Tuple[str, ...]]:
+    words = re.findall(r"\w+", text.lower())
+    return {tuple(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+
+def _cut(text: str, max_chars: int) -> str:
+    head = text[:max_chars]
+    for sep in ("\n", ". "):
+        i = head.rfind(sep)
+        if i > max_chars // 2:
+            return head[:i + len(sep)].rstrip()
+    return head.rstrip()
+
+def pack_context(docs: List[Document], budget: int, dedup_threshold: float = 0.9
+                 ) -> Tuple[List[Document], Dict[str, Any]]:
+    """Merge, dedupe and budget `docs` (in relevance order). Returns (blocks, stats)."""
+    # 1. merge within sections
+    blocks: List[_Block] = []
+    for rank, d in enumerate(docs):
+        block = _Block(rank, d.page_content.strip(), d.metadata, _section(d))
+        while True:  # a chunk can bridge two blocks of its section
+            for other in blocks:
+                if other is not block and other.section == block.section:
+                    text = _merge(other.text, block.text)
+                    if text is not None:
+                        break
+            else:
+                break
+            other.text, other.chunks = text, other.chunks + block.chunks
+            other.rank = min(other.rank, block.rank)
+            if block in blocks:
+                blocks.remove(block)
+            block = other
+        if block not in blocks:
+            blocks.append(block)
+    blocks.sort(key=lambda b: b.rank)
+
+    # 2. near-duplicates: keep the better-ranked block
+    kept: List[Tuple[_Block, Set]] = []
+    duplicates = 0
+    for block in blocks:
+        sh = _shingles(block.text)
+        # containment of this block in a kept one, not the reverse: a short better-ranked
+        # block inside a longer one must not drop the longer one's extra content
+        if any(len(sh & other) >= dedup_threshold * len(sh) for _, other in kept):
+            duplicates += 1
+            continue
+        kept.append((block, sh))
+
+    # 3. token budget, relevance order
+    out: List[Document] = []
+    used, truncated = 0, False
+    for block, _ in kept:
+        text, meta = block.text, block.meta if block.chunks == 1 else {**block.meta, "merged_chunks": block.chunks}
+        cost = estimate_tokens(text)
+        if used + cost > budget:
+            room = budget - used
+            if room >= MIN_CUT_TOKENS or not out:
+                text, truncated = _cut(text, room * 4), True
+                cost = estimate_tokens(text)
+                out.append(Document(page_content=text, metadata=meta))
+                used += cost
+            break
+        out.append(Document(page_content=text, metadata=meta))
+        used += cost
+
+    stats = {
+        "chunks": len(docs), "blocks": len(out), "merged": len(docs) - len(blocks), "duplicates": duplicates,
+        "dropped": len(kept) - len(out), "truncated": truncated,
+        "tokens_in": sum(estimate_tokens(d.page_content) for d in docs), "tokens_out": used,
+    }
+    return out, stats
@@ -0,0 +1,22 @@
+from typing import List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from .embeddings import get_embeddings
+
+class Embedder:
+    """NumPy front-end to the shared embedding model: unit-norm float32 rows."""
+
+    def __init__(self, embeddings: Optional[Embeddings] = None):
+        self.embeddings = embeddings or get_embeddings()
+
+    @staticmethod
+    def _normalize(vecs: np.ndarray) -> np.ndarray:
+        return vecs / (np.linalg.norm(vecs, axis=-1, keepdims=True) + 1e-12)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vecs = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        return self._normalize(vecs)
+
+    def encode_query(self, text: str) -> np.ndarray:
+        # goes through the query-embedding cache
+        return self._normalize(np.asarray(self.embeddings.embed_query(text), dtype=np.float32))
@@ -1,6 +1,119 @@
-from langchain_huggingface import HuggingFaceEmbeddings
-from config import EMBED_MODEL
+import atexit
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from config import EMBED_MODEL, EMBED_CACHE_SIZE, EMBED_CACHE_PATH
+from tools.tracing import span
 
-def get_embeddings():
-    # Local / CPU-friendly; free
-    return HuggingFaceEmbeddings(model_name=EMBED_MODEL)
+def normalize_query(text: str) -> str:
+    # cache key only; the model always encodes the user's text (EMBED_MODEL may be cased)
+    return " ".join(text.split()).casefold()
+
+class CachedEmbeddings(Embeddings):
+    """
+    LRU cache of query embeddings in front of an Embeddings model.
+    - keys are (model name, normalized query), so changing EMBED_MODEL never serves stale vectors
+    - evicts least-recently-used entries beyond max_size
+    - optional JSON persistence at `path` (loaded on start, saved on exit / save())
+    Document embeddings (ingest) pass straight through.
+    """
+
+    def __init__(self, inner: Embeddings, model_name: str, max_size: int = 1024, path: Optional[str] = None):
+        self.inner = inner
+        self.model_name = model_name
+        self.max_size = max_size
+        self.path = path or None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        if self.path:
+            self._load()
+            atexit.register(self.save)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with span("embed", "documents", texts=len(texts)):
+            return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        with self._lock:
+            vec = self._cache.get(key)
+            if vec is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return vec
+            self.misses += 1
+        # encode outside the lock; a concurrent miss on the same key just does the work twice
+        with span("embed", "query"):
+            vec = self.inner.embed_query(text)
+        with self._lock:
+            self._cache[key] = vec
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return vec
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("model") != self.model_name:
+            return  # different embedding model → cache is invalid
+        for key, vec in data.get("entries", [])[-self.max_size:]:
+            self._cache[key] = vec
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {"model": self.model_name, "entries": list(self._cache.items())}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+_lock = threading.Lock()
+_embeddings: Optional[CachedEmbeddings] = None
+
+def embeddings_loaded() -> bool:
+    """True once get_embeddings() has loaded the model (stats never trigger the load)."""
+    return _embeddings is not None
+
+def get_embeddings() -> CachedEmbeddings:
+    """Process-wide embedding model; loaded once, shared by every retriever."""
+    global _embeddings
+    if _embeddings is None:
+        with _lock:
+            if _embeddings is None:
+                # imported here: langchain_huggingface pulls in torch + transformers (seconds)
+                from langchain_huggingface import HuggingFaceEmbeddings
+                # Local / CPU-friendly; free
+                base = HuggingFaceEmbeddings(model_name=EMBED_MODEL)
+                _embeddings = CachedEmbeddings(
+                    base, EMBED_MODEL, max_size=EMBED_CACHE_SIZE, path=EMBED_CACHE_PATH,
+                )
+    return _embeddings
@@ -1,34 +1,263 @@
-from typing import List, Dict, Any
+import json
+import os
+from typing import List, Dict, Any, Optional, Union
 import numpy as np
+from config import ANN_MIN_SIZE, ANN_NPROBE, VECTOR_STORAGE, RESCORE_FACTOR
+from .ann import IVF
+
+VECTORS_FILE = "vectors.npy"
+META_FILE = "meta.json"
+IVF_FILE = "ivf.npz"
+CODES_FILE = "codes.npy"
+SCALES_FILE = "scales.npy"
+
+STORAGE_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+_BLOCK = 4096  # rows dequantized per matmul, bounds temporary memory
+
+# {"source": "vpn_reset.md"} or {"h2": ["PTO Carryover", "PTO Accrual"]}: AND across fields, OR within a list
+Filters = Dict[str, Union[Any, List[Any]]]
 
 class VectorIndex:
-    def __init__(self):
+    """
+    In-process cosine index over unit-norm float32 vectors.
+    Rows live in a preallocated array that doubles when full, so n adds cost O(n)
+    amortized. save()/load() use a .npy + JSON pair; load() memory-maps the
+    vectors, so opening a saved index doesn't read or copy them.
+    build_ann() adds an IVF coarse quantizer (rag.ann); search then probes
+    `nprobe` lists instead of scanning every row, unless the index is smaller
+    than ANN_MIN_SIZE.
+    Scalar metadata fields are indexed into per-(field, value) row postings at
+    add time; filters are turned into boolean row masks from those, never by
+    scanning the metadata dicts at query time.
+    storage="float16" | "int8" (per-row scale) keeps a compressed copy that
+    search scans; the best `top_k * rescore_factor` rows are then rescored
+    exactly against the float32 vectors. For a loaded index those stay
+    memory-mapped, so only the shortlist's pages are ever read.
+    """
+
+    def __init__(self, dim: Optional[int] = None, capacity: int = 1024,
+                 storage: str = VECTOR_STORAGE, rescore_factor: int = RESCORE_FACTOR):
+        if storage not in STORAGE_DTYPES:
+            raise ValueError(f"storage must be one of {sorted(STORAGE_DTYPES)}")
         self.ids: List[str] = []
-        self.vecs: np.ndarray | None = None
         self.metas: List[Dict[str, Any]] = []
         self.texts: List[str] = []
+        self.dim = dim
+        self._n = 0
+        self._buf: Optional[np.ndarray] = None
+        self._initial_capacity = capacity
+        self.storage = storage
+        self.rescore_factor = rescore_factor
+        self._codes: Optional[np.ndarray] = None   # compressed rows (float16 / int8)
+        self._scales: Optional[np.ndarray] = None  # int8 only: per-row dequantization scale
+        self.ann: Optional[IVF] = None
+        self._postings: Dict[str, Dict[Any, List[int]]] = {}
+        self._mask_cache: Dict[Any, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def vecs(self) -> Optional[np.ndarray]:
+        return None if self._buf is None else self._buf[:self._n]
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._buf is None else len(self._buf)
+
+    def _reserve(self, n_more: int):
+        need = self._n + n_more
+        # memmapped (read-only) buffers are copied into RAM on first write
+        if self._buf is not None and need <= len(self._buf) and self._buf.flags.writeable:
+            return
+        cap = max(self.capacity, self._initial_capacity)
+        while cap < need:
+            cap *= 2
+        self._buf = self._grow(self._buf, (cap, self.dim), np.float32)
+        if self.storage != "float32":
+            self._codes = self._grow(self._codes, (cap, self.dim), STORAGE_DTYPES[self.storage])
+        if self.storage == "int8":
+            self._scales = self._grow(self._scales, (cap,), np.float32)
+
+    def _grow(self, old: Optional[np.ndarray], shape, dtype) -> np.ndarray:
+        new = np.empty(shape, dtype=dtype)
+        if self._n:
+            new[:self._n] = old[:self._n]
+        return new
+
+    def _quantize(self, vecs: np.ndarray):
+        """Compressed codes (+ int8 scales) for float32 rows."""
+        if self.storage == "float16":
+            return vecs.astype(np.float16), None
+        scales = np.abs(vecs).max(axis=1) / 127.0 + 1e-12
+        codes = np.clip(np.rint(vecs / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """Bytes scanned per query ("search") vs. the float32 rows used for rescoring ("full")."""
+        full = self._n * (self.dim or 0) * 4
+        if self.storage == "float32":
+            return {"search": full, "full": full}
+        search = self._codes[:self._n].nbytes + (self._scales[:self._n].nbytes if self._scales is not None else 0)
+        return {"search": search, "full": full}
 
     def add(self, ids: List[str], vecs: np.ndarray, metas: List[Dict[str, Any]], texts: List[str]):
         assert len(ids) == len(vecs) == len(metas) == len(texts)
-        if self.vecs is None:
-            self.vecs = vecs
-        else:
-            self.vecs = np.vstack([self.vecs, vecs])
+        vecs = np.asarray(vecs, dtype=np.float32)
+        if self.dim is None:
+            self.dim = vecs.shape[1]
+        elif vecs.shape[1] != self.dim:
+            raise ValueError(f"expected {self.dim}-d vectors, got {vecs.shape[1]}-d")
+        self._reserve(len(vecs))
+        self._buf[self._n:self._n + len(vecs)] = vecs
+        if self.storage != "float32":
+            codes, scales = self._quantize(vecs)
+            self._codes[self._n:self._n + len(vecs)] = codes
+            if scales is not None:
+                self._scales[self._n:self._n + len(vecs)] = scales
+        self._n += len(vecs)
+        if self.ann is not None:
+            self.ann.add(vecs)
+        self._index_metas(metas, start=self._n - len(vecs))
         self.ids.extend(ids)
         self.metas.extend(metas)
         self.texts.extend(texts)
 
-    def search(self, query_vec: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
+    def _index_metas(self, metas: List[Dict[str, Any]], start: int):
+        for row, meta in enumerate(metas, start):
+            for field, value in meta.items():
+                if isinstance(value, (str, int, float, bool)):
+                    self._postings.setdefault(field, {}).setdefault(value, []).append(row)
+        self._mask_cache.clear()
+
+    def _mask(self, field: str, value: Any) -> np.ndarray:
+        key = (field, value)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            mask = np.zeros(self._n, dtype=bool)
+            mask[self._postings.get(field, {}).get(value, [])] = True
+            self._mask_cache[key] = mask
+        return mask
+
+    def filter_mask(self, filters: Optional[Filters]) -> Optional[np.ndarray]:
+        """Boolean mask of rows matching `filters` (None = no filtering)."""
+        if not filters:
+            return None
+        allowed = np.ones(self._n, dtype=bool)
+        for field, want in filters.items():
+            values = want if isinstance(want, (list, tuple, set)) else [want]
+            field_mask = np.zeros(self._n, dtype=bool)
+            for v in values:
+                field_mask |= self._mask(field, v)
+            allowed &= field_mask
+        return allowed
+
+    def build_ann(self, nlist: Optional[int] = None, n_iter: int = 10,
+                  sample_size: Optional[int] = None) -> IVF:
+        """Train the IVF quantizer (default nlist = 4*sqrt(n)) and assign every row."""
+        self.ann = IVF(nlist=nlist, n_iter=n_iter, sample_size=sample_size).build(self.vecs)
+        return self.ann
+
+    def _score(self, Q: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """(Q, N') similarities over `rows` — exact for float32, approximate otherwise."""
+        if self.storage == "float32":
+            return Q @ (self.vecs if rows is None else self.vecs[rows]).T
+        codes = self._codes[:self._n] if rows is None else self._codes[rows]
+        sims = np.empty((len(Q), len(codes)), dtype=np.float32)
+        for s in range(0, len(codes), _BLOCK):
+            sims[:, s:s + _BLOCK] = Q @ codes[s:s + _BLOCK].astype(np.float32).T
+        if self.storage == "int8":
+            sims *= self._scales[:self._n] if rows is None else self._scales[rows]
+        return sims
+
+    def search(self, query_vec: np.ndarray, top_k: int = 5, filters: Optional[Filters] = None,
+               nprobe: Optional[int] = None, exact: bool = False) -> List[Dict[str, Any]]:
         # query_vec shape: (D,) and self.vecs normalized -> cosine = dot
-        sims = self.vecs @ (query_vec / (np.linalg.norm(query_vec) + 1e-12))
-        idxs = np.argpartition(-sims, top_k)[:top_k]
-        idxs = idxs[np.argsort(-sims[idxs])]
+        return self.search_batch(query_vec[None, :], top_k, filters, nprobe, exact)[0]
+
+    def search_batch(self, query_vecs: np.ndarray, top_k: int = 5, filters: Optional[Filters] = None,
+                     nprobe: Optional[int] = None, exact: bool = False) -> List[List[Dict[str, Any]]]:
+        """Top-k per row of `query_vecs` (Q, D), scored with a single matrix multiply."""
+        Q = np.atleast_2d(np.asarray(query_vecs, dtype=np.float32))
+        Q = Q / (np.linalg.norm(Q, axis=1, keepdims=True) + 1e-12)
+        if self._n == 0 or top_k <= 0:
+            return [[] for _ in Q]
+        allowed = self.filter_mask(filters)
+
+        rows: Optional[np.ndarray] = None   # scored columns (None = all rows)
+        keep: Optional[np.ndarray] = None   # (Q, len(rows)) per-query candidate mask
+        if not exact and self.ann is not None and self._n >= ANN_MIN_SIZE:
+            cands = [self.ann.candidates(q, nprobe or ANN_NPROBE) for q in Q]
+            rows = np.unique(np.concatenate(cands))
+            keep = np.zeros((len(Q), len(rows)), dtype=bool)
+            for r, c in enumerate(cands):
+                keep[r, np.searchsorted(rows, c)] = True
+            if allowed is not None:
+                keep &= allowed[rows]
+            if (keep.sum(axis=1) < top_k).any():  # probed lists too small → exact
+                rows = keep = None
+        if rows is None and allowed is not None:
+            rows = np.flatnonzero(allowed)
+
+        sims = self._score(Q, rows)  # (Q, N')
+        if keep is not None:
+            sims = np.where(keep, sims, -np.inf)
+        k = min(top_k, sims.shape[1])
+        if k == 0:
+            return [[] for _ in Q]
+        rescore = self.storage != "float32" and self.rescore_factor > 0
+        m = min(k * max(self.rescore_factor, 1), sims.shape[1]) if rescore else k
+        top = np.argpartition(-sims, m - 1, axis=1)[:, :m]
+
         results = []
-        for i in idxs:
-            results.append({
+        for r in range(len(Q)):
+            cols = top[r][sims[r, top[r]] > -np.inf]
+            idx = cols if rows is None else rows[cols]
+            scores = self.vecs[idx] @ Q[r] if rescore else sims[r, cols]
+            order = np.argsort(-scores)[:k]
+            results.append([{
                 "id": self.ids[i],
-                "score": float(sims[i]),
+                "score": float(sc),
                 "meta": self.metas[i],
                 "text": self.texts[i],
-            })
+            } for i, sc in zip(idx[order], scores[order])])
         return results
+
+    def save(self, path: str):
+        """Write <path>/vectors.npy (only the used rows), <path>/meta.json and any codes."""
+        os.makedirs(path, exist_ok=True)
+        vecs = self.vecs if self.vecs is not None else np.empty((0, self.dim or 0), dtype=np.float32)
+        np.save(os.path.join(path, VECTORS_FILE), vecs)
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "storage": self.storage,
+                       "ids": self.ids, "metas": self.metas, "texts": self.texts}, f)
+        if self.storage != "float32":
+            np.save(os.path.join(path, CODES_FILE), self._codes[:self._n])
+        if self.storage == "int8":
+            np.save(os.path.join(path, SCALES_FILE), self._scales[:self._n])
+        if self.ann is not None:
+            self.ann.save(os.path.join(path, IVF_FILE))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, storage: Optional[str] = None) -> "VectorIndex":
+        """Open a saved index; `storage` re-quantizes if it differs from the saved mode."""
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        vecs = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r" if mmap else None)
+        saved = meta.get("storage", "float32")
+        index = cls(dim=meta["dim"], storage=storage or saved)
+        index._buf = vecs
+        index._n = len(vecs)
+        if index.storage != "float32":
+            if index.storage == saved:
+                # compressed rows are scanned on every query: keep them in RAM
+                index._codes = np.load(os.path.join(path, CODES_FILE))
+                if saved == "int8":
+                    index._scales = np.load(os.path.join(path, SCALES_FILE))
+            else:
+                index._codes, index._scales = index._quantize(np.asarray(vecs, dtype=np.float32))
+        index.ids, index.metas, index.texts = meta["ids"], meta["metas"], meta["texts"]
+        index._index_metas(index.metas, start=0)
+        if os.path.exists(os.path.join(path, IVF_FILE)):
+            index.ann = IVF.load(os.path.join(path, IVF_FILE))
+        return index
@@ -1,13 +1,76 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import numpy as np
+from langchain_core.documents import Document
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
 from .embedder import Embedder
-from .index import VectorIndex
+from .index import VectorIndex, Filters
 
 class Retriever:
     def __init__(self, index: VectorIndex, embedder: Embedder):
         self.index = index
         self.embedder = embedder
 
-    def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        q_vec = self.embedder.encode([query])[0]  # (D,)
-        return self.index.search(q_vec, top_k=top_k)
+    def retrieve(self, query: str, top_k: int = 5, filters: Optional[Filters] = None) -> List[Dict[str, Any]]:
+        q_vec = self.embedder.encode_query(query)  # (D,)
+        return self.index.search(q_vec, top_k=top_k, filters=filters)
+
+    def retrieve_batch(self, queries: List[str], top_k: int = 5,
+                       filters: Optional[Filters] = None) -> List[List[Dict[str, Any]]]:
+        q_vecs = np.stack([self.embedder.encode_query(q) for q in queries])  # (Q, D)
+        return self.index.search_batch(q_vecs, top_k=top_k, filters=filters)
+
+class IndexRetriever(BaseRetriever):
+    """LangChain adapter so RetrievalQA / doc_search can run on a VectorIndex."""
+
+    retriever: Any
+    k: int = 5
+    filters: Optional[Dict[str, Any]] = None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return [
+            Document(page_content=h["text"], metadata={**h["meta"], "score": h["score"]})
+            for h in self.retriever.retrieve(query, top_k=self.k, filters=self.filters)
+        ]
+
+class BM25Retriever(BaseRetriever):
+    """LangChain adapter over rag.bm25.BM25Index; never touches the embedding model."""
+
+    index: Any
+    k: int = 5
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return [
+            Document(page_content=self.index.docs[i].page_content,
+                     metadata={**self.index.docs[i].metadata, "score": score})
+            for i, score in self.index.search(query, k=self.k)
+        ]
+
+class HybridRetriever(BaseRetriever):
+    """Reciprocal-rank fusion of a lexical and a dense retriever: score = sum 1 / (rrf_k + rank)."""
+
+    lexical: Any
+    dense: Any
+    k: int = 5
+    rrf_k: int = 60
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        fused: Dict[Any, float] = {}
+        docs: Dict[Any, Document] = {}
+        for ranked in (self.lexical.invoke(query), self.dense.invoke(query)):
+            for rank, d in enumerate(ranked, 1):
+                key = (d.metadata.get("source"), d.page_content)
+                fused[key] = fused.get(key, 0.0) + 1.0 / (self.rrf_k + rank)
+                docs.setdefault(key, d)
+        best = sorted(fused, key=fused.get, reverse=True)[:self.k]
+        return [
+            Document(page_content=docs[key].page_content,
+                     metadata={**docs[key].metadata, "score": fused[key]})
+            for key in best
+        ]
@@ -1,28 +1,201 @@
+import hashlib
+import json
 import os
-from typing import List
-from langchain.schema import Document
-from langchain_community.vectorstores import Chroma
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from langchain_core.documents import Document
 from .embeddings import get_embeddings
-from config import CHROMA_DIR
+from .embedder import Embedder
+from .index import VectorIndex
+from .retriever import Retriever, IndexRetriever, BM25Retriever, HybridRetriever
+from .bm25 import BM25Index
+from config import (
+    CHROMA_DIR, RETRIEVER_BACKEND, NUMPY_INDEX_DIR, VECTOR_STORAGE,
+    RETRIEVAL_MODE, BM25_DIR, HYBRID_RRF_K,
+)
+
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import Chroma
 
 VECTORSTORE_PATH = os.getenv("VECTORSTORE_PATH", "vectorstore/chroma_policybot")
 
-def upsert_documents(docs: List[Document]):
-    """Create or update a persistent Chroma DB from documents."""
-    emb = get_embeddings()
-    # If the directory exists, this will append; to rebuild, clear the folder first.
-    vs = Chroma.from_documents(
-        documents=docs,
-        embedding=emb,
-        persist_directory=CHROMA_DIR,
-    )
-    vs.persist()
-
-def get_retriever(k: int = 5):
-    """Open the persistent Chroma DB and return a retriever."""
-    emb = get_embeddings()
-    vs = Chroma(
-        embedding_function=emb,
-        persist_directory=CHROMA_DIR,
-    )
-    return vs.as_retriever(search_kwargs={"k": k})
+# One open Chroma handle per process. Retrievers are cheap views over it, so
+# every caller (doc_search, the QA chain, agent tools) shares the same collection.
+_lock = threading.Lock()
+_vectorstore = None
+_index_retriever = None
+_bm25 = None
+
+def get_vectorstore() -> "Chroma":
+    """Return the shared persistent Chroma DB, opening it on first use."""
+    global _vectorstore
+    if _vectorstore is None:
+        with _lock:
+            if _vectorstore is None:
+                from langchain_community.vectorstores import Chroma  # chromadb is slow to import
+                _vectorstore = Chroma(
+                    embedding_function=get_embeddings(),
+                    persist_directory=CHROMA_DIR,
+                )
+    return _vectorstore
+
+def get_index_retriever():
+    """Return the shared rag.retriever.Retriever over the saved VectorIndex (memory-mapped)."""
+    global _index_retriever
+    if _index_retriever is None:
+        with _lock:
+            if _index_retriever is None:
+                _index_retriever = Retriever(VectorIndex.load(NUMPY_INDEX_DIR, storage=VECTOR_STORAGE), Embedder())
+    return _index_retriever
+
+def get_bm25() -> BM25Index:
+    """Return the shared BM25 index written by scripts/ingest_langchain.py."""
+    global _bm25
+    if _bm25 is None:
+        with _lock:
+            if _bm25 is None:
+                _bm25 = BM25Index.load(BM25_DIR)
+    return _bm25
+
+def write_bm25(docs: List[Document]):
+    """Rebuild the lexical index from the full chunk list (cheap; no embeddings)."""
+    global _bm25
+    index = BM25Index().build(docs)
+    index.save(BM25_DIR)
+    write_corpus_version(corpus_hash(list(_by_id(docs))), BM25_DIR)
+    with _lock:
+        _bm25 = index
+
+def reset_vectorstore():
+    """Drop the shared handles so the next call reopens them (e.g. after ingest)."""
+    global _vectorstore, _index_retriever, _bm25
+    with _lock:
+        _vectorstore = None
+        _index_retriever = None
+        _bm25 = None
+
+CORPUS_VERSION_FILE = "corpus_version.json"  # in each store's directory
+
+def _store_dir() -> str:
+    # the store answers come from: BM25 alone in lexical mode, else the dense backend
+    if RETRIEVAL_MODE == "lexical":
+        return BM25_DIR
+    return NUMPY_INDEX_DIR if RETRIEVER_BACKEND == "numpy" else CHROMA_DIR
+
+def chunk_id(doc: Document) -> str:
+    """Stable content hash of a chunk: same source + headers + text -> same id."""
+    key = json.dumps(doc.metadata, sort_keys=True) + "\x00" + doc.page_content
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+def corpus_hash(ids: List[str]) -> str:
+    """Order-independent hash of the chunk ids present in the store."""
+    h = hashlib.sha256()
+    for i in sorted(ids):
+        h.update(i.encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def write_corpus_version(version: str, store_dir: str = CHROMA_DIR):
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, CORPUS_VERSION_FILE), "w", encoding="utf-8") as f:
+        json.dump({"version": version}, f)
+
+def get_corpus_version() -> Optional[str]:
+    """Version stamped by the last ingest into the active store; caches keyed on it go stale on re-ingest."""
+    try:
+        with open(os.path.join(_store_dir(), CORPUS_VERSION_FILE), "r", encoding="utf-8") as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError):
+        return None
+
+def _stored_ids_by_source(vs: "Chroma") -> Dict[str, set]:
+    got = vs.get(include=["metadatas"])
+    out: Dict[str, set] = {}
+    for i, meta in zip(got["ids"], got["metadatas"]):
+        out.setdefault((meta or {}).get("source", ""), set()).add(i)
+    return out
+
+def _by_id(docs: List[Document]) -> Dict[str, Document]:
+    # identical chunks collapse to one id; keep the first
+    out: Dict[str, Document] = {}
+    for d in docs:
+        out.setdefault(chunk_id(d), d)
+    return out
+
+def _apply(vs: "Chroma", add: Dict[str, Document], delete: List[str]):
+    if delete:
+        vs.delete(ids=delete)
+    if add:
+        vs.add_documents(list(add.values()), ids=list(add.keys()))
+    stored = _stored_ids_by_source(vs)
+    write_corpus_version(corpus_hash([i for ids in stored.values() for i in ids]))
+
+def save_index(index: VectorIndex, path: str = NUMPY_INDEX_DIR):
+    """Save the numpy backend's index and stamp its corpus version (ids are chunk content hashes)."""
+    index.save(path)
+    write_corpus_version(corpus_hash(index.ids), path)
+
+def sync_documents(docs: List[Document], dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Make the store match `docs` exactly (the full corpus):
+    embed only new/changed chunks, delete chunks of edited or removed files.
+    Returns a summary; with dry_run=True nothing is written.
+    """
+    vs = get_vectorstore()
+    stored = _stored_ids_by_source(vs)
+    wanted = _by_id(docs)
+    wanted_by_source: Dict[str, set] = {}
+    for i, d in wanted.items():
+        wanted_by_source.setdefault(d.metadata.get("source", ""), set()).add(i)
+
+    add: Dict[str, Document] = {}
+    delete: List[str] = []
+    files: Dict[str, Dict[str, Any]] = {}
+    for src in sorted(set(stored) | set(wanted_by_source)):
+        old, new = stored.get(src, set()), wanted_by_source.get(src, set())
+        added, deleted = new - old, old - new
+        if not old:
+            status = "added"
+        elif not new:
+            status = "removed"
+        elif added or deleted:
+            status = "updated"
+        else:
+            status = "unchanged"
+        files[src] = {"status": status, "add": len(added), "delete": len(deleted),
+                      "unchanged": len(new & old)}
+        add.update({i: wanted[i] for i in added})
+        delete.extend(sorted(deleted))
+
+    summary = {
+        "dry_run": dry_run,
+        "files": files,
+        "chunks_added": len(add),
+        "chunks_deleted": len(delete),
+        "chunks_unchanged": sum(f["unchanged"] for f in files.values()),
+    }
+    if not dry_run:
+        _apply(vs, add, delete)
+    return summary
+
+def _dense_retriever(k: int):
+    if RETRIEVER_BACKEND == "numpy":
+        return IndexRetriever(retriever=get_index_retriever(), k=k)
+    return get_vectorstore().as_retriever(search_kwargs={"k": k})
+
+def get_retriever(k: int = 5, mode: Optional[str] = None):
+    """
+    Return a retriever for `mode` (default RETRIEVAL_MODE):
+    - dense:   embeddings over RETRIEVER_BACKEND (chroma|numpy)
+    - lexical: BM25 only; never loads the embedding model
+    - hybrid:  BM25 + dense, fused by reciprocal rank
+    """
+    mode = mode or RETRIEVAL_MODE
+    if mode == "lexical":
+        return BM25Retriever(index=get_bm25(), k=k)
+    if mode == "hybrid":
+        return HybridRetriever(
+            lexical=BM25Retriever(index=get_bm25(), k=2 * k),
+            dense=_dense_retriever(2 * k),
+            k=k, rrf_k=HYBRID_RRF_K,
+        )
+    return _dense_retriever(k)
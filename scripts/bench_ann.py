@@ -0,0 +1,54 @@
+# scripts/bench_ann.py
+"""
+Recall@k vs. latency of VectorIndex IVF search against the exact path on a
+synthetic clustered corpus (no embedding model needed).
+
+  python -m scripts.bench_ann [--n 200000] [--dim 384] [--k 10] [--nlist 0]
+"""
+import argparse, time
+import numpy as np
+from rag.index import VectorIndex
+
+def synthetic(n: int, dim: int, n_clusters: int = 500, seed: int = 0) -> np.ndarray:
+    # policy chunks cluster by topic; mimic that with noisy cluster centres
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    x = centres[rng.integers(0, n_clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=200000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--nlist", type=int, default=0, help="0 = 4*sqrt(n)")
+    args = ap.parse_args()
+
+    data = synthetic(args.n + args.queries, args.dim)
+    base, queries = data[:args.n], data[args.n:]
+    index = VectorIndex(dim=args.dim)
+    index.add([str(i) for i in range(args.n)], base, [{}] * args.n, [""] * args.n)
+
+    t0 = time.perf_counter()
+    ivf = index.build_ann(nlist=args.nlist or None)
+    print(f"n={args.n} dim={args.dim} nlist={ivf.nlist} build={time.perf_counter() - t0:.1f}s")
+
+    def run(**kw):
+        ids, t0 = [], time.perf_counter()
+        for q in queries:
+            ids.append({h["id"] for h in index.search(q, top_k=args.k, **kw)})
+        return ids, (time.perf_counter() - t0) * 1000 / len(queries)
+
+    truth, exact_ms = run(exact=True)
+    print(f"{'mode':<12}{'recall@' + str(args.k):>10}{'ms/query':>10}{'speedup':>9}")
+    print(f"{'exact':<12}{1.0:>10.3f}{exact_ms:>10.2f}{1.0:>9.1f}")
+    for nprobe in (1, 4, 8, 16, 32, 64):
+        if nprobe > ivf.nlist:
+            break
+        got, ms = run(nprobe=nprobe)
+        recall = np.mean([len(g & t) / args.k for g, t in zip(got, truth)])
+        print(f"{'nprobe=' + str(nprobe):<12}{recall:>10.3f}{ms:>10.2f}{exact_ms / ms:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# scripts/bench_async.py
+"""
+Concurrent-request throughput of /agent and /chat against the local stub LLM,
+plus /health latency while the API is saturated.
+
+  python -m scripts.bench_async                       # starts stub + API itself
+  python -m scripts.bench_async --api-url http://localhost:8000   # existing API
+                                                      # (must point GROQ_API_BASE at the stub)
+  python -m scripts.bench_async --coalesce            # identical requests share one
+                                                      # computation; reports LLM calls saved
+"""
+import argparse, asyncio, os, statistics, subprocess, sys, time
+import httpx
+
+AGENT_MSG = "Is 2025-12-25 a holiday?"
+CHAT_MSG = "How many PTO days in Year 1?"
+
+def _spawn(module_app: str, port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module_app, "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **env},
+    )
+
+async def _wait_up(url: str, timeout: float = 120):
+    t_end = time.time() + timeout
+    async with httpx.AsyncClient() as c:
+        while time.time() < t_end:
+            try:
+                if (await c.get(url)).status_code < 500:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up")
+
+async def _load(client: httpx.AsyncClient, path: str, payload: dict, n: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    lat, errors = [], 0
+
+    async def one():
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                r = await client.post(path, json=payload)
+                r.raise_for_status()
+            except httpx.HTTPError:
+                errors += 1
+            lat.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    return lat, errors, time.perf_counter() - t0
+
+async def _health_probe(client: httpx.AsyncClient, stop: asyncio.Event):
+    lat = []
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await client.get("/health")
+        lat.append((time.perf_counter() - t0) * 1000)
+        await asyncio.sleep(0.05)
+    return lat
+
+async def _report_coalescing(api_url: str, stub_url: str):
+    async with httpx.AsyncClient() as c:
+        stats = (await c.get(f"{api_url}/stats")).json().get("coalescing", {})
+        for name, st in stats.items():
+            print(f"coalescing {name:<6} calls={st['calls']} executions={st['executions']} "
+                  f"collapsed={st['collapsed']} ({st['collapse_ratio']:.0%})")
+        if stub_url:
+            print(f"stub LLM calls: {(await c.get(f'{stub_url}/stats')).json()}")
+
+async def run(api_url: str, n: int, levels):
+    limits = httpx.Limits(max_connections=max(levels) + 8)
+    async with httpx.AsyncClient(base_url=api_url, timeout=120, limits=limits) as client:
+        print(f"{'endpoint':<8}{'conc':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}{'health p95':>12}")
+        for path, payload in (("/agent", {"message": AGENT_MSG}), ("/chat", {"user": "bench", "message": CHAT_MSG})):
+            for c in levels:
+                stop = asyncio.Event()
+                probe = asyncio.create_task(_health_probe(client, stop))
+                lat, errors, wall = await _load(client, path, payload, max(n, c), c)
+                stop.set()
+                health = await probe
+                q = statistics.quantiles(lat, n=20) if len(lat) > 1 else lat * 19
+                hq = statistics.quantiles(health, n=20)[18] if len(health) > 1 else (health or [0])[0]
+                print(f"{path:<8}{c:>6}{len(lat) / wall:>9.1f}{statistics.median(lat):>9.0f}{q[18]:>9.0f}"
+                      f"{errors:>8}{hq:>12.1f}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--api-url", default=None)
+    ap.add_argument("--n", type=int, default=64, help="requests per level")
+    ap.add_argument("--levels", default="1,8,32,64")
+    ap.add_argument("--stub-latency-ms", default="300")
+    ap.add_argument("--coalesce", action="store_true",
+                    help="keep single-flight coalescing on (off by default so every request does full work)")
+    args = ap.parse_args()
+    levels = [int(x) for x in args.levels.split(",")]
+
+    procs = []
+    api_url, stub_url = args.api_url, None
+    try:
+        if api_url is None:
+            stub_port, api_port = 9100, 8100
+            procs.append(_spawn("scripts.stub_llm:app", stub_port, {"STUB_LLM_LATENCY_MS": args.stub_latency_ms}))
+            procs.append(_spawn("api.app:app", api_port, {
+                "GROQ_API_BASE": f"http://127.0.0.1:{stub_port}", "GROQ_API_KEY": "stub",
+                "ANSWER_CACHE_ENABLED": "false",
+                "COALESCE_ENABLED": "true" if args.coalesce else "false",
+                # identical prompts would otherwise be served from the LLM response cache;
+                # LLM_CACHE_MODE=replay gives a reproducible, network-free run
+                "LLM_CACHE_MODE": os.getenv("LLM_CACHE_MODE", "off"),
+            }))
+            api_url = f"http://127.0.0.1:{api_port}"
+            stub_url = f"http://127.0.0.1:{stub_port}"
+            asyncio.run(_wait_up(f"http://127.0.0.1:{stub_port}/stats"))
+            asyncio.run(_wait_up(f"{api_url}/health/ready"))  # measure a warmed-up API
+        asyncio.run(run(api_url, args.n, levels))
+        if args.coalesce:
+            asyncio.run(_report_coalescing(api_url, stub_url))
+    finally:
+        for p in procs:
+            p.terminate()
+
+if __name__ == "__main__":
+    main()
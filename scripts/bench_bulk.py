@@ -0,0 +1,125 @@
+# scripts/bench_bulk.py
+"""
+Bulk leave-request writes vs one call per item.
+
+1. Migration: --records generated requests (a JSON array file) loaded by the
+   old per-record loop (json.load, s.get per record, then add) vs
+   scripts.migrate_requests_json_to_sqlite (streamed, INSERT ... ON CONFLICT
+   executemany), plus a second run of the new one where every id already exists.
+   Reported: records/s and the process's peak RSS.
+2. API path: --items creates / approvals one await per item
+   (acreate_leave_request, aapprove_leave_request) vs one abulk_* call.
+
+Each run uses a fresh copy of data/policybot.db in its own interpreter.
+
+  python -m scripts.bench_bulk
+  python -m scripts.bench_bulk --records 100000 --items 200
+"""
+import argparse, asyncio, datetime, json, os, random, resource, shutil, subprocess, sys, tempfile, time, uuid
+from typing import Any, Dict
+
+def write_records(path: str, n: int, rng: random.Random):
+    t0 = datetime.datetime(2024, 1, 1)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i in range(n):
+            start = datetime.date(2025, 1, 1) + datetime.timedelta(days=rng.randrange(365))
+            rec = {"id": str(uuid.UUID(int=rng.getrandbits(128))), "user": f"user{rng.randrange(200):03d}",
+                   "start_date": start.isoformat(), "end_date": (start + datetime.timedelta(days=2)).isoformat(),
+                   "reason": "bench", "status": rng.choice(["submitted", "approved", "rejected"]),
+                   "created_at": (t0 + datetime.timedelta(minutes=i)).isoformat() + "Z"}
+            f.write(("," if i else "") + json.dumps(rec, indent=2) + "\n")
+        f.write("]\n")
+
+def _legacy_migrate(src: str) -> Dict[str, Any]:
+    # the previous scripts/migrate_requests_json_to_sqlite.py main()
+    from datetime import datetime
+    from db.session import SessionLocal
+    from db.models import LeaveRequest
+    data = json.load(open(src, "r", encoding="utf-8"))
+    with SessionLocal() as s:
+        for r in data:
+            if s.get(LeaveRequest, r["id"]):
+                continue
+            s.add(LeaveRequest(
+                id=r["id"], user=r["user"],
+                start_date=datetime.fromisoformat(r["start_date"]).date(),
+                end_date=datetime.fromisoformat(r["end_date"]).date(),
+                reason=r["reason"], status=r.get("status", "submitted"),
+                created_at=datetime.fromisoformat(r["created_at"].replace("Z", "")),
+                updated_at=datetime.fromisoformat(r["updated_at"].replace("Z", "")) if r.get("updated_at") else None,
+            ))
+        s.commit()
+    return {"read": len(data)}
+
+async def _api(items: int) -> Dict[str, float]:
+    import tools.leave_request as lr
+    reqs = [{"user": f"user{i % 50:03d}", "start_date": "2026-03-02", "end_date": "2026-03-04", "reason": "bench"}
+            for i in range(items)]
+    out = {}
+    t0 = time.perf_counter()
+    ids = [(await lr.acreate_leave_request(**r))["id"] for r in reqs]
+    out["create x1"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    bulk_ids = [r["created"]["id"] for r in (await lr.abulk_create_leave_requests(reqs))["results"]]
+    out["create bulk"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for req_id in ids:
+        await lr.aapprove_leave_request(req_id)
+    out["approve x1"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    await lr.abulk_set_status(bulk_ids, "approved")
+    out["approve bulk"] = time.perf_counter() - t0
+    return out
+
+def child(mode: str, src: str, items: int) -> Dict[str, Any]:
+    from db.session import ensure_schema
+    ensure_schema()
+    if mode == "api":
+        return {op: {"ms": s * 1000, "per_s": items / s} for op, s in asyncio.run(_api(items)).items()}
+    from scripts.migrate_requests_json_to_sqlite import migrate
+    runs = [("legacy", lambda: _legacy_migrate(src))] if mode == "legacy" else \
+           [("bulk upsert", lambda: migrate(src)), ("bulk (all exist)", lambda: migrate(src))]
+    out = {}
+    for name, run in runs:
+        t0 = time.perf_counter()
+        n = run()["read"]
+        s = time.perf_counter() - t0
+        out[name] = {"ms": s * 1000, "per_s": n / s}
+    out[name]["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--records", type=int, default=100000, help="migration source size")
+    ap.add_argument("--items", type=int, default=200, help="items per API bulk call")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--child", choices=("legacy", "bulk", "api"), help=argparse.SUPPRESS)
+    ap.add_argument("--src", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.src, args.items)))
+        return
+
+    from config import DATABASE_PATH
+    tmp = tempfile.mkdtemp(prefix="policybot-bulk-")
+    try:
+        src = os.path.join(tmp, "requests.json")
+        write_records(src, args.records, random.Random(args.seed))
+        print(f"source: {args.records} records, {os.path.getsize(src) / 2**20:.1f} MB; api: {args.items} items")
+        print(f"{'op':<18}{'ms':>10}{'items/s':>10}{'peak RSS MB':>13}")
+        for mode in ("legacy", "bulk", "api"):
+            db = os.path.join(tmp, f"{mode}.db")
+            shutil.copy(DATABASE_PATH, db)
+            cmd = [sys.executable, "-m", "scripts.bench_bulk", "--child", mode, "--src", src, "--items", str(args.items)]
+            out = subprocess.run(cmd, env={**os.environ, "DATABASE_PATH": db},
+                                 capture_output=True, text=True, check=True).stdout
+            for op, r in json.loads(out.strip().splitlines()[-1]).items():
+                rss = f"{r['rss_mb']:.0f}" if "rss_mb" in r else "-"
+                print(f"{op:<18}{r['ms']:>10.0f}{r['per_s']:>10.0f}{rss:>13}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# scripts/bench_context.py
+"""
+Context packing (rag/context.py) before/after: prompt tokens and QA latency.
+
+1. Offline: for each question, the "stuff" prompt built from the raw top-k
+   chunks vs from the packed blocks - estimated tokens, merges, duplicates
+   dropped and packing cost. Uses the live store (CHROMA_DIR / RETRIEVAL_MODE).
+2. --e2e: aask() with packing off and on - prompt tokens as reported by the API
+   and latency. --stub runs it against scripts.stub_llm, whose latency grows
+   with prompt size (STUB_LLM_PROMPT_MS_PER_1K, default here 150 ms per 1k).
+
+  python -m scripts.bench_context
+  python -m scripts.bench_context --k 8 --budget 800
+  python -m scripts.bench_context --e2e --stub
+"""
+import argparse, asyncio, os, statistics, time
+
+QUESTIONS = [
+    "How many PTO days in Year 1?", "What is the PTO carryover limit?", "How long is parental leave?",
+    "How many sick days do I get each year?", "Do I need a doctor's note for sick leave?",
+    "Can I take unpaid leave?", "Does PTO accrue while on unpaid leave?", "How do I request leave?",
+    "Which expenses can I get reimbursed?", "How do I reset my VPN password?",
+]
+
+def _prompt_tokens(qa, docs, question):
+    from langchain_core.prompts import format_document
+    from rag.context import estimate_tokens
+    chain = qa.combine_documents_chain
+    context = chain.document_separator.join(format_document(d, chain.document_prompt) for d in docs)
+    return estimate_tokens(chain.llm_chain.prompt.format(context=context, question=question))
+
+def offline(k: int, budget: int, threshold: float):
+    from rag.context import pack_context
+    from tools.qa_chain import get_qa_chain
+    qa = get_qa_chain(k)
+    raw_t, packed_t, pack_us = [], [], []
+    merged = dupes = cut = 0
+    for q in QUESTIONS:
+        docs = qa.retriever.invoke(q)
+        t0 = time.perf_counter()
+        packed, st = pack_context(docs, budget, threshold)
+        pack_us.append((time.perf_counter() - t0) * 1e6)
+        raw_t.append(_prompt_tokens(qa, docs, q))
+        packed_t.append(_prompt_tokens(qa, packed, q))
+        merged += st["merged"]
+        dupes += st["duplicates"]
+        cut += st["dropped"] + st["truncated"]
+    raw, packed = statistics.mean(raw_t), statistics.mean(packed_t)
+    print(f"questions={len(QUESTIONS)} k={k} budget={budget}: chunks merged={merged} "
+          f"near-duplicates dropped={dupes} blocks cut/dropped for budget={cut}")
+    print(f"prompt tokens (est.): raw {raw:.0f} -> packed {packed:.0f} per question "
+          f"({(1 - packed / raw) * 100:.1f}% fewer); packing {statistics.median(pack_us):.0f} µs median")
+
+async def _e2e(packing: bool, k: int, repeats: int):
+    import tools.qa_chain as qc
+    from tools.tracing import collect
+    qc.CONTEXT_PACKING = packing
+    qa = qc.get_qa_chain(k)
+    lat, tokens = [], []
+    for _ in range(repeats):
+        for q in QUESTIONS:
+            with collect() as spans:
+                t0 = time.perf_counter()
+                await qc.aask(qa, q)
+                lat.append((time.perf_counter() - t0) * 1000)
+            tokens.append(sum(s.get("input_tokens", 0) for s in spans if s["stage"] == "llm"))
+    return lat, tokens
+
+def e2e(k: int, repeats: int):
+    print(f"{'packing':<9}{'prompt tok':>11}{'p50 ms':>9}{'mean ms':>9}")
+    for packing in (False, True):
+        lat, tokens = asyncio.run(_e2e(packing, k, repeats))
+        print(f"{'on' if packing else 'off':<9}{statistics.mean(tokens):>11.0f}"
+              f"{statistics.median(lat):>9.1f}{statistics.mean(lat):>9.1f}")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--budget", type=int, default=None, help="token budget (default CONTEXT_TOKEN_BUDGET)")
+    ap.add_argument("--e2e", action="store_true", help="also time aask() with packing off/on")
+    ap.add_argument("--stub", action="store_true", help="start scripts.stub_llm and point Groq at it")
+    ap.add_argument("--repeats", type=int, default=3)
+    args = ap.parse_args()
+
+    # measure real LLM calls, not response-cache hits
+    os.environ.setdefault("LLM_CACHE_MODE", "off")
+    if args.budget is not None:
+        os.environ["CONTEXT_TOKEN_BUDGET"] = str(args.budget)
+    stub = None
+    if args.e2e and args.stub:
+        from scripts.bench_async import _spawn, _wait_up
+        stub = _spawn("scripts.stub_llm:app", 9100, {"STUB_LLM_PROMPT_MS_PER_1K": "150"})
+        os.environ.setdefault("GROQ_API_KEY", "stub")
+        os.environ["GROQ_API_BASE"] = "http://127.0.0.1:9100"
+        asyncio.run(_wait_up("http://127.0.0.1:9100/stats"))
+    try:
+        from config import CONTEXT_DEDUP_THRESHOLD, CONTEXT_TOKEN_BUDGET
+        offline(args.k, CONTEXT_TOKEN_BUDGET, CONTEXT_DEDUP_THRESHOLD)
+        if args.e2e:
+            e2e(args.k, args.repeats)
+    finally:
+        if stub is not None:
+            stub.terminate()
+
+if __name__ == "__main__":
+    main()
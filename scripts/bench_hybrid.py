@@ -0,0 +1,56 @@
+# scripts/bench_hybrid.py
+"""
+Latency and hit quality of lexical (BM25), dense and hybrid retrieval on
+labelled policy questions. Run after: python -m scripts.ingest_langchain
+
+  python -m scripts.bench_hybrid [k]
+"""
+import sys, time, statistics
+import rag.embeddings
+from rag.vectorstore import get_retriever
+
+# (question, expected source, expected h2 section or None)
+LABELLED = [
+    ("doctor's note", "leave_policy.md", "4. Requesting Leave"),
+    ("June 30", "leave_policy.md", "3. PTO Carryover"),
+    ("VPN", "vpn_reset.md", None),
+    ("How many PTO days in Year 1?", "leave_policy.md", "2. PTO Accrual"),
+    ("What is the PTO carryover limit?", "leave_policy.md", "3. PTO Carryover"),
+    ("Do I accrue PTO during unpaid leave?", "leave_policy.md", "2. PTO Accrual"),
+    ("How many sick days do I get each year?", "leave_policy.md", "5. Sick Leave"),
+    ("How long is parental leave?", "leave_policy.md", "8. Parental Leave"),
+    ("I forgot my VPN password", "vpn_reset.md", None),
+    ("How often do I have to change my password?", "password_policy.md", None),
+    ("Which expenses can I get reimbursed?", "reimbursement_policy.md", "What qualifies"),
+    ("jury duty", "leave_policy.md", "10. Jury Duty"),
+]
+
+def _rank(docs, source, section):
+    for i, d in enumerate(docs, 1):
+        if d.metadata.get("source") == source and (section is None or d.metadata.get("h2") == section):
+            return i
+    return None
+
+def run(mode: str, k: int):
+    retriever = get_retriever(k=k, mode=mode)
+    retriever.invoke(LABELLED[0][0])  # warm up (loads indexes / model)
+    ms, ranks = [], []
+    for q, source, section in LABELLED:
+        t0 = time.perf_counter()
+        docs = retriever.invoke(q)
+        ms.append((time.perf_counter() - t0) * 1000)
+        ranks.append(_rank(docs, source, section))
+    hit = sum(r is not None for r in ranks) / len(ranks)
+    top1 = sum(r == 1 for r in ranks) / len(ranks)
+    mrr = statistics.mean(1 / r if r else 0 for r in ranks)
+    print(f"{mode:<8}{hit:>8.2f}{top1:>7.2f}{mrr:>7.2f}{statistics.mean(ms):>10.2f}{statistics.median(ms):>9.2f}")
+
+def main(k: int = 5):
+    print(f"{'mode':<8}{'hit@' + str(k):>8}{'top1':>7}{'MRR':>7}{'mean ms':>10}{'p50 ms':>9}")
+    run("lexical", k)
+    print(f"(embedding model loaded after lexical run: {rag.embeddings._embeddings is not None})")
+    run("dense", k)
+    run("hybrid", k)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,93 @@
+# scripts/bench_pagination.py
+"""
+Listing leave requests at growing table sizes: the full ORM list vs keyset pages
+vs the streamed export (tools.leave_request).
+
+For each --rows size, on a copy of data/policybot.db seeded with that many extra
+requests (fresh interpreter each, engines are configured at import):
+  full     list_leave_requests(): every row through the ORM into one list
+  page 1   list_leave_requests_page(limit=--limit), the first page
+  page N   the last page, reached by following next_cursor - keyset seeks to the
+           cursor, so it costs what page 1 costs (OFFSET would scan the skipped rows)
+  export   aexport_leave_requests() ndjson / csv, consumed chunk by chunk
+Reported: latency and peak Python heap (tracemalloc, measured in a separate pass).
+
+  python -m scripts.bench_pagination
+  python -m scripts.bench_pagination --rows 10000,100000 --limit 100
+"""
+import argparse, asyncio, json, os, random, shutil, statistics, subprocess, sys, tempfile, time, tracemalloc
+from typing import Any, Callable, Dict
+from scripts.bench_sqlite import seed
+
+def _measure(fn: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ms": round(statistics.median(times), 2), "peak_mb": round(peak / 2**20, 2)}
+
+def child(limit: int, repeats: int) -> Dict[str, Dict[str, float]]:
+    import tools.leave_request as lr
+    from db.session import ensure_schema
+    ensure_schema()
+
+    cursors = [None]  # walk once to find the last page's cursor
+    while True:
+        nxt = lr.list_leave_requests_page(limit=limit, cursor=cursors[-1])["next_cursor"]
+        if not nxt:
+            break
+        cursors.append(nxt)
+
+    def export(fmt: str):
+        async def run():
+            n = 0
+            async for chunk in lr.aexport_leave_requests(fmt=fmt):
+                n += len(chunk)
+            return n
+        return lambda: asyncio.run(run())
+
+    return {
+        "full": _measure(lambda: lr.list_leave_requests(), repeats),
+        "page 1": _measure(lambda: lr.list_leave_requests_page(limit=limit), repeats),
+        f"page {len(cursors)}": _measure(lambda: lr.list_leave_requests_page(limit=limit, cursor=cursors[-1]), repeats),
+        "export ndjson": _measure(export("ndjson"), repeats),
+        "export csv": _measure(export("csv"), repeats),
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", default="10000,100000", help="extra requests seeded, comma-separated sizes")
+    ap.add_argument("--limit", type=int, default=100, help="page size")
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.limit, args.repeats)))
+        return
+
+    from config import DATABASE_PATH
+    print(f"{'rows':>8}  {'op':<15}{'ms':>10}{'peak MB':>10}")
+    for rows in map(int, args.rows.split(",")):
+        tmp = tempfile.mkdtemp(prefix="policybot-pages-")
+        try:
+            db = os.path.join(tmp, "policybot.db")
+            shutil.copy(DATABASE_PATH, db)
+            seed(db, rows, random.Random(args.seed))
+            cmd = [sys.executable, "-m", "scripts.bench_pagination", "--child",
+                   "--limit", str(args.limit), "--repeats", str(args.repeats)]
+            out = subprocess.run(cmd, env={**os.environ, "DATABASE_PATH": db},
+                                 capture_output=True, text=True, check=True).stdout
+            for op, r in json.loads(out.strip().splitlines()[-1]).items():
+                print(f"{rows:>8}  {op:<15}{r['ms']:>10.1f}{r['peak_mb']:>10.2f}")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
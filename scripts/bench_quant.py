@@ -0,0 +1,75 @@
+# scripts/bench_quant.py
+"""
+Memory / latency / recall@k of VectorIndex storage modes (float32, float16,
+int8) with and without exact rescoring, on data/policies and on a synthetic
+scaled corpus. Recall is measured against exact float32 search.
+
+  python -m scripts.bench_quant [--corpus both|policies|synthetic] [--n 200000] [--k 5]
+"""
+import argparse, time
+from pathlib import Path
+import numpy as np
+from rag.index import VectorIndex
+from scripts.bench_ann import synthetic
+
+POLICY_QUERIES = [
+    "How many PTO days in Year 1?",
+    "What is the PTO carryover limit?",
+    "When must carryover PTO be used?",
+    "Do I accrue PTO during unpaid leave?",
+    "When do I need a doctor's note?",
+    "How many sick days do I get?",
+    "How long is parental leave?",
+    "How do I reset my VPN password?",
+    "What expenses can be reimbursed?",
+    "How often must I change my password?",
+    "Can I use a personal laptop for work?",
+    "What benefits are offered?",
+]
+
+def policies_corpus():
+    from rag.chunker import chunk_markdown
+    from rag.embedder import Embedder
+    chunks = []
+    for f in sorted(Path("data/policies").glob("*.md")):
+        chunks.extend(chunk_markdown(f.read_text(encoding="utf-8"), chunk_size=60, overlap=20, source=f.name))
+    emb = Embedder()
+    return emb.encode([c["text"] for c in chunks]), np.stack([emb.encode_query(q) for q in POLICY_QUERIES])
+
+def run(name: str, base: np.ndarray, queries: np.ndarray, k: int):
+    n = len(base)
+    k = min(k, n)
+    print(f"\n== {name}: n={n} dim={base.shape[1]} queries={len(queries)} k={k}")
+    print(f"{'storage':<10}{'rescore':>8}{'search MB':>11}{'ms/query':>10}{'batched':>9}{'recall@' + str(k):>10}")
+    truth = None
+    for storage in ("float32", "float16", "int8"):
+        for factor in ((0,) if storage == "float32" else (0, 4)):
+            index = VectorIndex(dim=base.shape[1], storage=storage, rescore_factor=factor)
+            index.add([str(i) for i in range(n)], base, [{}] * n, [""] * n)
+            t0 = time.perf_counter()
+            got = [{h["id"] for h in hits} for q in queries for hits in [index.search(q, top_k=k)]]
+            ms = (time.perf_counter() - t0) * 1000 / len(queries)
+            t0 = time.perf_counter()
+            index.search_batch(queries, top_k=k)
+            batch_ms = (time.perf_counter() - t0) * 1000 / len(queries)
+            truth = truth or got
+            recall = np.mean([len(g & t) / k for g, t in zip(got, truth)])
+            mb = index.memory_bytes()["search"] / 2**20
+            print(f"{storage:<10}{factor:>8}{mb:>11.2f}{ms:>10.2f}{batch_ms:>9.2f}{recall:>10.3f}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", default="both", choices=["both", "policies", "synthetic"])
+    ap.add_argument("--n", type=int, default=200000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--queries", type=int, default=100)
+    args = ap.parse_args()
+    if args.corpus in ("both", "policies"):
+        run("data/policies", *policies_corpus(), k=args.k)
+    if args.corpus in ("both", "synthetic"):
+        data = synthetic(args.n + args.queries, args.dim)
+        run("synthetic", data[:args.n], data[args.n:], k=args.k)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# scripts/bench_retrieval.py
+"""
+Per-query retrieval latency: rebuilding embeddings + Chroma per call (old
+get_retriever behaviour) vs. the shared process-wide runtime.
+
+Run after ingest:  python -m scripts.bench_retrieval [n_queries]
+"""
+import sys, time, statistics
+from concurrent.futures import ThreadPoolExecutor
+from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_community.vectorstores import Chroma
+from config import CHROMA_DIR, EMBED_MODEL
+from rag.vectorstore import get_retriever
+
+QUERIES = [
+    "How many PTO days in Year 1?",
+    "What is the PTO carryover limit?",
+    "How do I reset my VPN password?",
+    "Do I accrue PTO during unpaid leave?",
+]
+
+def _fresh_retriever(k: int = 5):
+    emb = HuggingFaceEmbeddings(model_name=EMBED_MODEL)
+    vs = Chroma(embedding_function=emb, persist_directory=CHROMA_DIR)
+    return vs.as_retriever(search_kwargs={"k": k})
+
+def _timed(make_retriever, n: int):
+    ms = []
+    for i in range(n):
+        q = QUERIES[i % len(QUERIES)]
+        t0 = time.perf_counter()
+        make_retriever().invoke(q)
+        ms.append((time.perf_counter() - t0) * 1000)
+    return ms
+
+def _report(label: str, ms):
+    print(f"{label:<10} n={len(ms):<4} mean={statistics.mean(ms):8.1f} ms  "
+          f"p50={statistics.median(ms):8.1f} ms  max={max(ms):8.1f} ms")
+
+def main(n: int = 20):
+    get_retriever().invoke(QUERIES[0])  # warm the shared runtime once
+    _report("before", _timed(_fresh_retriever, n))
+    _report("after", _timed(get_retriever, n))
+
+    # shared runtime under a FastAPI-sized threadpool
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        list(ex.map(lambda q: get_retriever().invoke(q), QUERIES * (n // len(QUERIES) or 1)))
+    print(f"threaded   {n} queries on 8 workers in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,171 @@
+# scripts/bench_sqlite.py
+"""
+Concurrent read/write benchmark of the leave-request store, SQLITE_PROFILE=default
+(stock SQLite, the original single-column indexes) vs tuned (WAL, pragmas, pool,
+composite indexes via db.session.ensure_schema).
+
+Each profile runs in a fresh interpreter (engines are configured at import) on a
+copy of data/policybot.db seeded with --rows extra requests. Readers run the
+list_leave_requests shapes and get-by-id, writers approve/reject/create, for
+--seconds; reported: ops/s, p50/p95/p99 per operation and "database is locked" errors.
+
+  python -m scripts.bench_sqlite
+  python -m scripts.bench_sqlite --mode async --readers 32 --writers 8
+"""
+import argparse, asyncio, datetime, json, os, random, shutil, sqlite3, subprocess, sys, tempfile, threading, time
+import uuid
+from typing import Any, Callable, Dict, List
+
+USERS = [f"user{i:03d}" for i in range(200)]
+STATUSES = ["submitted", "approved", "rejected", "cancelled"]
+
+def seed(path: str, rows: int, rng: random.Random):
+    conn = sqlite3.connect(path)
+    t0 = datetime.datetime(2024, 1, 1)
+    batch = []
+    for i in range(rows):
+        start = datetime.date(2025, 1, 1) + datetime.timedelta(days=rng.randrange(365))
+        created = t0 + datetime.timedelta(minutes=i)
+        # created_at in SQLAlchemy's DateTime text format, so it compares right against bound datetimes
+        batch.append((str(uuid.UUID(int=rng.getrandbits(128))), rng.choice(USERS), start.isoformat(),
+                      (start + datetime.timedelta(days=rng.randrange(1, 6))).isoformat(), "bench",
+                      rng.choice(STATUSES), created.isoformat(sep=" ", timespec="microseconds"), None))
+    conn.executemany("INSERT INTO leave_requests VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+
+def _pct(ms: List[float], p: float) -> float:
+    ms = sorted(ms)
+    return ms[min(len(ms) - 1, int(len(ms) * p / 100))] if ms else 0.0
+
+# --- child: runs the workload against DATABASE_PATH with SQLITE_PROFILE ---
+
+def _ops(ids: List[str], rng: random.Random):
+    import tools.leave_request as lr
+    reads = [
+        ("list_user_status", lambda: lr.list_leave_requests(user=rng.choice(USERS), status=rng.choice(STATUSES))),
+        ("list_user", lambda: lr.list_leave_requests(user=rng.choice(USERS))),
+        ("list_status", lambda: lr.list_leave_requests(status="submitted")),
+        ("get", lambda: lr.get_leave_request(rng.choice(ids))),
+    ]
+    writes = [
+        ("approve", lambda: lr.approve_leave_request(rng.choice(ids))),
+        ("reject", lambda: lr.reject_leave_request(rng.choice(ids))),
+        ("create", lambda: lr.create_leave_request(rng.choice(USERS), "2026-03-02", "2026-03-04", "bench")),
+    ]
+    areads = [
+        ("list_user_status", lambda: lr.alist_leave_requests(user=rng.choice(USERS), status=rng.choice(STATUSES))),
+        ("list_user", lambda: lr.alist_leave_requests(user=rng.choice(USERS))),
+        ("list_status", lambda: lr.alist_leave_requests(status="submitted")),
+        ("get", lambda: lr.aget_leave_request(rng.choice(ids))),
+    ]
+    awrites = [
+        ("approve", lambda: lr.aapprove_leave_request(rng.choice(ids))),
+        ("reject", lambda: lr.areject_leave_request(rng.choice(ids))),
+        ("create", lambda: lr.acreate_leave_request(rng.choice(USERS), "2026-03-02", "2026-03-04", "bench")),
+    ]
+    return reads, writes, areads, awrites
+
+def _timed(samples: Dict[str, List[float]], errors: Dict[str, int], name: str, t0: float, err: Exception = None):
+    if err is not None:
+        key = "locked" if "locked" in str(err) else type(err).__name__
+        errors[key] = errors.get(key, 0) + 1
+    else:
+        samples.setdefault(name, []).append((time.perf_counter() - t0) * 1000)
+
+def child(mode: str, readers: int, writers: int, seconds: float, seed_: int) -> Dict[str, Any]:
+    from config import DATABASE_PATH, SQLITE_PROFILE
+    if SQLITE_PROFILE == "tuned":
+        from db.session import ensure_schema
+        ensure_schema()
+    with sqlite3.connect(DATABASE_PATH) as conn:
+        ids = [r[0] for r in conn.execute("SELECT id FROM leave_requests")]
+    rng = random.Random(seed_)
+    reads, writes, areads, awrites = _ops(ids, rng)
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    deadline = time.perf_counter() + seconds
+
+    if mode == "threads":
+        def worker(ops: List):
+            while time.perf_counter() < deadline:
+                name, op = rng.choice(ops)
+                t0 = time.perf_counter()
+                try:
+                    op()
+                    _timed(samples, errors, name, t0)
+                except Exception as e:
+                    _timed(samples, errors, name, t0, e)
+
+        threads = [threading.Thread(target=worker, args=(reads,)) for _ in range(readers)]
+        threads += [threading.Thread(target=worker, args=(writes,)) for _ in range(writers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    else:
+        async def aworker(ops: List[Callable]):
+            while time.perf_counter() < deadline:
+                name, op = rng.choice(ops)
+                t0 = time.perf_counter()
+                try:
+                    await op()
+                    _timed(samples, errors, name, t0)
+                except Exception as e:
+                    _timed(samples, errors, name, t0, e)
+
+        async def run():
+            await asyncio.gather(*([aworker(areads) for _ in range(readers)] + [aworker(awrites) for _ in range(writers)]))
+        asyncio.run(run())
+
+    return {
+        "ops": {n: {"count": len(ms), "p50_ms": round(_pct(ms, 50), 2), "p95_ms": round(_pct(ms, 95), 2),
+                    "p99_ms": round(_pct(ms, 99), 2)} for n, ms in sorted(samples.items())},
+        "reads_per_s": round(sum(len(samples.get(n, [])) for n, _ in reads) / seconds, 1),
+        "writes_per_s": round(sum(len(samples.get(n, [])) for n, _ in writes) / seconds, 1),
+        "errors": errors,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--profiles", default="default,tuned")
+    ap.add_argument("--mode", choices=("threads", "async"), default="threads",
+                    help="threads: sync sessions (FastAPI threadpool, scripts); async: aiosqlite (the API)")
+    ap.add_argument("--rows", type=int, default=20000, help="extra requests seeded into the copy")
+    ap.add_argument("--readers", type=int, default=8)
+    ap.add_argument("--writers", type=int, default=4)
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.mode, args.readers, args.writers, args.seconds, args.seed)))
+        return
+
+    from config import DATABASE_PATH
+    results = {}
+    for profile in args.profiles.split(","):
+        tmp = tempfile.mkdtemp(prefix="policybot-sqlite-")
+        try:
+            db = os.path.join(tmp, "policybot.db")
+            shutil.copy(DATABASE_PATH, db)  # original schema; the tuned child upgrades it
+            seed(db, args.rows, random.Random(args.seed))
+            cmd = [sys.executable, "-m", "scripts.bench_sqlite", "--child", "--mode", args.mode,
+                   "--readers", str(args.readers), "--writers", str(args.writers),
+                   "--seconds", str(args.seconds), "--seed", str(args.seed)]
+            out = subprocess.run(cmd, env={**os.environ, "DATABASE_PATH": db, "SQLITE_PROFILE": profile},
+                                 capture_output=True, text=True, check=True).stdout
+            results[profile] = json.loads(out.strip().splitlines()[-1])
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"mode={args.mode} rows=+{args.rows} readers={args.readers} writers={args.writers} {args.seconds:g}s")
+    print(f"{'profile':<9}{'op':<18}{'count':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for profile, r in results.items():
+        for op, s in r["ops"].items():
+            print(f"{profile:<9}{op:<18}{s['count']:>8}{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}")
+        print(f"{profile:<9}reads/s={r['reads_per_s']} writes/s={r['writes_per_s']} errors={r['errors'] or 0}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# scripts/bench_startup.py
+"""
+Cold-start cost of the API: import time, time to live / ready, first-request latency.
+
+1. `import api.app` in fresh interpreters (median of --imports runs), and which
+   heavy packages that import dragged in.
+2. For each STARTUP_WARMUP mode: spawn stub LLM + API, then time from process
+   start to /health/live, to /health/ready, and the first and second /chat
+   requests sent as soon as the API is live (what a load balancer would do
+   without a readiness check).
+
+  python -m scripts.bench_startup
+  python -m scripts.bench_startup --modes background,off --api-env RETRIEVAL_MODE=lexical
+"""
+import argparse, asyncio, json, os, statistics, subprocess, sys, time
+import httpx
+from scripts.bench_async import _spawn, _wait_up
+
+HEAVY = ("torch", "transformers", "sentence_transformers", "chromadb", "langchain_groq", "langchain.chains")
+CHAT = {"user": "bench", "message": "How many PTO days in Year 1?"}
+
+_IMPORT_PROBE = (
+    "import json, sys, time; t = time.perf_counter(); import api.app; "
+    "print(json.dumps({'s': time.perf_counter() - t, 'loaded': [m for m in %r if m in sys.modules]}))" % (HEAVY,)
+)
+
+def import_time(runs: int, env: dict):
+    times, loaded = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _IMPORT_PROBE], env={**os.environ, **env},
+                             capture_output=True, text=True, check=True).stdout
+        res = json.loads(out.strip().splitlines()[-1])
+        times.append(res["s"])
+        loaded = res["loaded"]
+    print(f"import api.app: median {statistics.median(times):.2f} s over {runs} runs; "
+          f"heavy modules loaded: {', '.join(loaded) or 'none'}")
+
+async def _until(client: httpx.AsyncClient, path: str, ok=lambda r: r.status_code == 200, timeout: float = 180):
+    t_end = time.perf_counter() + timeout
+    while time.perf_counter() < t_end:
+        try:
+            if ok(await client.get(path)):
+                return time.perf_counter()
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.02)
+    raise RuntimeError(f"{path} did not succeed in {timeout:.0f} s")
+
+async def _startup(api_url: str, t_spawn: float, check_ready: bool):
+    async with httpx.AsyncClient(base_url=api_url, timeout=180) as c:
+        t_live = await _until(c, "/health/live")
+        t0 = time.perf_counter()
+        r = await c.post("/chat", json=CHAT)
+        first = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        await c.post("/chat", json=CHAT)
+        second = time.perf_counter() - t0
+        t_ready = await _until(c, "/health/ready") if check_ready else None
+    return {"live_s": t_live - t_spawn, "ready_s": t_ready - t_spawn if t_ready else None,
+            "first_chat_ms": first * 1000, "second_chat_ms": second * 1000, "status": r.status_code}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--imports", type=int, default=3, help="fresh-interpreter import runs")
+    ap.add_argument("--modes", default="background,blocking,off", help="STARTUP_WARMUP values to compare")
+    ap.add_argument("--api-env", action="append", default=[], metavar="KEY=VALUE")
+    args = ap.parse_args()
+    env = {"GROQ_API_KEY": "stub", "GROQ_API_BASE": "http://127.0.0.1:9100", "LLM_CACHE_MODE": "off",
+           "ANSWER_CACHE_ENABLED": "false", "COALESCE_ENABLED": "false"}
+    env.update(kv.split("=", 1) for kv in args.api_env)
+
+    import_time(args.imports, env)
+    stub = _spawn("scripts.stub_llm:app", 9100, {"STUB_LLM_LATENCY_MS": "0", "STUB_LLM_JITTER_MS": "0"})
+    try:
+        asyncio.run(_wait_up("http://127.0.0.1:9100/stats"))
+        print(f"{'warm-up':<12}{'live s':>8}{'ready s':>9}{'1st /chat ms':>14}{'2nd /chat ms':>14}")
+        for mode in args.modes.split(","):
+            t_spawn = time.perf_counter()
+            api = _spawn("api.app:app", 8100, {**env, "STARTUP_WARMUP": mode})
+            try:
+                r = asyncio.run(_startup("http://127.0.0.1:8100", t_spawn, check_ready=mode != "off"))
+            finally:
+                api.terminate()
+                api.wait()
+            ready = f"{r['ready_s']:.2f}" if r["ready_s"] is not None else "-"
+            print(f"{mode:<12}{r['live_s']:>8.2f}{ready:>9}{r['first_chat_ms']:>14.0f}{r['second_chat_ms']:>14.0f}")
+    finally:
+        stub.terminate()
+
+if __name__ == "__main__":
+    main()
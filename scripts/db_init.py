@@ -1,7 +1,7 @@
 # scripts/db_init.py
-from db.session import Base, engine
-from db.models import LeaveRequest
+from config import DATABASE_PATH
+from db.session import ensure_schema
 
 if __name__ == "__main__":
-    Base.metadata.create_all(bind=engine)
-    print("DB ready: data/policybot.db")
+    changes = ensure_schema()
+    print(f"DB ready: {DATABASE_PATH}" + (f" ({', '.join(changes)})" if changes else ""))
@@ -0,0 +1,135 @@
+# scripts/eval_router.py
+"""
+Fast-path router eval (agent/router.py).
+
+1. Routing quality on labelled messages: how many are routed, and whether the
+   routed tool + args are right (a wrong route is worse than deferring).
+2. End-to-end /agent latency and LLM calls with the fast path on vs off, for the
+   read-only messages (holiday / list) - write messages are only routed, not run.
+
+  python -m scripts.eval_router              # quality only, no LLM needed
+  python -m scripts.eval_router --e2e        # + latency against GROQ_API_BASE
+  python -m scripts.eval_router --e2e --stub # + latency against scripts.stub_llm
+"""
+import argparse, asyncio, os, statistics, time
+
+RID = "3f2a9c1e-1b2c-4d5e-8f90-123456789abc"
+
+# (message, expected tool or None for "should defer to the planner", expected args)
+LABELLED = [
+    ("Is 2025-12-25 a holiday?", "check_holiday", {"date_str": "2025-12-25"}),
+    ("is 2025-07-04 a company holiday", "check_holiday", {"date_str": "2025-07-04"}),
+    ("Is 2026-01-01 a holiday at the company?", "check_holiday", {"date_str": "2026-01-01"}),
+    ("holiday on 2025-11-27?", "check_holiday", {"date_str": "2025-11-27"}),
+    ("list alice's pending requests", "list_leave_requests", {"user": "alice", "status": "submitted"}),
+    ("Show all approved requests", "list_leave_requests", {"status": "approved"}),
+    ("List leave requests for bob", "list_leave_requests", {"user": "bob"}),
+    ("list requests", "list_leave_requests", {}),
+    ("show rejected leave requests for carol", "list_leave_requests", {"user": "carol", "status": "rejected"}),
+    (f"Approve {RID}", "approve_leave_request", {"id": RID}),
+    (f"please reject request {RID}", "reject_leave_request", {"id": RID}),
+    (f"Cancel {RID.upper()}", "cancel_leave_request", {"id": RID}),
+    ("Request PTO for carol from 2025-08-01 to 2025-08-05 because family trip", "create_leave_request",
+     {"user": "carol", "start_date": "2025-08-01", "end_date": "2025-08-05", "reason": "family trip"}),
+    ("Book vacation for dave from 2025-09-10 to 2025-09-12", "create_leave_request",
+     {"user": "dave", "start_date": "2025-09-10", "end_date": "2025-09-12", "reason": "vacation"}),
+    # must defer: policy questions, first person, negation, ambiguity
+    ("How many PTO days in Year 1?", None, None),
+    ("What is the PTO carryover limit?", None, None),
+    ("Which holidays are in December?", None, None),
+    ("List my requests", None, None),
+    ("Request PTO for me from 2025-08-01 to 2025-08-05", None, None),
+    (f"Don't approve {RID}", None, None),
+    (f"Should I approve {RID}?", None, None),
+    ("What are the pending and approved requests?", None, None),
+    ("Is 2025-12-25 or 2025-12-26 a holiday?", None, None),
+    # must defer: list messages only half parsed (a user the rules can't capture)
+    ("list requests from alice", None, None),
+    ("list requests by alice", None, None),
+    ("list alice requests", None, None),
+    ("list pending requests of alice", None, None),
+    ("list requests submitted by alice", None, None),
+    ("show bob's and carol's requests", None, None),
+    ("list requests for alice and bob", None, None),
+    ("show alice.smith@corp.com's requests", None, None),
+    ("How do I reset my VPN password?", None, None),
+]
+
+E2E = ["Is 2025-12-25 a holiday?", "is 2025-07-04 a company holiday", "list alice's pending requests",
+       "Show all approved requests", "List leave requests for bob"]
+
+def quality():
+    from agent.router import route
+    routed = correct = wrong = missed = 0
+    t0 = time.perf_counter()
+    for msg, tool, args in LABELLED:
+        r = route(msg)
+        if r is None:
+            missed += tool is not None
+            continue
+        routed += 1
+        if r.name == tool and r.args == args:
+            correct += 1
+        else:
+            wrong += 1
+            print(f"  WRONG  {msg!r}: {r.name} {r.args} (expected {tool} {args})")
+    per_msg_us = (time.perf_counter() - t0) / len(LABELLED) * 1e6
+    routable = sum(t is not None for _, t, _ in LABELLED)
+    print(f"messages={len(LABELLED)} routable={routable} routed={routed} correct={correct} "
+          f"wrong={wrong} missed={missed}  router cost={per_msg_us:.0f} µs/msg")
+
+def _llm_calls(trace):
+    # every planner "plan" and every synthesis is one LLM call; fast-path plans are not
+    fast = any(e.get("route", {}).get("path") == "fast" for e in trace)
+    plans = sum("plan" in e for e in trace)
+    return (0 if fast else plans) + sum("synthesis" in e for e in trace)
+
+async def _e2e(fast: bool, repeats: int):
+    import agent.react_agent as ra
+    ra.AGENT_FAST_PATH = fast
+    lat, calls = [], 0
+    for _ in range(repeats):
+        for msg in E2E:
+            t0 = time.perf_counter()
+            res = await ra.arun_agent(msg)
+            lat.append((time.perf_counter() - t0) * 1000)
+            calls += _llm_calls(res["trace"])
+    return lat, calls
+
+def e2e(repeats: int):
+    print(f"{'fast path':<10}{'p50 ms':>9}{'mean ms':>9}{'LLM calls':>11}")
+    results = {}
+    for fast in (False, True):
+        lat, calls = asyncio.run(_e2e(fast, repeats))
+        results[fast] = (statistics.median(lat), statistics.mean(lat), calls)
+        print(f"{'on' if fast else 'off':<10}{results[fast][0]:>9.1f}{results[fast][1]:>9.1f}{calls:>11}")
+    off, on = results[False], results[True]
+    print(f"planner calls avoided: {off[2] - on[2]} of {off[2]}; "
+          f"mean latency saved: {off[1] - on[1]:.1f} ms/msg")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--e2e", action="store_true", help="also run the agent with the fast path on/off")
+    ap.add_argument("--stub", action="store_true", help="start scripts.stub_llm and point Groq at it")
+    ap.add_argument("--repeats", type=int, default=3)
+    args = ap.parse_args()
+
+    # measure real planner calls, not LLM response-cache hits
+    os.environ.setdefault("LLM_CACHE_MODE", "off")
+    stub = None
+    if args.stub:
+        from scripts.bench_async import _spawn, _wait_up
+        stub = _spawn("scripts.stub_llm:app", 9100, {})
+        os.environ.setdefault("GROQ_API_KEY", "stub")
+        os.environ["GROQ_API_BASE"] = "http://127.0.0.1:9100"
+        asyncio.run(_wait_up("http://127.0.0.1:9100/stats"))
+    try:
+        quality()
+        if args.e2e:
+            e2e(args.repeats)
+    finally:
+        if stub is not None:
+            stub.terminate()
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,29 @@
+import argparse, json, time
 from pathlib import Path
 from rag.splitter import split_markdown
-from rag.vectorstore import upsert_documents
-from config_paths import VECTORSTORE_DIR, CHROMA_COLLECTION, EMBED_MODEL
+from rag.vectorstore import sync_documents, write_bm25
 
-def main():
+def main(dry_run: bool = False):
     data_dir = Path("data/policies")
-    paths = list(data_dir.glob("*.md"))
+    paths = sorted(data_dir.glob("*.md"))
     all_docs = []
     for p in paths:
         text = p.read_text(encoding="utf-8")
         docs = split_markdown(text, source=p.name)
         all_docs.extend(docs)
         print(f"{p.name}: {len(docs)} chunks")
-    print(f"Total chunks: {len(all_docs)}. Upserting to Chroma…")
-    upsert_documents(all_docs)
-    print("Done. Chroma persisted.")
+    print(f"Total chunks: {len(all_docs)}. Syncing to Chroma{' (dry run)' if dry_run else ''}…")
+    t0 = time.perf_counter()
+    summary = sync_documents(all_docs, dry_run=dry_run)
+    for src, f in summary["files"].items():
+        print(f"  {f['status']:<9} {src}: +{f['add']} -{f['delete']} ={f['unchanged']}")
+    print(json.dumps({k: v for k, v in summary.items() if k != "files"}))
+    if not dry_run:
+        write_bm25(all_docs)
+        print(f"BM25 index rebuilt ({len(all_docs)} chunks).")
+    print(f"Done in {(time.perf_counter() - t0) * 1000:.0f} ms.")
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="Incrementally sync data/policies into Chroma.")
+    ap.add_argument("--dry-run", action="store_true", help="only report adds/updates/deletes")
+    main(dry_run=ap.parse_args().dry_run)
@@ -1,39 +1,52 @@
 # scripts/ingest_minimal.py
+"""
+Build the in-process VectorIndex from data/policies and save it for the API
+(RETRIEVER_BACKEND=numpy loads it memory-mapped from NUMPY_INDEX_DIR).
+
+  python -m scripts.ingest_minimal            # build, save, run demo queries
+  python -m scripts.ingest_minimal --no-save  # build in memory only
+"""
+import sys, time
 from pathlib import Path
 
 # --- project imports (works when run as: python -m scripts.ingest_minimal) ---
+from config import NUMPY_INDEX_DIR, ANN_MIN_SIZE
 from rag.embedder import Embedder
 from rag.index import VectorIndex
 from rag.retriever import Retriever
+from rag.vectorstore import save_index
 from rag.chunker import chunk_markdown  # your headings-aware chunker
-from tools.doc_search import doc_search
 from tools.answer_with_citations import synthesize_answer
 
 
 def build_retriever() -> Retriever:
     data_dir = Path("data/policies")
-    file = data_dir / "leave_policy.md"
-    text = file.read_text(encoding="utf-8")
-
-    # Tune these if you want more/fewer chunks
-    chunks = chunk_markdown(
-        text,
-        chunk_size=60,
-        overlap=20,
-        source=file.name,
-    )
-    print(f"num_chunks: {len(chunks)}")
-
     embedder = Embedder()
     index = VectorIndex()
 
-    ids = [c["id"] for c in chunks]
-    texts = [c["text"] for c in chunks]
-    metas = [c["meta"] for c in chunks]
+    for file in sorted(data_dir.glob("*.md")):
+        text = file.read_text(encoding="utf-8")
+
+        # Tune these if you want more/fewer chunks
+        chunks = chunk_markdown(
+            text,
+            chunk_size=60,
+            overlap=20,
+            source=file.name,
+        )
+        print(f"{file.name}: {len(chunks)} chunks")
+
+        ids = [c["id"] for c in chunks]
+        texts = [c["text"] for c in chunks]
+        metas = [c["meta"] for c in chunks]
 
-    vecs = embedder.encode(texts)
-    index.add(ids, vecs, metas, texts)
+        vecs = embedder.encode(texts)
+        index.add(ids, vecs, metas, texts)
 
+    print(f"num_chunks: {len(index)}")
+    if len(index) >= ANN_MIN_SIZE:
+        ivf = index.build_ann()
+        print(f"IVF built: nlist={ivf.nlist}")
     retriever = Retriever(index, embedder)
     return retriever
 
@@ -51,14 +64,20 @@ def demo_queries(retriever: Retriever) -> None:
         for h in hits[:3]:
             print(f"- {h['score']:.3f} :: {h['meta']} :: {h['text'][:90]}…")
 
-        # Tool output (what your agent would see)
-        tool_out = doc_search(q, retriever, top_k=5)
+        # Citations in the same shape doc_search returns to the agent
+        citations = [{"source": h["meta"].get("source"), "section": h["meta"].get("section")} for h in hits]
         # Synthesized, cited answer (what you'd show users)
-        answer = synthesize_answer(q, hits)  # or use tool_out to drive your LLM later
+        answer = synthesize_answer(q, hits)  # or use the hits to drive your LLM later
         print("\nAnswer:", answer)
-        print("Citations:", tool_out["citations"][:3])
+        print("Citations:", citations[:3])
 
 
 if __name__ == "__main__":
     retriever = build_retriever()
+    if "--no-save" not in sys.argv:
+        save_index(retriever.index, NUMPY_INDEX_DIR)  # also bumps the corpus version the caches key on
+        t0 = time.perf_counter()
+        loaded = VectorIndex.load(NUMPY_INDEX_DIR)
+        print(f"Saved to {NUMPY_INDEX_DIR}; cold load {(time.perf_counter() - t0) * 1000:.1f} ms "
+              f"(vectors memory-mapped: {type(loaded.vecs).__name__})")
     demo_queries(retriever)
@@ -0,0 +1,229 @@
+# scripts/loadtest.py
+"""
+Load test for /chat, /agent and the leave-request endpoints.
+
+Closed loop (fixed concurrency) or open loop (Poisson arrivals at --rate req/s),
+with a weighted scenario mix. Reports p50/p95/p99, throughput and error rate per
+scenario and writes everything as JSON so runs can be diffed across commits.
+
+By default it runs offline: starts scripts.stub_llm (configurable latency) and an
+API pointed at it, with the leave store on a throwaway copy of the database.
+
+  python -m scripts.loadtest --concurrency 32 --requests 500 --out bench/run.json
+  python -m scripts.loadtest --rate 50 --duration 30 --mix chat=2,agent=1,leave_list=1
+  python -m scripts.loadtest --api-url http://localhost:8000 ...   # existing API
+"""
+import argparse, asyncio, datetime, json, os, random, shutil, subprocess, tempfile, time
+from typing import Any, Dict, List, Optional
+import httpx
+from scripts.bench_async import _spawn, _wait_up
+from config import DATABASE_PATH
+
+CHAT_QUESTIONS = [
+    "How many PTO days in Year 1?", "What is the PTO carryover limit?", "How long is parental leave?",
+    "How many sick days do I get each year?", "Do I need a doctor's note for sick leave?",
+    "How do I reset my VPN password?", "Which expenses can I get reimbursed?", "Is jury duty paid?",
+]
+AGENT_MESSAGES = CHAT_QUESTIONS[:4] + [
+    "Is 2025-12-25 a holiday?", "Is 2025-07-04 a holiday and how many PTO days in year 2?",
+    "list alice's pending requests", "Show all approved requests",
+]
+USERS = ["alice", "bob", "carol", "dave", "erin", "frank"]
+
+class Scenarios:
+    """One coroutine per scenario name: returns the httpx response."""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random):
+        self.c = client
+        self.rng = rng
+        self.created: List[str] = []
+
+    async def chat(self):
+        return await self.c.post("/chat", json={"user": "load", "message": self.rng.choice(CHAT_QUESTIONS)})
+
+    async def agent(self):
+        return await self.c.post("/agent", json={"user": self.rng.choice(USERS),
+                                                 "message": self.rng.choice(AGENT_MESSAGES)})
+
+    async def leave_create(self):
+        start = datetime.date(2026, 1, 5) + datetime.timedelta(days=self.rng.randrange(300))
+        end = start + datetime.timedelta(days=self.rng.randrange(1, 5))
+        r = await self.c.post("/leave-requests", json={"user": self.rng.choice(USERS), "start_date": str(start),
+                                                       "end_date": str(end), "reason": "load test"})
+        if r.status_code == 200:
+            self.created.append(r.json()["id"])
+        return r
+
+    async def leave_list(self):
+        return await self.c.get("/leave-requests", params={"user": self.rng.choice(USERS)})
+
+    async def leave_get(self):
+        if not self.created:
+            return await self.leave_create()
+        return await self.c.get(f"/leave-requests/{self.rng.choice(self.created)}")
+
+    async def leave_approve(self):
+        if not self.created:
+            return await self.leave_create()
+        return await self.c.post(f"/leave-requests/{self.rng.choice(self.created)}/approve")
+
+    async def health(self):
+        return await self.c.get("/health")
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, w = part.partition("=")
+        if not hasattr(Scenarios, name.strip()):
+            raise SystemExit(f"unknown scenario {name!r}")
+        mix[name.strip()] = float(w or 1)
+    return mix
+
+def _pct(sorted_ms: List[float], p: float) -> float:
+    # nearest-rank percentile
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, max(0, int(round(p / 100 * len(sorted_ms) + 0.5)) - 1))]
+
+def _summary(samples: List[Dict[str, Any]], wall_s: float) -> Dict[str, Any]:
+    ms = sorted(s["ms"] for s in samples)
+    errors = sum(not s["ok"] for s in samples)
+    return {
+        "requests": len(samples), "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / wall_s, 2) if wall_s else 0.0,
+        "p50_ms": round(_pct(ms, 50), 1), "p95_ms": round(_pct(ms, 95), 1), "p99_ms": round(_pct(ms, 99), 1),
+        "mean_ms": round(sum(ms) / len(ms), 1) if ms else 0.0, "max_ms": round(ms[-1], 1) if ms else 0.0,
+    }
+
+async def _one(sc: Scenarios, name: str, samples: List[Dict[str, Any]], t_start: Optional[float] = None):
+    # open loop measures from the intended start, so queueing in the client counts (no coordinated omission)
+    t0 = t_start if t_start is not None else time.perf_counter()
+    status, ok = None, False
+    try:
+        r = await getattr(sc, name)()
+        status, ok = r.status_code, r.status_code < 400
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    samples.append({"scenario": name, "ms": (time.perf_counter() - t0) * 1000, "ok": ok, "status": status})
+
+async def run(api_url: str, mix: Dict[str, float], concurrency: int, rate: float, requests: int,
+              duration: float, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    samples: List[Dict[str, Any]] = []
+    limits = httpx.Limits(max_connections=max(concurrency, 64) + 8)
+    async with httpx.AsyncClient(base_url=api_url, timeout=120, limits=limits) as client:
+        sc = Scenarios(client, rng)
+        t0 = time.perf_counter()
+        if rate > 0:
+            # open loop: Poisson arrivals at `rate`, however slowly the server answers
+            tasks, t_next = [], t0
+            while (time.perf_counter() - t0 < duration) if duration else (len(tasks) < requests):
+                t_next += rng.expovariate(rate)
+                await asyncio.sleep(max(0.0, t_next - time.perf_counter()))
+                tasks.append(asyncio.create_task(_one(sc, rng.choices(names, weights)[0], samples, t_next)))
+            await asyncio.gather(*tasks)
+        else:
+            # closed loop: `concurrency` workers, each sends its next request when the last returns
+            deadline = t0 + duration if duration else None
+            remaining = [requests]
+
+            async def worker():
+                while (time.perf_counter() < deadline) if deadline else remaining[0] > 0:
+                    remaining[0] -= 1
+                    await _one(sc, rng.choices(names, weights)[0], samples)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - t0
+
+    by_scenario = {n: _summary([s for s in samples if s["scenario"] == n], wall) for n in names}
+    statuses: Dict[str, int] = {}
+    for s in samples:
+        statuses[str(s["status"])] = statuses.get(str(s["status"]), 0) + 1
+    return {"wall_s": round(wall, 2), "overall": _summary(samples, wall), "scenarios": by_scenario,
+            "statuses": statuses}
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _print(result: Dict[str, Any]):
+    print(f"{'scenario':<14}{'reqs':>7}{'err%':>7}{'req/s':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}")
+    rows = list(result["scenarios"].items()) + [("ALL", result["overall"])]
+    for name, s in rows:
+        print(f"{name:<14}{s['requests']:>7}{s['error_rate'] * 100:>7.1f}{s['throughput_rps']:>8.1f}"
+              f"{s['p50_ms']:>8.0f}{s['p95_ms']:>8.0f}{s['p99_ms']:>8.0f}{s['max_ms']:>8.0f}")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--api-url", default=None, help="use a running API instead of starting stub + API")
+    ap.add_argument("--mix", default="chat=2,agent=2,leave_create=1,leave_list=2,leave_get=1",
+                    help="weighted scenarios: " + ", ".join(n for n in vars(Scenarios) if not n.startswith("_")))
+    ap.add_argument("--concurrency", type=int, default=16, help="closed-loop workers (ignored with --rate)")
+    ap.add_argument("--rate", type=float, default=0.0, help="open-loop arrivals per second")
+    ap.add_argument("--requests", type=int, default=300, help="total requests (unless --duration)")
+    ap.add_argument("--duration", type=float, default=0.0, help="seconds to run instead of --requests")
+    ap.add_argument("--stub-latency-ms", default="300")
+    ap.add_argument("--stub-jitter-ms", default="50")
+    ap.add_argument("--api-env", action="append", default=[], metavar="KEY=VALUE",
+                    help="extra env for the spawned API, e.g. --api-env RETRIEVAL_MODE=hybrid")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default=None, help="write the JSON result here")
+    args = ap.parse_args()
+    mix = _parse_mix(args.mix)
+
+    procs, tmp = [], None
+    api_url = args.api_url
+    api_env: Dict[str, str] = {}
+    try:
+        if api_url is None:
+            stub_port, api_port = 9100, 8100
+            tmp = tempfile.mkdtemp(prefix="policybot-load-")
+            db = os.path.join(tmp, "policybot.db")
+            if os.path.exists(DATABASE_PATH):
+                shutil.copy(DATABASE_PATH, db)  # writes go to a throwaway copy
+            procs.append(_spawn("scripts.stub_llm:app", stub_port, {
+                "STUB_LLM_LATENCY_MS": args.stub_latency_ms, "STUB_LLM_JITTER_MS": args.stub_jitter_ms}))
+            api_env = {
+                "GROQ_API_BASE": f"http://127.0.0.1:{stub_port}", "GROQ_API_KEY": "stub",
+                "DATABASE_PATH": db, "LLM_CACHE_MODE": "off",
+                "ANSWER_CACHE_ENABLED": "false", "COALESCE_ENABLED": "false",
+            }
+            api_env.update(kv.split("=", 1) for kv in args.api_env)
+            procs.append(_spawn("api.app:app", api_port, api_env))
+            api_url = f"http://127.0.0.1:{api_port}"
+            asyncio.run(_wait_up(f"http://127.0.0.1:{stub_port}/stats"))
+            asyncio.run(_wait_up(f"{api_url}/health/ready"))  # measure a warmed-up API
+
+        result = asyncio.run(run(api_url, mix, args.concurrency, args.rate, args.requests, args.duration, args.seed))
+        result = {
+            "meta": {
+                "commit": _git_commit(), "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                "api_url": api_url, "mix": mix, "seed": args.seed,
+                "mode": "open" if args.rate > 0 else "closed",
+                "concurrency": None if args.rate > 0 else args.concurrency,
+                "rate": args.rate or None, "requests": None if args.duration else args.requests,
+                "duration_s": args.duration or None,
+                "stub_latency_ms": None if args.api_url else float(args.stub_latency_ms),
+                "api_env": {k: v for k, v in api_env.items() if k not in ("GROQ_API_KEY", "DATABASE_PATH")},
+            },
+            **result,
+        }
+        _print(result)
+        if args.out:
+            os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+            print(f"wrote {args.out}")
+    finally:
+        for p in procs:
+            p.terminate()
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,98 @@
 # scripts/migrate_requests_json_to_sqlite.py
-import json, os
+"""
+Load leave requests from the legacy JSON store into SQLite.
+
+The source (a JSON array, or NDJSON) is read incrementally, so memory doesn't
+grow with the file, and written in --batch sized INSERT ... ON CONFLICT(id)
+executemany calls, one commit each: existing ids are skipped (or, with --update,
+overwritten from the source). Re-running is safe.
+
+  python -m scripts.migrate_requests_json_to_sqlite
+  python -m scripts.migrate_requests_json_to_sqlite --src dump.ndjson --update
+"""
+import argparse, json, os, time
 from datetime import datetime
-from db.session import SessionLocal
+from itertools import chain, islice
+from typing import Any, Dict, Iterator, TextIO
+from sqlalchemy.dialects.sqlite import insert
+from db.session import engine, ensure_schema
 from db.models import LeaveRequest
 
 SRC = "data/requests_db.json"
+BATCH = 5000
+
+def iter_records(f: TextIO, chunk: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """Objects from a top-level JSON array or from NDJSON, one at a time."""
+    decoder = json.JSONDecoder()
+    buf = f.read(chunk).lstrip()
+    if not buf.startswith("["):  # NDJSON
+        tail = ""
+        for piece in chain([buf], iter(lambda: f.read(chunk), "")):
+            *lines, tail = (tail + piece).split("\n")
+            yield from (json.loads(line) for line in lines if line.strip())
+        if tail.strip():
+            yield json.loads(tail)
+        return
+    pos, eof = 1, False
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more = f.read(chunk)  # the next object runs past the buffer
+            buf, pos, eof = buf[pos:] + more, 0, not more
+            continue
+        yield obj
+        pos = end
+
+def _row(r: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": r["id"], "user": r["user"],
+        "start_date": datetime.fromisoformat(r["start_date"]).date(),
+        "end_date": datetime.fromisoformat(r["end_date"]).date(),
+        "reason": r["reason"], "status": r.get("status", "submitted"),
+        "created_at": datetime.fromisoformat(r["created_at"].replace("Z", "")),
+        "updated_at": datetime.fromisoformat(r["updated_at"].replace("Z", "")) if r.get("updated_at") else None,
+    }
+
+def migrate(src: str = SRC, batch: int = BATCH, update: bool = False) -> Dict[str, Any]:
+    ensure_schema()
+    stmt = insert(LeaveRequest.__table__)
+    if update:
+        stmt = stmt.on_conflict_do_update(index_elements=["id"],
+                                          set_={c: stmt.excluded[c] for c in ("user", "start_date", "end_date",
+                                                                              "reason", "status", "created_at",
+                                                                              "updated_at")})
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["id"])
+    read = written = 0
+    t0 = time.perf_counter()
+    with open(src, "r", encoding="utf-8") as f, engine.connect() as conn:
+        records = iter_records(f)
+        while rows := [_row(r) for r in islice(records, batch)]:
+            written += conn.execute(stmt, rows).rowcount  # executemany; skipped conflicts count 0
+            conn.commit()
+            read += len(rows)
+    return {"read": read, "written": written, "skipped": read - written,
+            "seconds": round(time.perf_counter() - t0, 2)}
 
 def main():
-    if not os.path.exists(SRC):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--src", default=SRC)
+    ap.add_argument("--batch", type=int, default=BATCH, help="rows per INSERT executemany / commit")
+    ap.add_argument("--update", action="store_true", help="overwrite existing ids instead of skipping them")
+    args = ap.parse_args()
+    if not os.path.exists(args.src):
         print("No JSON file found; nothing to migrate.")
         return
-    data = json.load(open(SRC, "r", encoding="utf-8"))
-    with SessionLocal() as s:
-        for r in data:
-            if s.get(LeaveRequest, r["id"]): 
-                continue
-            obj = LeaveRequest(
-                id=r["id"], user=r["user"],
-                start_date=datetime.fromisoformat(r["start_date"]).date(),
-                end_date=datetime.fromisoformat(r["end_date"]).date(),
-                reason=r["reason"], status=r.get("status","submitted"),
-                created_at=datetime.fromisoformat(r["created_at"].replace("Z","")),
-                updated_at=datetime.fromisoformat(r["updated_at"].replace("Z","")) if r.get("updated_at") else None
-            )
-            s.add(obj)
-        s.commit()
-    print("Migration complete.")
+    st = migrate(args.src, args.batch, args.update)
+    print(f"Migration complete: {st['read']} read, {st['written']} {'upserted' if args.update else 'inserted'}, "
+          f"{st['skipped']} skipped in {st['seconds']} s.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,101 @@
+# scripts/stub_llm.py
+"""
+Local stand-in for the Groq chat-completions API, for offline benchmarks.
+
+  STUB_LLM_LATENCY_MS=300 uvicorn scripts.stub_llm:app --port 9100
+  GROQ_API_BASE=http://127.0.0.1:9100 GROQ_API_KEY=stub uvicorn api.app:app
+
+Replies are canned but shaped like the real ones: planner prompts get a JSON
+plan (check_holiday / list_leave_requests / rag_answer picked from keywords,
+both holiday + rag_answer as one "tools" plan for "<date> holiday ... and ...",
+then "final" once a previous result is present), synthesis prompts get
+{"final_answer": ...}, anything else gets a short cited answer.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+LATENCY_MS = float(os.getenv("STUB_LLM_LATENCY_MS", "300"))
+JITTER_MS = float(os.getenv("STUB_LLM_JITTER_MS", "50"))
+TOKEN_MS = float(os.getenv("STUB_LLM_TOKEN_MS", "15"))  # gap between streamed chunks
+PROMPT_MS_PER_1K = float(os.getenv("STUB_LLM_PROMPT_MS_PER_1K", "0"))  # prefill cost per 1k prompt tokens
+
+app = FastAPI(title="Stub Groq API")
+calls = {"total": 0}
+
+def _user_line(prompt: str) -> str:
+    m = re.search(r"^User: (.*)$", prompt, re.M)
+    return m.group(1) if m else prompt[-200:]
+
+def reply_for(prompt: str) -> str:
+    if "Decide the NEXT best action" in prompt:
+        msg = _user_line(prompt).lower()
+        if "(previous result:" in prompt.lower():
+            return json.dumps({"action": "final", "answer": "Done (stub)."})
+        date = re.search(r"\d{4}-\d{2}-\d{2}", msg)
+        if "holiday" in msg and date and " and " in msg:
+            return json.dumps({"action": "tools", "calls": [
+                {"name": "check_holiday", "args": {"date_str": date.group(0)}},
+                {"name": "rag_answer", "args": {"query": _user_line(prompt).split(" and ", 1)[1]}},
+            ]})
+        if "holiday" in msg and date:
+            return json.dumps({"action": "tool", "name": "check_holiday", "args": {"date_str": date.group(0)}})
+        if "list" in msg and "request" in msg:
+            return json.dumps({"action": "tool", "name": "list_leave_requests", "args": {}})
+        return json.dumps({"action": "tool", "name": "rag_answer", "args": {"query": _user_line(prompt)}})
+    if "Reply with the answer text only" in prompt:
+        return "Stub synthesized answer."
+    if '"final_answer"' in prompt:
+        return json.dumps({"final_answer": "Stub synthesized answer."})
+    return "Full-time employees receive 15 days of PTO in Year 1.\nSource: leave_policy.md — 2. PTO Accrual"
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    calls["total"] += 1
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    prefill_ms = PROMPT_MS_PER_1K * _tokens(prompt) / 1000
+    await asyncio.sleep(max(0.0, LATENCY_MS + prefill_ms + random.uniform(-JITTER_MS, JITTER_MS)) / 1000)
+    text = reply_for(prompt)
+    usage = {"prompt_tokens": _tokens(prompt), "completion_tokens": _tokens(text)}
+    usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+    if body.get("stream"):
+        return StreamingResponse(_stream(body, text, usage), media_type="text/event-stream")
+    return {
+        "id": f"stub-{calls['total']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                     "finish_reason": "stop", "logprobs": None}],
+        "usage": usage,
+    }
+
+async def _stream(body: dict, text: str, usage: dict):
+    """OpenAI/Groq-style chunk stream: one chunk per word, then a finish chunk with usage."""
+    base = {"id": f"stub-{calls['total']}", "object": "chat.completion.chunk",
+            "created": int(time.time()), "model": body.get("model", "stub")}
+    words = re.findall(r"\S+\s*", text)
+    for i, w in enumerate(words):
+        if i:
+            await asyncio.sleep(TOKEN_MS / 1000)
+        delta = {"role": "assistant", "content": w} if i == 0 else {"content": w}
+        chunk = {**base, "choices": [{"index": 0, "delta": delta, "logprobs": None, "finish_reason": None}]}
+        yield f"data: {json.dumps(chunk)}\n\n"
+    done = {**base, "choices": [{"index": 0, "delta": {}, "logprobs": None, "finish_reason": "stop"}],
+            "x_groq": {"id": base["id"], "usage": usage}}
+    yield f"data: {json.dumps(done)}\n\n"
+    yield "data: [DONE]\n\n"
+
+@app.get("/stats")
+async def stats():
+    return calls
@@ -0,0 +1,12 @@
+# tests/conftest.py
+# Engines are configured at import, so point them at a scratch copy of the database
+# before any test module imports db/tools/api.
+import os, shutil, tempfile
+
+_tmp = tempfile.mkdtemp(prefix="policybot-tests-")
+shutil.copy("data/policybot.db", os.path.join(_tmp, "policybot.db"))
+os.environ["DATABASE_PATH"] = os.path.join(_tmp, "policybot.db")
+os.environ.setdefault("STARTUP_WARMUP", "off")
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_tmp, ignore_errors=True)
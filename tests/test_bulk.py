@@ -0,0 +1,51 @@
+# tests/test_bulk.py
+import asyncio
+import pytest
+import tools.leave_request as lr
+from db.session import ensure_schema
+
+ensure_schema()
+
+def _new(n, user="bulktest"):
+    items = [{"user": user, "start_date": "2026-03-02", "end_date": "2026-03-04", "reason": "test"}] * n
+    return [r["created"]["id"] for r in lr.bulk_create_leave_requests(items)["results"]]
+
+def test_partial_batch_applies_the_valid_items():
+    a, b = _new(2)
+    res = lr.bulk_set_status([a, "nope", b], "approved")
+    assert (res["ok"], res["applied"], res["failed"], res["rolled_back"]) == (False, 2, 1, False)
+    assert [r["ok"] for r in res["results"]] == [True, False, True]
+    assert lr.get_leave_request(a)["status"] == lr.get_leave_request(b)["status"] == "approved"
+
+def test_atomic_batch_rolls_back_on_any_failure():
+    a, b = _new(2)
+    res = lr.bulk_set_status([a, b, "nope"], "approved", atomic=True)
+    assert (res["applied"], res["rolled_back"]) == (0, True)
+    assert [r["error"] for r in res["results"]] == ["rolled back", "rolled back", "request not found"]
+    assert lr.get_leave_request(a)["status"] == lr.get_leave_request(b)["status"] == "submitted"
+
+def test_atomic_create_writes_nothing_if_an_item_is_invalid():
+    before = len(lr.list_leave_requests(user="bulkatomic"))
+    items = [{"user": "bulkatomic", "start_date": "2026-03-02", "end_date": "2026-03-04", "reason": "ok"},
+             {"user": "bulkatomic", "start_date": "2026-03-04", "end_date": "2026-03-02", "reason": "backwards"}]
+    res = asyncio.run(lr.abulk_create_leave_requests(items, atomic=True))
+    assert (res["applied"], res["failed"], res["rolled_back"]) == (0, 1, True)
+    assert len(lr.list_leave_requests(user="bulkatomic")) == before
+
+def test_duplicate_ids_are_rejected():
+    (a,) = _new(1)
+    with pytest.raises(ValueError, match="duplicate ids"):
+        lr.bulk_set_status([a, a, "nope"], "approved")
+    with pytest.raises(ValueError, match="duplicate ids"):
+        asyncio.run(lr.abulk_set_status([a, a], "approved"))
+    assert lr.get_leave_request(a)["status"] == "submitted"
+
+def test_api_rejects_duplicate_ids():
+    from fastapi.testclient import TestClient
+    from api.app import app
+    (a,) = _new(1)
+    with TestClient(app) as client:
+        r = client.post("/leave-requests/bulk/approve", json={"ids": [a, a]})
+        assert r.status_code == 422
+        r = client.post("/leave-requests/bulk/approve", json={"ids": [a, "nope"]})
+        assert r.status_code == 200 and r.json()["applied"] == 1
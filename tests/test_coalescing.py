@@ -0,0 +1,13 @@
+# tests/test_coalescing.py
+from api.app import _agent_key
+
+def test_general_questions_coalesce_across_users():
+    assert _agent_key("When is the next holiday", None) == _agent_key("when is the next holiday", "ana")
+
+def test_user_scoped_messages_coalesce_per_user():
+    assert _agent_key("show my requests", "ana") != _agent_key("show my requests", "ben")
+    assert _agent_key("show my requests", "ana") == _agent_key("Show  my requests", "ana")
+
+def test_user_scoped_messages_without_a_user_are_not_coalesced():
+    assert _agent_key("show my requests", None) is None
+    assert _agent_key("approve 1234", "") is None
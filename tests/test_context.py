@@ -0,0 +1,22 @@
+# tests/test_context.py
+from langchain_core.documents import Document
+from rag.context import pack_context
+
+SENTENCE = "Employees may carry forward up to five unused PTO days into the next calendar year."
+RULE = (" Carried-forward days must be used by March 31, after which they expire."
+        " Requests to carry forward more than five days need HR approval in writing.")
+
+def _doc(text, source):
+    return Document(page_content=text, metadata={"source": source, "h1": "PTO"})
+
+def test_longer_lower_ranked_block_is_kept():
+    docs = [_doc(SENTENCE, "a.md"), _doc(SENTENCE + RULE, "b.md")]
+    out, stats = pack_context(docs, budget=1000)
+    assert stats["duplicates"] == 0
+    assert [d.metadata["source"] for d in out] == ["a.md", "b.md"]
+
+def test_contained_lower_ranked_block_is_dropped():
+    docs = [_doc(SENTENCE + RULE, "b.md"), _doc(SENTENCE, "a.md")]
+    out, stats = pack_context(docs, budget=1000)
+    assert stats["duplicates"] == 1
+    assert [d.metadata["source"] for d in out] == ["b.md"]
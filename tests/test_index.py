@@ -0,0 +1,37 @@
+# tests/test_index.py
+import numpy as np
+import pytest
+from rag.index import VectorIndex
+
+def _index(storage, n=200, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((n, dim)).astype(np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    index = VectorIndex(dim=dim, capacity=8, storage=storage)  # small capacity: exercises growth
+    index.add([f"c{i}" for i in range(n)], vecs,
+              [{"source": f"doc{i % 5}.md", "h1": "Leave"} for i in range(n)], [f"text {i}" for i in range(n)])
+    return index, rng.standard_normal((5, dim)).astype(np.float32)
+
+@pytest.mark.parametrize("storage", ["float32", "float16", "int8"])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_round_trip(tmp_path, storage, mmap):
+    index, queries = _index(storage)
+    index.save(str(tmp_path))
+    loaded = VectorIndex.load(str(tmp_path), mmap=mmap)
+    assert (len(loaded), loaded.dim, loaded.storage) == (len(index), index.dim, storage)
+    assert (loaded.ids, loaded.metas, loaded.texts) == (index.ids, index.metas, index.texts)
+    assert isinstance(loaded.vecs, np.memmap) == mmap
+    np.testing.assert_array_equal(np.asarray(loaded.vecs), index.vecs)
+    for q in queries:
+        assert loaded.search(q, top_k=5) == index.search(q, top_k=5)
+        assert loaded.search(q, top_k=3, filters={"source": "doc2.md"}) == \
+               index.search(q, top_k=3, filters={"source": "doc2.md"})
+
+def test_round_trip_keeps_the_ann_quantizer(tmp_path):
+    index, queries = _index("float32", n=400)
+    index.build_ann(nlist=8)
+    index.save(str(tmp_path))
+    loaded = VectorIndex.load(str(tmp_path))
+    assert loaded.ann is not None
+    for q in queries:
+        assert loaded.search(q, top_k=5, exact=True) == index.search(q, top_k=5, exact=True)
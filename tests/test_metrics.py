@@ -0,0 +1,30 @@
+# tests/test_metrics.py
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi.responses import StreamingResponse
+from api.app import HTTPMetrics
+from tools.tracing import HTTP_SECONDS
+
+app = FastAPI()
+app.add_middleware(HTTPMetrics)
+
+@app.get("/_test/stream/{n}")
+async def _slow_stream(n: int):
+    async def chunks():
+        for i in range(n):
+            await asyncio.sleep(0.1)
+            yield f"data: {i}\n\n"
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+def test_streamed_response_is_timed_to_its_last_chunk():
+    key = ("GET", "/_test/stream/{n}", "200")
+    with TestClient(app) as client:
+        assert client.get("/_test/stream/3").text.count("data:") == 3
+    total, count = HTTP_SECONDS._series[key][-2:]
+    assert count == 1 and total >= 0.3
+
+def test_unmatched_route_is_one_series():
+    with TestClient(app) as client:
+        client.get("/no/such/path")
+    assert HTTP_SECONDS._series[("GET", "unmatched", "404")][-1] >= 1
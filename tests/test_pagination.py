@@ -0,0 +1,63 @@
+# tests/test_pagination.py
+from datetime import datetime, timedelta
+import pytest
+import tools.leave_request as lr
+from db.models import LeaveRequest
+from db.session import SessionLocal, ensure_schema
+
+ensure_schema()
+USER = "pagetest"
+
+def _seed(n=23):
+    # created_at repeats every 4 rows, so pages must break ties by id
+    t0 = datetime(2026, 1, 1, 9, 0, 0, 123456)
+    with SessionLocal() as s:
+        s.add_all(LeaveRequest(id=f"page-{i:03d}", user=USER, start_date=t0.date(), end_date=t0.date(),
+                               reason="test", status="approved" if i % 3 else "submitted",
+                               created_at=t0 + timedelta(seconds=i // 4)) for i in range(n))
+        s.commit()
+
+_seed()
+
+def _walk(limit, **filters):
+    pages, cursor = [], None
+    while True:
+        page = lr.list_leave_requests_page(limit=limit, cursor=cursor, **filters)
+        pages.append([r["id"] for r in page["requests"]])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return pages
+
+@pytest.mark.parametrize("limit", [1, 4, 5, 23, 100])
+@pytest.mark.parametrize("status", [None, "approved"])
+def test_pages_cover_the_list_without_duplicates_or_gaps(limit, status):
+    pages = _walk(limit, user=USER, status=status)
+    ids = [i for p in pages for i in p]
+    assert ids == [r["id"] for r in lr.list_leave_requests(user=USER, status=status)]
+    assert len(ids) == len(set(ids))
+    assert all(len(p) == limit for p in pages[:-1]) and 0 < len(pages[-1]) <= limit
+
+@pytest.mark.parametrize("cursor", ["garbage", "", "Zm9vfGJhcg", "MjAyNi0wMS0wMQ"])
+def test_bad_cursor_is_a_value_error(cursor):
+    if cursor == "":
+        assert lr.list_leave_requests_page(user=USER, cursor=cursor)["requests"]  # empty = first page
+        return
+    with pytest.raises(ValueError, match="invalid cursor"):
+        lr.list_leave_requests_page(user=USER, cursor=cursor)
+
+def test_api_follows_next_cursor_and_rejects_a_bad_one():
+    from fastapi.testclient import TestClient
+    from api.app import app
+    ids, cursor = [], None
+    with TestClient(app) as client:
+        while True:
+            params = {"user": USER, "limit": 6, **({"cursor": cursor} if cursor else {})}
+            r = client.get("/leave-requests", params=params)
+            assert r.status_code == 200
+            ids += [row["id"] for row in r.json()]
+            cursor = r.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert ids == [r["id"] for r in lr.list_leave_requests(user=USER)]
+        r = client.get("/leave-requests", params={"user": USER, "cursor": "garbage"})
+        assert r.status_code == 400 and "cursor" in r.json()["error"]
@@ -0,0 +1,39 @@
+# tests/test_router.py
+import pytest
+from agent.router import route
+
+RID = "3f2a9c1e-1b2c-4d5e-8f90-123456789abc"
+
+@pytest.mark.parametrize("msg, name, args", [
+    ("Is 2025-12-25 a holiday?", "check_holiday", {"date_str": "2025-12-25"}),
+    (f"Approve {RID}", "approve_leave_request", {"id": RID}),
+    ("list requests", "list_leave_requests", {}),
+    ("Show all approved requests", "list_leave_requests", {"status": "approved"}),
+    ("List leave requests for bob", "list_leave_requests", {"user": "bob"}),
+    ("list alice's pending requests", "list_leave_requests", {"user": "alice", "status": "submitted"}),
+    ("show alice.smith's requests", "list_leave_requests", {"user": "alice.smith"}),
+    ("Book vacation for dave from 2025-09-10 to 2025-09-12", "create_leave_request",
+     {"user": "dave", "start_date": "2025-09-10", "end_date": "2025-09-12", "reason": "vacation"}),
+])
+def test_routes(msg, name, args):
+    r = route(msg)
+    assert r is not None and (r.name, r.args) == (name, args)
+
+@pytest.mark.parametrize("msg", [
+    # half-parsed list messages: routing them would drop the user filter or a name
+    "list requests from alice",
+    "list requests by alice",
+    "list alice requests",
+    "list pending requests of alice",
+    "list requests submitted by alice",
+    "show bob's and carol's requests",
+    "list requests for alice and bob",
+    "show alice.smith@corp.com's requests",
+    # first person, negation, ambiguity
+    "List my requests",
+    f"Don't approve {RID}",
+    "What are the pending and approved requests?",
+    "How many PTO days in Year 1?",
+])
+def test_defers_to_planner(msg):
+    assert route(msg) is None
@@ -0,0 +1,48 @@
+# tests/test_tool_cache.py
+import asyncio
+from agent.react_agent import _acall_cached
+from agent.tool_cache import tool_cache
+from agent.tools import TOOLS
+from db.session import ensure_schema
+
+ensure_schema()
+
+def _call(name, **args):
+    return asyncio.run(_acall_cached(name, TOOLS[name], args))
+
+def _new(user):
+    obs, _ = _call("create_leave_request", user=user, start_date="2026-04-06", end_date="2026-04-08",
+                   reason="test")
+    return obs["created"]["id"]
+
+def test_list_is_cached_until_a_write_for_that_user():
+    tool_cache.clear()
+    _new("cacheuser")
+    first, cache = _call("list_leave_requests", user="cacheuser")
+    assert cache == "miss"
+    assert _call("list_leave_requests", user="cacheuser") == (first, "hit")
+
+    req_id = _new("cacheuser")  # create drops the user's cached list
+    listed, cache = _call("list_leave_requests", user="cacheuser")
+    assert cache == "miss" and listed["count"] == first["count"] + 1
+    assert _call("list_leave_requests", user="cacheuser")[1] == "hit"
+
+    _call("approve_leave_request", id=req_id)  # so does approve
+    listed, cache = _call("list_leave_requests", user="cacheuser")
+    assert cache == "miss"
+    assert {r["id"]: r["status"] for r in listed["requests"]}[req_id] == "approved"
+
+def test_a_write_keeps_other_users_lists_and_drops_all_users_lists():
+    tool_cache.clear()
+    _call("list_leave_requests", user="cacheother")
+    _call("list_leave_requests")  # no user filter: every user's rows
+    _new("cacheuser")
+    assert _call("list_leave_requests", user="cacheother")[1] == "hit"
+    assert _call("list_leave_requests")[1] == "miss"
+
+def test_failed_write_invalidates_nothing():
+    tool_cache.clear()
+    _call("list_leave_requests", user="cacheuser")
+    obs, _ = _call("approve_leave_request", id="no-such-id")
+    assert obs["error"] == "request not found"
+    assert _call("list_leave_requests", user="cacheuser")[1] == "hit"
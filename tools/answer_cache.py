@@ -0,0 +1,106 @@
+# tools/answer_cache.py
+"""
+Semantic answer cache.
+- lookup(question) -> (answer, source_documents) | None
+- store(question, answer, source_documents, latency_ms)
+
+A question hits when its embedding is within `threshold` cosine similarity of a
+previously answered one *and* it mentions the same numbers ("Year 1" vs "Year 2"
+embed almost identically but must not share an answer).
+Entries are tagged with the corpus version written at ingest time; when it
+changes, the whole cache is dropped.
+"""
+
+from __future__ import annotations
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from rag.embeddings import get_embeddings
+from rag.vectorstore import get_corpus_version
+from config import ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_SIZE
+
+_NUM_RE = re.compile(r"\d+")
+
+def _numbers(text: str) -> Tuple[str, ...]:
+    return tuple(sorted(_NUM_RE.findall(text)))
+
+class AnswerCache:
+    def __init__(self, threshold: float = ANSWER_CACHE_THRESHOLD, max_size: int = ANSWER_CACHE_SIZE):
+        self.threshold = threshold
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._vecs: Optional[np.ndarray] = None  # (N, D), unit rows
+        self._entries: List[Dict[str, Any]] = []
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+        self.invalidations = 0
+
+    def _embed(self, question: str) -> np.ndarray:
+        v = np.asarray(get_embeddings().embed_query(question), dtype=np.float32)
+        return v / (np.linalg.norm(v) + 1e-12)
+
+    def _check_version(self):
+        # caller holds the lock
+        version = get_corpus_version()
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._version = version
+            self._vecs = None
+            self._entries = []
+
+    def lookup(self, question: str) -> Optional[Tuple[str, list]]:
+        q = self._embed(question)
+        nums = _numbers(question)
+        with self._lock:
+            self._check_version()
+            if self._vecs is not None:
+                sims = self._vecs @ q
+                for i in np.argsort(-sims):
+                    if sims[i] < self.threshold:
+                        break
+                    e = self._entries[i]
+                    if e["numbers"] == nums:
+                        self.hits += 1
+                        self.saved_ms += e["latency_ms"]
+                        return e["answer"], e["sources"]
+            self.misses += 1
+        return None
+
+    def store(self, question: str, answer: str, sources: list, latency_ms: float = 0.0):
+        q = self._embed(question)
+        with self._lock:
+            self._check_version()
+            self._entries.append({
+                "question": question, "numbers": _numbers(question),
+                "answer": answer, "sources": sources, "latency_ms": latency_ms,
+            })
+            self._vecs = q[None, :] if self._vecs is None else np.vstack([self._vecs, q])
+            if len(self._entries) > self.max_size:  # drop oldest
+                self._entries = self._entries[-self.max_size:]
+                self._vecs = self._vecs[-self.max_size:]
+
+    def clear(self):
+        with self._lock:
+            self._vecs = None
+            self._entries = []
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "threshold": self.threshold,
+                "corpus_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "saved_ms": round(self.saved_ms, 1),
+                "invalidations": self.invalidations,
+            }
+
+answer_cache = AnswerCache()
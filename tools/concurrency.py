@@ -0,0 +1,23 @@
+# tools/concurrency.py
+"""
+Bounded executor for CPU-bound work on the async path.
+
+Embedding queries, Chroma/VectorIndex search and BM25 scoring are CPU work;
+the event loop hands them to this pool via run_cpu(). Everything else on the
+async path (LLM calls, SQLite, HTTP tools) is awaited natively.
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from config import CPU_WORKERS
+
+_cpu_pool = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="policybot-cpu")
+
+async def run_cpu(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    # carry contextvars (tools.tracing span collection) into the worker thread
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_cpu_pool, functools.partial(ctx.run, fn, *args, **kwargs))
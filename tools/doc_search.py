@@ -1,9 +1,11 @@
 from typing import Dict, Any, List, Tuple
 from rag.vectorstore import get_retriever
+from tools.tracing import span
 
 def doc_search(query: str, k: int = 5) -> Dict[str, Any]:
     retriever = get_retriever(k=k)
-    docs = retriever.get_relevant_documents(query)
+    with span("retrieve", "doc_search", k=k):
+        docs = retriever.invoke(query)
 
     def sect(md):
         return md.get("h2") or md.get("h1") or md.get("h3") or ""
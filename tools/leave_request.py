@@ -2,8 +2,13 @@
 """
 Leave Request tool (simulated).
 - create_leave_request(user, start_date, end_date, reason) -> dict
-- list_leave_requests(user=None) -> list[dict]
+- list_leave_requests(user=None, status=None) -> list[dict]  (every row: scripts; serving paths page)
+- list_leave_requests_page(user, status, limit, cursor) -> {"requests", "next_cursor"}
 - get_leave_request(req_id) -> dict | None
+- bulk_create_leave_requests(items, atomic) / bulk_set_status(ids, status, atomic) -> per-item results,
+  one transaction
+- a* variants (acreate_leave_request, alist_leave_requests, ...) for the async API path
+- aexport_leave_requests(user, status, fmt) -> NDJSON / CSV text, streamed
 
 Storage: data/requests_db.json  (an array of request objects)
 Date format: ISO 'YYYY-MM-DD'
@@ -11,11 +16,16 @@ Date format: ISO 'YYYY-MM-DD'
 
 # tools/leave_request.py  (DB-backed version)
 from __future__ import annotations
+import base64
+import csv
+import io
+import json
 from datetime import datetime
 import uuid
-from typing import Optional, List, Dict, Any
-from sqlalchemy import select
-from db.session import SessionLocal
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+from sqlalchemy import select, tuple_
+from config import LEAVE_BULK_MAX, LEAVE_PAGE_SIZE, LEAVE_PAGE_MAX
+from db.session import SessionLocal, AsyncSessionLocal, async_engine
 from db.models import LeaveRequest
 
 VALID_STATUSES = {"submitted", "approved", "rejected", "cancelled"}
@@ -28,57 +38,99 @@ def _validate(user: str, start_date: str, end_date: str, reason: str):
     if ed < sd: raise ValueError("end_date must be on or after start_date")
     return sd, ed
 
-def create_leave_request(user: str, start_date: str, end_date: str, reason: str) -> Dict[str, Any]:
+def _to_dict(r: LeaveRequest) -> Dict[str, Any]:
+    return {
+        "id": r.id, "user": r.user,
+        "start_date": r.start_date.isoformat(),
+        "end_date": r.end_date.isoformat(),
+        "reason": r.reason, "status": r.status,
+        "created_at": r.created_at.isoformat()+"Z",
+        "updated_at": r.updated_at.isoformat()+"Z" if r.updated_at else None
+    }
+
+def _new_request(user: str, start_date: str, end_date: str, reason: str) -> LeaveRequest:
     sd, ed = _validate(user, start_date, end_date, reason)
+    return LeaveRequest(
+        id=str(uuid.uuid4()),
+        user=user,
+        start_date=sd,
+        end_date=ed,
+        reason=reason,
+        status="submitted",
+        created_at=datetime.utcnow(),
+    )
+
+def _created(req: LeaveRequest, start_date: str, end_date: str) -> Dict[str, Any]:
+    return {
+        "id": req.id, "user": req.user, "start_date": start_date, "end_date": end_date,
+        "reason": req.reason, "status": req.status, "created_at": req.created_at.isoformat()+"Z"
+    }
+
+def check_status(status: Optional[str]):
+    if status and status not in VALID_STATUSES:
+        raise ValueError(f"status must be one of {sorted(VALID_STATUSES)}")
+
+def _filter(stmt, user: Optional[str], status: Optional[str]):
+    check_status(status)
+    if user:  stmt = stmt.filter(LeaveRequest.user == user)
+    if status: stmt = stmt.filter(LeaveRequest.status == status)
+    # newest first; id breaks created_at ties so keyset pages never skip or repeat a row
+    return stmt.order_by(LeaveRequest.created_at.desc(), LeaveRequest.id.desc())
+
+def _list_stmt(user: Optional[str], status: Optional[str],
+               after: Optional[Tuple[datetime, str]] = None, limit: Optional[int] = None):
+    stmt = _filter(select(LeaveRequest), user, status)
+    if after is not None:
+        stmt = stmt.filter(tuple_(LeaveRequest.created_at, LeaveRequest.id) < after)
+    return stmt.limit(limit) if limit is not None else stmt
+
+# ---------- keyset pagination: the cursor is the (created_at, id) of the last row served
+
+def _encode_cursor(r: LeaveRequest) -> str:
+    return base64.urlsafe_b64encode(f"{r.created_at.isoformat()}|{r.id}".encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    if not cursor:
+        return None
+    try:
+        created_at, req_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), req_id
+    except ValueError:  # also covers binascii.Error and UnicodeDecodeError
+        raise ValueError("invalid cursor")
+
+def _page_limit(limit: Optional[int]) -> int:
+    return max(1, min(limit or LEAVE_PAGE_SIZE, LEAVE_PAGE_MAX))
+
+def _page(rows: List[LeaveRequest], limit: int) -> Dict[str, Any]:
+    # one row past the page tells whether there is a next page
+    return {"requests": [_to_dict(r) for r in rows[:limit]],
+            "next_cursor": _encode_cursor(rows[limit - 1]) if len(rows) > limit else None}
+
+def create_leave_request(user: str, start_date: str, end_date: str, reason: str) -> Dict[str, Any]:
+    req = _new_request(user, start_date, end_date, reason)
     with SessionLocal() as s:
-        req = LeaveRequest(
-            id=str(uuid.uuid4()),
-            user=user,
-            start_date=sd,
-            end_date=ed,
-            reason=reason,
-            status="submitted",
-            created_at=datetime.utcnow(),
-        )
         s.add(req)
         s.commit()
-        return {
-            "id": req.id, "user": req.user, "start_date": start_date, "end_date": end_date,
-            "reason": req.reason, "status": req.status, "created_at": req.created_at.isoformat()+"Z"
-        }
+        return _created(req, start_date, end_date)
 
 def list_leave_requests(user: Optional[str]=None, status: Optional[str]=None) -> List[Dict[str, Any]]:
     with SessionLocal() as s:
-        stmt = select(LeaveRequest)
-        if user:  stmt = stmt.filter(LeaveRequest.user == user)
-        if status:
-            if status not in VALID_STATUSES: raise ValueError(f"status must be one of {sorted(VALID_STATUSES)}")
-            stmt = stmt.filter(LeaveRequest.status == status)
-        rows = s.execute(stmt.order_by(LeaveRequest.created_at.desc())).scalars().all()
-        out=[]
-        for r in rows:
-            out.append({
-                "id": r.id, "user": r.user,
-                "start_date": r.start_date.isoformat(),
-                "end_date": r.end_date.isoformat(),
-                "reason": r.reason, "status": r.status,
-                "created_at": r.created_at.isoformat()+"Z",
-                "updated_at": r.updated_at.isoformat()+"Z" if r.updated_at else None
-            })
-        return out
+        rows = s.execute(_list_stmt(user, status)).scalars().all()
+        return [_to_dict(r) for r in rows]
+
+def list_leave_requests_page(user: Optional[str]=None, status: Optional[str]=None,
+                             limit: Optional[int]=None, cursor: Optional[str]=None) -> Dict[str, Any]:
+    """One page, newest first: {"requests": [...], "next_cursor": str | None}."""
+    limit = _page_limit(limit)
+    with SessionLocal() as s:
+        rows = s.execute(_list_stmt(user, status, _decode_cursor(cursor), limit + 1)).scalars().all()
+        return _page(rows, limit)
 
 def get_leave_request(req_id: str) -> Optional[Dict[str, Any]]:
     with SessionLocal() as s:
         r = s.get(LeaveRequest, req_id)
         if not r: return None
-        return {
-            "id": r.id, "user": r.user,
-            "start_date": r.start_date.isoformat(),
-            "end_date": r.end_date.isoformat(),
-            "reason": r.reason, "status": r.status,
-            "created_at": r.created_at.isoformat()+"Z",
-            "updated_at": r.updated_at.isoformat()+"Z" if r.updated_at else None
-        }
+        return _to_dict(r)
 
 def _set_status(req_id: str, new_status: str) -> Dict[str, Any]:
     if new_status not in VALID_STATUSES:
@@ -87,10 +139,11 @@ def _set_status(req_id: str, new_status: str) -> Dict[str, Any]:
         r = s.get(LeaveRequest, req_id)
         if not r:
             return {"ok": False, "error": "request not found", "id": req_id}
+        previous = r.status
         r.status = new_status
         r.updated_at = datetime.utcnow()
         s.commit()
-        return {"ok": True, "request": get_leave_request(req_id), "previous_status": None}
+        return {"ok": True, "request": _to_dict(r), "previous_status": previous}
 
 def approve_leave_request(req_id: str) -> Dict[str, Any]:
     return _set_status(req_id, "approved")
@@ -101,6 +154,189 @@ def reject_leave_request(req_id: str) -> Dict[str, Any]:
 def cancel_leave_request(req_id: str) -> Dict[str, Any]:
     return _set_status(req_id, "cancelled")
 
+# ---------- bulk: one transaction, one result per item (in input order)
+# Invalid items and unknown ids fail on their own and the rest are written, unless
+# atomic=True: then any failure rolls the whole batch back. Rows are inserted with
+# one executemany and status changes load every id with one SELECT ... IN.
+
+def _check_bulk(n: int):
+    if n > LEAVE_BULK_MAX:
+        raise ValueError(f"at most {LEAVE_BULK_MAX} items per bulk call")
+
+def _bulk_new(items: List[Dict[str, Any]]) -> Tuple[List[LeaveRequest], List[Dict[str, Any]]]:
+    _check_bulk(len(items))
+    reqs, results = [], []
+    for i, it in enumerate(items):
+        try:
+            req = _new_request(it.get("user"), it.get("start_date"), it.get("end_date"), it.get("reason"))
+        except (TypeError, ValueError) as e:
+            results.append({"index": i, "ok": False, "error": str(e)})
+            continue
+        reqs.append(req)
+        results.append({"index": i, "ok": True, "created": _created(req, it["start_date"], it["end_date"])})
+    return reqs, results
+
+def check_bulk_ids(ids: List[str]):
+    # rejected rather than merged: a repeated id is most likely a client bug, and one
+    # result per row keeps "applied" equal to the number of rows changed
+    seen, dupes = set(), set()
+    for i in ids:
+        (dupes if i in seen else seen).add(i)
+    if dupes:
+        raise ValueError(f"duplicate ids: {', '.join(sorted(dupes))}")
+
+def _bulk_ids(ids: List[str], new_status: str) -> List[str]:
+    check_status(new_status)
+    _check_bulk(len(ids))
+    check_bulk_ids(ids)
+    return ids
+
+def _bulk_apply(rows: Dict[str, LeaveRequest], ids: List[str], new_status: str) -> List[Dict[str, Any]]:
+    now, results = datetime.utcnow(), []
+    for i, req_id in enumerate(ids):
+        r = rows.get(req_id)
+        if r is None:
+            results.append({"index": i, "ok": False, "error": "request not found", "id": req_id})
+            continue
+        previous, r.status, r.updated_at = r.status, new_status, now
+        results.append({"index": i, "ok": True, "request": _to_dict(r), "previous_status": previous})
+    return results
+
+def _bulk_result(results: List[Dict[str, Any]], atomic: bool) -> Dict[str, Any]:
+    failed = sum(not r["ok"] for r in results)
+    rolled_back = atomic and failed > 0
+    if rolled_back:
+        results = [r if not r["ok"] else
+                   {"index": r["index"], "ok": False, "error": "rolled back", "id": (r.get("request") or r["created"])["id"]}
+                   for r in results]
+    # rows written: one per successful item (ids are unique within a batch)
+    applied = len({(r.get("request") or r["created"])["id"] for r in results if r["ok"]})
+    return {"ok": failed == 0, "applied": applied,
+            "failed": failed, "rolled_back": rolled_back, "results": results}
+
+def bulk_create_leave_requests(items: List[Dict[str, Any]], atomic: bool = False) -> Dict[str, Any]:
+    reqs, results = _bulk_new(items)
+    if reqs and not (atomic and len(reqs) < len(items)):
+        with SessionLocal() as s:
+            s.add_all(reqs)
+            s.commit()
+    return _bulk_result(results, atomic)
+
+def bulk_set_status(ids: List[str], new_status: str, atomic: bool = False) -> Dict[str, Any]:
+    ids = _bulk_ids(ids, new_status)
+    with SessionLocal() as s:
+        rows = {r.id: r for r in s.execute(select(LeaveRequest).where(LeaveRequest.id.in_(ids))).scalars()}
+        results = _bulk_apply(rows, ids, new_status)
+        if atomic and len(rows) < len(ids):
+            s.rollback()
+        else:
+            s.commit()
+    return _bulk_result(results, atomic)
+
+# ---------- async variants (same behaviour, AsyncSessionLocal / aiosqlite)
+
+async def acreate_leave_request(user: str, start_date: str, end_date: str, reason: str) -> Dict[str, Any]:
+    req = _new_request(user, start_date, end_date, reason)
+    async with AsyncSessionLocal() as s:
+        s.add(req)
+        await s.commit()
+        return _created(req, start_date, end_date)
+
+async def alist_leave_requests(user: Optional[str]=None, status: Optional[str]=None) -> List[Dict[str, Any]]:
+    async with AsyncSessionLocal() as s:
+        rows = (await s.execute(_list_stmt(user, status))).scalars().all()
+        return [_to_dict(r) for r in rows]
+
+async def alist_leave_requests_page(user: Optional[str]=None, status: Optional[str]=None,
+                                    limit: Optional[int]=None, cursor: Optional[str]=None) -> Dict[str, Any]:
+    limit = _page_limit(limit)
+    async with AsyncSessionLocal() as s:
+        rows = (await s.execute(_list_stmt(user, status, _decode_cursor(cursor), limit + 1))).scalars().all()
+        return _page(rows, limit)
+
+async def aget_leave_request(req_id: str) -> Optional[Dict[str, Any]]:
+    async with AsyncSessionLocal() as s:
+        r = await s.get(LeaveRequest, req_id)
+        return _to_dict(r) if r else None
+
+async def _aset_status(req_id: str, new_status: str) -> Dict[str, Any]:
+    if new_status not in VALID_STATUSES:
+        raise ValueError(f"status must be one of {sorted(VALID_STATUSES)}")
+    async with AsyncSessionLocal() as s:
+        r = await s.get(LeaveRequest, req_id)
+        if not r:
+            return {"ok": False, "error": "request not found", "id": req_id}
+        previous = r.status
+        r.status = new_status
+        r.updated_at = datetime.utcnow()
+        await s.commit()
+        return {"ok": True, "request": _to_dict(r), "previous_status": previous}
+
+async def aapprove_leave_request(req_id: str) -> Dict[str, Any]:
+    return await _aset_status(req_id, "approved")
+
+async def areject_leave_request(req_id: str) -> Dict[str, Any]:
+    return await _aset_status(req_id, "rejected")
+
+async def acancel_leave_request(req_id: str) -> Dict[str, Any]:
+    return await _aset_status(req_id, "cancelled")
+
+async def abulk_create_leave_requests(items: List[Dict[str, Any]], atomic: bool = False) -> Dict[str, Any]:
+    reqs, results = _bulk_new(items)
+    if reqs and not (atomic and len(reqs) < len(items)):
+        async with AsyncSessionLocal() as s:
+            s.add_all(reqs)
+            await s.commit()
+    return _bulk_result(results, atomic)
+
+async def abulk_set_status(ids: List[str], new_status: str, atomic: bool = False) -> Dict[str, Any]:
+    ids = _bulk_ids(ids, new_status)
+    async with AsyncSessionLocal() as s:
+        rows = {r.id: r for r in (await s.execute(select(LeaveRequest).where(LeaveRequest.id.in_(ids)))).scalars()}
+        results = _bulk_apply(rows, ids, new_status)
+        if atomic and len(rows) < len(ids):
+            await s.rollback()
+        else:
+            await s.commit()
+    return _bulk_result(results, atomic)
+
+# ---------- streaming export
+
+EXPORT_FIELDS = ("id", "user", "start_date", "end_date", "reason", "status", "created_at", "updated_at")
+
+def _export_value(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return v.isoformat() + "Z"
+    return v.isoformat() if hasattr(v, "isoformat") else v
+
+async def aexport_leave_requests(user: Optional[str]=None, status: Optional[str]=None,
+                                 fmt: str = "ndjson", batch: int = 500) -> AsyncIterator[str]:
+    """
+    All matching requests, newest first, as NDJSON lines or CSV (with a header row).
+    Rows come from a server-side cursor as plain Core tuples, `batch` at a time, so
+    memory stays flat however many rows match. In WAL mode the read snapshot
+    doesn't block writers while the export runs.
+    """
+    table = LeaveRequest.__table__
+    stmt = _filter(select(*(table.c[f] for f in EXPORT_FIELDS)), user, status)
+    async with async_engine.connect() as conn:
+        result = await conn.stream(stmt)
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(EXPORT_FIELDS)
+            async for rows in result.partitions(batch):
+                writer.writerows([_export_value(v) for v in row] for row in rows)
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+            if buf.tell():
+                yield buf.getvalue()
+        else:
+            async for rows in result.partitions(batch):
+                yield "".join(json.dumps(dict(zip(EXPORT_FIELDS, map(_export_value, row))),
+                                         ensure_ascii=False) + "\n" for row in rows)
+
 # ---------- (optional) JSON schema for an LLM planner/validator later
 
 CREATE_LEAVE_REQUEST_SCHEMA: Dict[str, Any] = {
@@ -0,0 +1,272 @@
+# tools/llm_client.py
+"""
+Shared LLM client for the agent and the QA chain.
+- get_llm() -> CachedChatModel (one instance, a LangChain chat model)
+- llm_cache_stats()
+
+Pooling: the underlying ChatGroq clients are reused - one for sync callers and
+one per event loop (its async HTTP pool is bound to the loop it was first used
+on). Building a ChatGroq costs ~100 ms of CPU, so per-call construction would
+also stall the event loop.
+
+Response cache (LLM_CACHE_MODE), keyed by sha256(model + temperature + stop + messages)
+and stored in SQLite at LLM_CACHE_PATH:
+  off     always call the API, store nothing
+  cache   serve stored responses, call + store on a miss (temperature 0 only);
+          bounded by LLM_CACHE_TTL_S and LLM_CACHE_MAX_ROWS
+  record  always call the API and store the response (refreshes recordings)
+  replay  serve stored responses only; a miss raises LLMReplayMiss - no network,
+          no API key needed, reproducible benchmarks
+The store is a blocking sqlite3 file, so the async paths reach it via asyncio.to_thread.
+"""
+
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, List, Optional
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from config import (
+    GROQ_API_KEY, GROQ_MODEL, LLM_CACHE_MAX_ROWS, LLM_CACHE_MODE, LLM_CACHE_PATH, LLM_CACHE_TTL_S,
+)
+from tools.tracing import LLM_TOKENS, Span, span
+
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
+
+MODES = ("off", "cache", "record", "replay")
+
+class LLMReplayMiss(RuntimeError):
+    """Replay mode and no recorded response for this prompt."""
+
+class ResponseStore:
+    """SQLite table of recorded responses: key -> {"content": str, "usage": {...} | None}."""
+
+    PRUNE_EVERY = 100  # puts between max_rows checks
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._puts = 0
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "replay_misses": 0, "pruned": 0}
+
+    def _db(self) -> sqlite3.Connection:
+        # caller holds the lock
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                " key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_created ON llm_responses (created_at)")
+        return self._conn
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        oldest = time.time() - max_age if max_age else 0.0
+        with self._lock:
+            row = self._db().execute("SELECT response FROM llm_responses WHERE key = ? AND created_at >= ?",
+                                     (key, oldest)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, model: str, response: Dict[str, Any], max_rows: Optional[int] = None):
+        with self._lock:
+            db = self._db()
+            db.execute("INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?)",
+                       (key, model, json.dumps(response, ensure_ascii=False), time.time()))
+            self._puts += 1
+            if max_rows and self._puts % self.PRUNE_EVERY == 1:
+                # newest max_rows survive; the created_at index makes this a range scan
+                cur = db.execute("DELETE FROM llm_responses WHERE created_at < (SELECT created_at FROM llm_responses"
+                                 " ORDER BY created_at DESC LIMIT 1 OFFSET ?)", (max_rows - 1,))
+                self.stats["pruned"] += max(cur.rowcount, 0)
+            db.commit()
+
+    def count_event(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+_store = ResponseStore(LLM_CACHE_PATH)
+
+_sync_client: Optional[ChatGroq] = None
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ChatGroq]" = weakref.WeakKeyDictionary()
+_client_lock = threading.Lock()
+
+def _client(model: str, temperature: float) -> ChatGroq:
+    global _sync_client
+    from langchain_groq import ChatGroq  # deferred with the groq SDK; a no-op after the first call
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _client_lock:
+        if loop is None:
+            if _sync_client is None:
+                _sync_client = ChatGroq(api_key=GROQ_API_KEY, model=model, temperature=temperature)
+            return _sync_client
+        client = _loop_clients.get(loop)
+        if client is None:
+            client = _loop_clients[loop] = ChatGroq(api_key=GROQ_API_KEY, model=model, temperature=temperature)
+        return client
+
+def _message(content: str, usage: Optional[Dict[str, Any]], cache: str) -> AIMessage:
+    return AIMessage(content=content, usage_metadata=usage, response_metadata={"llm_cache": cache})
+
+class CachedChatModel(BaseChatModel):
+    """ChatGroq behind the pooled clients and the prompt-hash response cache."""
+
+    model_name: str = GROQ_MODEL
+    temperature: float = 0.0
+    mode: str = LLM_CACHE_MODE
+
+    @property
+    def _llm_type(self) -> str:
+        return "cached-groq"
+
+    def _key(self, messages: List[BaseMessage], stop: Optional[List[str]]) -> str:
+        payload = json.dumps({
+            "model": self.model_name, "temperature": self.temperature, "stop": stop,
+            "messages": [[m.type, m.content] for m in messages],
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cached(self) -> bool:
+        return self.mode == "replay" or (self.mode == "cache" and self.temperature == 0)
+
+    def _stored(self) -> bool:
+        return self.mode == "record" or (self.mode == "cache" and self.temperature == 0)
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self._cached():
+            return None
+        hit = _store.get(key, max_age=LLM_CACHE_TTL_S if self.mode == "cache" else None)
+        if hit is not None:
+            _store.count_event("hits")
+            return hit
+        _store.count_event("misses")
+        if self.mode == "replay":
+            _store.count_event("replay_misses")
+            raise LLMReplayMiss(f"no recorded LLM response for prompt {key[:12]} (LLM_CACHE_MODE=replay)")
+        return None
+
+    def _save(self, key: str, content: str, usage: Optional[Dict[str, Any]]):
+        if self._stored():
+            _store.put(key, self.model_name, {"content": content, "usage": usage},
+                       max_rows=LLM_CACHE_MAX_ROWS if self.mode == "cache" else None)
+            _store.count_event("stored")
+
+    # async callers: sqlite3 I/O off the event loop, and no thread hop when the cache is off
+    async def _alookup(self, key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._lookup, key) if self._cached() else None
+
+    async def _asave(self, key: str, content: str, usage: Optional[Dict[str, Any]]):
+        if self._stored():
+            await asyncio.to_thread(self._save, key, content, usage)
+
+    def _account(self, sp: Span, usage: Optional[Dict[str, Any]]):
+        if usage:
+            sp.set(input_tokens=usage.get("input_tokens", 0), output_tokens=usage.get("output_tokens", 0))
+            LLM_TOKENS.inc(usage.get("input_tokens", 0), self.model_name, "input")
+            LLM_TOKENS.inc(usage.get("output_tokens", 0), self.model_name, "output")
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        key = self._key(messages, stop)
+        with span("llm", self.model_name) as sp:
+            hit = self._lookup(key)
+            sp.set(cache="hit" if hit is not None else "miss")
+            if hit is not None:
+                return ChatResult(generations=[ChatGeneration(message=_message(hit["content"], None, "hit"))])
+            msg = _client(self.model_name, self.temperature).invoke(messages, stop=stop, **kwargs)
+            self._account(sp, msg.usage_metadata)
+        self._save(key, msg.content, msg.usage_metadata)
+        return ChatResult(generations=[ChatGeneration(message=_message(msg.content, msg.usage_metadata, "miss"))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        key = self._key(messages, stop)
+        with span("llm", self.model_name) as sp:
+            hit = await self._alookup(key)
+            sp.set(cache="hit" if hit is not None else "miss")
+            if hit is not None:
+                return ChatResult(generations=[ChatGeneration(message=_message(hit["content"], None, "hit"))])
+            msg = await _client(self.model_name, self.temperature).ainvoke(messages, stop=stop, **kwargs)
+            self._account(sp, msg.usage_metadata)
+        await self._asave(key, msg.content, msg.usage_metadata)
+        return ChatResult(generations=[ChatGeneration(message=_message(msg.content, msg.usage_metadata, "miss"))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        key = self._key(messages, stop)
+        with span("llm", self.model_name, stream=True) as sp:
+            hit = self._lookup(key)
+            sp.set(cache="hit" if hit is not None else "miss")
+            if hit is not None:
+                yield ChatGenerationChunk(message=AIMessageChunk(content=hit["content"]))
+                return
+            parts, usage = [], None
+            for chunk in _client(self.model_name, self.temperature).stream(messages, stop=stop, **kwargs):
+                parts.append(chunk.content)
+                usage = chunk.usage_metadata or usage
+                if run_manager and chunk.content:
+                    run_manager.on_llm_new_token(chunk.content)
+                yield ChatGenerationChunk(message=chunk)
+            self._account(sp, usage)
+        self._save(key, "".join(parts), usage)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        key = self._key(messages, stop)
+        with span("llm", self.model_name, stream=True) as sp:
+            hit = await self._alookup(key)
+            sp.set(cache="hit" if hit is not None else "miss")
+            if hit is not None:
+                yield ChatGenerationChunk(message=AIMessageChunk(content=hit["content"]))
+                return
+            parts, usage = [], None
+            async for chunk in _client(self.model_name, self.temperature).astream(messages, stop=stop, **kwargs):
+                parts.append(chunk.content)
+                usage = chunk.usage_metadata or usage
+                if run_manager and chunk.content:
+                    await run_manager.on_llm_new_token(chunk.content)
+                yield ChatGenerationChunk(message=chunk)
+            self._account(sp, usage)
+        await self._asave(key, "".join(parts), usage)
+
+_llm: Optional[CachedChatModel] = None
+_llm_lock = threading.Lock()
+
+def get_llm() -> CachedChatModel:
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                if LLM_CACHE_MODE not in MODES:
+                    raise ValueError(f"LLM_CACHE_MODE must be one of {MODES}, got {LLM_CACHE_MODE!r}")
+                _llm = CachedChatModel()
+    return _llm
+
+def llm_cache_stats() -> Dict[str, Any]:
+    stats = _store.snapshot()
+    total = stats["hits"] + stats["misses"]
+    return {"mode": LLM_CACHE_MODE, "path": LLM_CACHE_PATH, **stats,
+            "hit_ratio": round(stats["hits"] / total, 4) if total else 0.0}
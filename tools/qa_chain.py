@@ -1,10 +1,17 @@
-from typing import Tuple, List
-from langchain_groq import ChatGroq
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
-from langchain.schema import Document
-from config import GROQ_API_KEY, GROQ_MODEL
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Tuple, List
+from langchain_core.documents import Document
+from langchain_core.prompts import PromptTemplate, format_document
+from config import (
+    ANSWER_CACHE_ENABLED, RETRIEVAL_MODE, CONTEXT_PACKING, CONTEXT_TOKEN_BUDGET, CONTEXT_DEDUP_THRESHOLD,
+)
+from rag.context import pack_context
 from rag.vectorstore import get_retriever
+from tools.answer_cache import answer_cache
+from tools.concurrency import run_cpu
+from tools.llm_client import get_llm
+from tools.tracing import span
 
 SYSTEM_PROMPT = """
 You are an HR policy assistant. Answer ONLY using the provided context.
@@ -19,7 +26,8 @@ Answer:
 """
 
 def build_qa_chain(k: int = 5):
-    llm = ChatGroq(api_key=GROQ_API_KEY, model=GROQ_MODEL, temperature=0)
+    from langchain.chains import RetrievalQA  # the langchain package is only needed once a chain is built
+    llm = get_llm()  # shared, pooled client with the prompt-hash response cache
     retriever = get_retriever(k=k)
 
     prompt = PromptTemplate(
@@ -37,6 +45,111 @@ def build_qa_chain(k: int = 5):
     )
     return qa
 
+_chains: Dict[int, Any] = {}
+_chains_lock = threading.Lock()
+
+def get_qa_chain(k: int = 5):
+    """Process-wide QA chain for top-k retrieval; built on first use (or by the startup warm-up)."""
+    qa = _chains.get(k)
+    if qa is None:
+        with _chains_lock:
+            qa = _chains.get(k)
+            if qa is None:
+                qa = _chains[k] = build_qa_chain(k=k)
+    return qa
+
+async def aget_qa_chain(k: int = 5):
+    """get_qa_chain() for async callers: a cold build (model load) runs on the CPU pool, not the loop."""
+    return _chains.get(k) or await run_cpu(get_qa_chain, k)
+
+def _retrieve(qa, query: str) -> List[Document]:
+    with span("retrieve", RETRIEVAL_MODE) as sp:
+        docs = qa.retriever.invoke(query)
+        sp.set(docs=len(docs))
+    if CONTEXT_PACKING:
+        # the prompt and the citations both use the packed blocks
+        with span("pack", "context") as sp:
+            docs, stats = pack_context(docs, CONTEXT_TOKEN_BUDGET, CONTEXT_DEDUP_THRESHOLD)
+            sp.set(**stats)
+    return docs
+
 def ask(qa, query: str) -> Tuple[str, List[Document]]:
-    out = qa.invoke({"query": query})
-    return out["result"].strip(), out["source_documents"]
+    # same as qa.invoke({"query": ...}), split so retrieval and the LLM call are timed separately
+    docs = _retrieve(qa, query)
+    out = qa.combine_documents_chain.invoke({"input_documents": docs, "question": query})
+    return out["output_text"].strip(), docs
+
+def ask_cached(qa, query: str) -> Tuple[str, List[Document]]:
+    """ask() behind the semantic answer cache (see tools/answer_cache.py)."""
+    # the cache embeds questions; lexical mode must not load the embedding model
+    if not ANSWER_CACHE_ENABLED or RETRIEVAL_MODE == "lexical":
+        return ask(qa, query)
+    hit = answer_cache.lookup(query)
+    if hit is not None:
+        return hit
+    t0 = time.perf_counter()
+    ans, srcs = ask(qa, query)
+    answer_cache.store(query, ans, srcs, latency_ms=(time.perf_counter() - t0) * 1000)
+    return ans, srcs
+
+async def aask(qa, query: str) -> Tuple[str, List[Document]]:
+    """Async ask(): retrieval on the bounded CPU pool, the LLM call awaited natively."""
+    docs = await run_cpu(_retrieve, qa, query)
+    out = await qa.combine_documents_chain.ainvoke({"input_documents": docs, "question": query})
+    return out["output_text"].strip(), docs
+
+async def aask_cached(qa, query: str) -> Tuple[str, List[Document]]:
+    """Async ask_cached(); the cache's question embedding also runs on the CPU pool."""
+    if not ANSWER_CACHE_ENABLED or RETRIEVAL_MODE == "lexical":
+        return await aask(qa, query)
+    hit = await run_cpu(answer_cache.lookup, query)
+    if hit is not None:
+        return hit
+    t0 = time.perf_counter()
+    ans, srcs = await aask(qa, query)
+    await run_cpu(answer_cache.store, query, ans, srcs, (time.perf_counter() - t0) * 1000)
+    return ans, srcs
+
+def _cite(d: Document) -> Dict[str, Any]:
+    return {"source": d.metadata.get("source"),
+            "section": d.metadata.get("h2") or d.metadata.get("h1") or d.metadata.get("h3", "")}
+
+async def astream_ask(qa, query: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming ask(). Yields events:
+      {"event": "token", "data": {"text": "..."}}   as the LLM produces them
+      {"event": "citations", "data": {"answer": "...", "citations": [...]}}  once, at the end
+      {"event": "error", "data": {"error": "..."}}  instead, if retrieval or the LLM fails
+    Cache hits (semantic answer cache) arrive as a single token event.
+    """
+    events = _astream_ask(qa, query)
+    try:
+        async for ev in events:
+            yield ev
+    except Exception as e:  # SSE clients always get a terminal event
+        yield {"event": "error", "data": {"error": f"{type(e).__name__}: {e}"}}
+    finally:
+        await events.aclose()
+
+async def _astream_ask(qa, query: str) -> AsyncIterator[Dict[str, Any]]:
+    use_cache = ANSWER_CACHE_ENABLED and RETRIEVAL_MODE != "lexical"
+    hit = await run_cpu(answer_cache.lookup, query) if use_cache else None
+    if hit is not None:
+        ans, docs = hit
+        yield {"event": "token", "data": {"text": ans}}
+    else:
+        t0 = time.perf_counter()
+        docs = await run_cpu(_retrieve, qa, query)
+        chain = qa.combine_documents_chain
+        # same context the "stuff" chain would build
+        context = chain.document_separator.join(format_document(d, chain.document_prompt) for d in docs)
+        prompt = chain.llm_chain.prompt.format(context=context, question=query)
+        parts: List[str] = []
+        async for chunk in chain.llm_chain.llm.astream(prompt):
+            if chunk.content:
+                parts.append(chunk.content)
+                yield {"event": "token", "data": {"text": chunk.content}}
+        ans = "".join(parts).strip()
+        if use_cache:
+            await run_cpu(answer_cache.store, query, ans, docs, (time.perf_counter() - t0) * 1000)
+    yield {"event": "citations", "data": {"answer": ans, "citations": [_cite(d) for d in docs]}}
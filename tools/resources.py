@@ -0,0 +1,92 @@
+# tools/resources.py
+"""
+Startup warm-up and readiness for the process-wide resources.
+
+Each heavy resource is a lazy singleton behind its own getter (get_llm,
+get_embeddings, get_vectorstore, get_bm25, get_qa_chain), so importing the app
+builds nothing. warm_up() calls the getters the configured retrieval mode needs,
+once, in dependency order, and keeps per-resource timings for /health/ready.
+
+  resources.warm_up()   # at startup (STARTUP_WARMUP), on the CPU pool
+  resources.ready()     # every step done (or warm-up disabled: lazy on first use)
+  resources.status()
+"""
+
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+from config import RETRIEVAL_MODE, RETRIEVER_BACKEND, STARTUP_WARMUP
+
+class Resources:
+    def __init__(self):
+        self._steps: List[Tuple[str, Callable[[], Any]]] = []
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, load: Callable[[], Any]):
+        self._steps.append((name, load))
+        self._status[name] = {"state": "pending"}
+
+    def warm_up(self) -> Dict[str, Dict[str, Any]]:
+        """Load every registered resource; a failure is recorded and the rest still load."""
+        with self._lock:  # a second caller waits for the first warm-up instead of repeating it
+            for name, load in self._steps:
+                if self._status[name]["state"] == "ready":
+                    continue
+                self._status[name] = {"state": "loading"}
+                t0 = time.perf_counter()
+                try:
+                    load()
+                    self._status[name] = {"state": "ready", "ms": round((time.perf_counter() - t0) * 1000, 1)}
+                except Exception as e:
+                    self._status[name] = {"state": "failed", "error": f"{type(e).__name__}: {e}"}
+        return self.status()
+
+    def ready(self) -> bool:
+        if STARTUP_WARMUP == "off":
+            return True
+        return all(st["state"] == "ready" for st in self._status.values())
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(st) for name, st in self._status.items()}
+
+# --- what this process needs, in load order ---
+
+def _llm():
+    import langchain_groq  # noqa: F401  the groq SDK import is most of the first call's cost
+    from tools.llm_client import get_llm
+    get_llm()
+
+def _embeddings():
+    from rag.embeddings import get_embeddings
+    get_embeddings().inner.embed_query("warm up")  # first forward pass is much slower than the rest
+
+def _dense_index():
+    from rag.vectorstore import get_index_retriever, get_vectorstore
+    if RETRIEVER_BACKEND == "numpy":
+        get_index_retriever()
+    else:
+        get_vectorstore()
+
+def _bm25():
+    from rag.vectorstore import get_bm25
+    get_bm25()
+
+def _qa_chain():
+    from tools.qa_chain import get_qa_chain
+    get_qa_chain()
+
+def _db():
+    from db.session import ensure_schema
+    ensure_schema()  # also opens the first pooled connection (and switches the file to WAL)
+
+resources = Resources()
+resources.register("llm", _llm)
+if RETRIEVAL_MODE != "lexical":
+    resources.register("embeddings", _embeddings)
+    resources.register("dense_index", _dense_index)
+if RETRIEVAL_MODE in ("lexical", "hybrid"):
+    resources.register("bm25", _bm25)
+resources.register("qa_chain", _qa_chain)
+resources.register("db", _db)
@@ -0,0 +1,49 @@
+# tools/singleflight.py
+"""
+In-process request coalescing ("single flight").
+- await group.do(key, fn, *args) -> result of fn(*args)
+
+The first caller for a key starts the computation; callers arriving with the
+same key while it is in flight await that one task and get the same result (or
+the same exception). Nothing is kept once the task finishes - caching is the
+answer cache's job. The task is shielded, so a client that disconnects does not
+cancel the computation the others are waiting on.
+"""
+
+from __future__ import annotations
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from rag.embeddings import normalize_query
+
+def question_key(text: str) -> str:
+    return normalize_query(text)
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        # single event loop: no lock needed between the lookup and the insert
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+            "collapse_ratio": round(self.collapsed / self.calls, 4) if self.calls else 0.0,
+            "inflight": len(self._inflight),
+        }
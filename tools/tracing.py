@@ -0,0 +1,139 @@
+# tools/tracing.py
+"""
+Timed spans per stage (embed, retrieve, pack, llm, tool, db) and Prometheus-style metrics.
+
+    with span("retrieve", mode="hybrid") as sp:
+        docs = retriever.invoke(q)
+        sp.set(docs=len(docs))
+
+Every span feeds the `policybot_stage_seconds{stage,name}` histogram. Spans are
+only kept as records inside `with collect() as spans:` (the API does this for
+trace=true requests), so the untraced cost is two perf_counter() calls and a
+histogram update. render_metrics() returns the text exposition served on /metrics.
+
+Collection uses a contextvar: it follows awaits and tasks, and tools.concurrency.run_cpu
+copies the context into its worker threads.
+"""
+
+from __future__ import annotations
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# seconds; spans range from sub-ms cache hits to multi-second LLM calls
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets=BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *label_values: str):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(label_values)
+            if s is None:
+                s = self._series[label_values] = [0.0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for values, s in sorted(series.items()):
+            lbl = ",".join(f'{k}="{_esc(v)}"' for k, v in zip(self.labels, values))
+            cum = 0.0
+            for b, c in zip(self.buckets, s):
+                cum += c
+                out.append(f'{self.name}_bucket{{{lbl},le="{b:g}"}} {cum:g}')
+            out.append(f'{self.name}_bucket{{{lbl},le="+Inf"}} {s[-1]:g}')
+            out.append(f"{self.name}_sum{{{lbl}}} {s[-2]:.6f}")
+            out.append(f"{self.name}_count{{{lbl}}} {s[-1]:g}")
+        return out
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name, self.help, self.labels = name, help, labels
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float, *label_values: str):
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            series = dict(self._series)
+        for values, v in sorted(series.items()):
+            lbl = ",".join(f'{k}="{_esc(v_)}"' for k, v_ in zip(self.labels, values))
+            out.append(f"{self.name}{{{lbl}}} {v:g}")
+        return out
+
+def _esc(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+STAGE_SECONDS = Histogram("policybot_stage_seconds", "Time spent per stage (embed, retrieve, pack, llm, tool, db).",
+                          ("stage", "name"))
+HTTP_SECONDS = Histogram("policybot_http_request_seconds", "HTTP request latency by route.",
+                         ("method", "route", "status"))
+LLM_TOKENS = Counter("policybot_llm_tokens_total", "LLM tokens reported by the API.", ("model", "kind"))
+METRICS = [STAGE_SECONDS, HTTP_SECONDS, LLM_TOKENS]
+
+def render_metrics() -> str:
+    return "\n".join(line for m in METRICS for line in m.render()) + "\n"
+
+# --- spans ---
+
+_spans: contextvars.ContextVar[Optional[Tuple[float, List[Dict[str, Any]]]]] = \
+    contextvars.ContextVar("policybot_spans", default=None)
+
+class Span:
+    __slots__ = ("stage", "name", "attrs", "t0")
+
+    def __init__(self, stage: str, name: str, attrs: Dict[str, Any]):
+        self.stage, self.name, self.attrs = stage, name, attrs
+        self.t0 = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+def record(stage: str, name: str, t0: float, t1: float, attrs: Optional[Dict[str, Any]] = None):
+    """Histogram + (when collecting) a span record for [t0, t1] in perf_counter seconds."""
+    STAGE_SECONDS.observe(t1 - t0, stage, name)
+    active = _spans.get()
+    if active is not None:
+        origin, spans = active
+        spans.append({"stage": stage, "name": name, "start_ms": round((t0 - origin) * 1000, 2),
+                      "ms": round((t1 - t0) * 1000, 2), **(attrs or {})})
+
+@contextmanager
+def span(stage: str, name: str = "", **attrs) -> Iterator[Span]:
+    sp = Span(stage, name, attrs)
+    try:
+        yield sp
+    except BaseException as e:
+        sp.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        record(stage, sp.name, sp.t0, time.perf_counter(), sp.attrs)
+
+@contextmanager
+def collect() -> Iterator[List[Dict[str, Any]]]:
+    """Keep the spans recorded in this context (and tasks / run_cpu work it starts)."""
+    spans: List[Dict[str, Any]] = []
+    token = _spans.set((time.perf_counter(), spans))
+    try:
+        yield spans
+    finally:
+        _spans.reset(token)
+
+def collecting() -> bool:
+    return _spans.get() is not None